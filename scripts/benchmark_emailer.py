@@ -0,0 +1,654 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for ses_emailer.py
+Runs without AWS access; nothing is sent. SES calls go to an in-process stub client.
+"""
+
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ses_emailer import (  # noqa: E402
+    AttachmentCache, EmailTemplates, RawMessageBuilder, RecipientValidator, SESEmailer, build_recipient_context,
+    load_recipients_from_file, iter_recipients
+)
+
+
+def legacy_replace_template_placeholders(text: str, recipient_data: Dict[str, str], generic_greeting: Optional[str] = None) -> str:
+    """The original chained str.replace implementation, kept as the baseline"""
+    result = text
+    email = recipient_data.get('email', '').strip()
+    name = recipient_data.get('name', '').strip()
+    if not name and email:
+        email_local = email.split('@')[0] if '@' in email else email
+        name = email_local.replace('.', ' ').replace('_', ' ').replace('-', ' ')
+        name = ' '.join(word.capitalize() for word in name.split() if word and not word.isdigit())
+        if not name or name.strip() == '':
+            name = email_local.split('.')[0].capitalize()
+    if name:
+        name_replacement = name
+    elif generic_greeting:
+        name_replacement = generic_greeting
+    else:
+        name_replacement = ''
+    result = result.replace('[NAME]', name_replacement)
+    result = result.replace('[name]', name_replacement)
+    if '[GREETING]' in result or '[greeting]' in result:
+        if name:
+            greeting = f"Hi {name}!"
+        elif generic_greeting:
+            greeting = generic_greeting
+        else:
+            greeting = "Hi!"
+        result = result.replace('[GREETING]', greeting)
+        result = result.replace('[greeting]', greeting)
+    result = result.replace('[EMAIL]', email)
+    result = result.replace('[email]', email)
+    return result
+
+
+def make_html_body(size_kb: int = 30) -> str:
+    """Build a realistic newsletter-style HTML body of roughly size_kb kilobytes"""
+    paragraph = (
+        '<tr><td style="padding: 12px 24px; font-family: Arial, sans-serif; font-size: 14px; color: #333333;">'
+        'We wanted to let you know about some important changes to your account. '
+        'Please review the details below and <a href="https://example.com/account?utm_source=email">'
+        'visit your dashboard</a> if you have any questions.</td></tr>\n'
+    )
+    header = (
+        '<!DOCTYPE html><html><head><meta charset="UTF-8"></head><body>'
+        '<table width="100%" cellpadding="0" cellspacing="0">\n'
+        '<tr><td><h1>[GREETING]</h1><p>Dear [NAME],</p></td></tr>\n'
+    )
+    footer = (
+        '<tr><td><p>This email was sent to [EMAIL]. '
+        '<a href="https://example.com/unsubscribe?email=[EMAIL]">Unsubscribe</a></p></td></tr>\n'
+        '</table></body></html>'
+    )
+    body = header
+    while len(body) < size_kb * 1024:
+        body += paragraph
+    return body + footer
+
+
+def make_recipients(count: int):
+    """Synthetic recipients; every third one has no name so the email-derived fallback runs"""
+    for i in range(count):
+        name = '' if i % 3 == 0 else f'Recipient {i}'
+        yield {'email': f'first.last{i}@example.com', 'name': name}
+
+
+def bench_render(recipients: int, size_kb: int) -> Dict:
+    """Render subject, text and HTML per recipient with the legacy and compiled implementations"""
+    subject = 'Hello [NAME], your account update'
+    body_text = 'Hi [NAME],\n\nImportant changes to your account.\n\nSent to [EMAIL]\n' * 20
+    body_html = make_html_body(size_kb)
+
+    start = time.perf_counter()
+    for r in make_recipients(recipients):
+        legacy_replace_template_placeholders(subject, r)
+        legacy_replace_template_placeholders(body_text, r)
+        legacy_replace_template_placeholders(body_html, r)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    templates = EmailTemplates(subject, body_text, body_html)
+    for r in make_recipients(recipients):
+        templates.render(build_recipient_context(r))
+    compiled_seconds = time.perf_counter() - start
+
+    # Outputs must be byte-identical
+    for r in make_recipients(min(recipients, 1000)):
+        rendered = templates.render(build_recipient_context(r))
+        expected = tuple(legacy_replace_template_placeholders(text, r) for text in (subject, body_text, body_html))
+        assert rendered == expected
+
+    return {
+        'recipients': recipients,
+        'html_bytes': len(body_html),
+        'legacy_seconds': round(legacy_seconds, 3),
+        'compiled_seconds': round(compiled_seconds, 3),
+        'speedup': round(legacy_seconds / compiled_seconds, 2) if compiled_seconds else None
+    }
+
+
+# Modules only the preview/attachment/--queue-db paths need; importing ses_emailer must not load them
+LAZY_MODULES = ('webbrowser', 'email.mime.multipart', 'email.mime.text', 'email.mime.base', 'sqlite3')
+
+# Runs in a fresh interpreter so every measurement is a true cold start
+COLD_START_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import ses_emailer
+imported = time.perf_counter()
+lazy_loaded = [m for m in sys.argv[1:] if m in sys.modules]
+emailer = ses_emailer.SESEmailer(region_name='us-west-2')
+client_ready = time.perf_counter()
+# Count send quota lookups (a round trip to SES each) instead of calling AWS
+quota_calls = []
+def get_send_quota():
+    quota_calls.append(1)
+    return {'Max24HourSend': 50000.0, 'MaxSendRate': 14.0, 'SentLast24Hours': 0.0}
+real_client = ses_emailer.boto3.client
+def client(service, *args, **kwargs):
+    created = real_client(service, *args, **kwargs)
+    if service == 'ses':
+        created.get_send_quota = get_send_quota
+    return created
+ses_emailer.boto3.client = client
+import lambda_handler
+handler_ready = time.perf_counter()
+# An invocation sends, so it needs the rate limiter
+lambda_handler.get_emailer('us-west-2').rate_limiter
+first_emailer = time.perf_counter()
+first_quota_calls = len(quota_calls)
+lambda_handler.get_emailer('us-west-2').rate_limiter
+warm_emailer = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - start,
+    'client_seconds': client_ready - imported,
+    'handler_import_seconds': handler_ready - client_ready,
+    'first_invocation_setup_seconds': first_emailer - handler_ready,
+    'warm_invocation_setup_seconds': warm_emailer - first_emailer,
+    'first_invocation_quota_calls': first_quota_calls,
+    'warm_invocation_quota_calls': len(quota_calls) - first_quota_calls,
+    'lazy_loaded': lazy_loaded
+}))
+"""
+
+
+def bench_cold_start(runs: int) -> Dict:
+    """Import time and first-send setup (SES client, Lambda handler) in fresh interpreters"""
+    env = dict(os.environ)
+    # Client construction needs a region and credentials but never calls AWS
+    env.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+    env.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+    env.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', COLD_START_PROBE, *LAZY_MODULES],
+            cwd=script_dir, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    
+    result = {'runs': runs}
+    for key in ('import_seconds', 'client_seconds', 'handler_import_seconds',
+                'first_invocation_setup_seconds', 'warm_invocation_setup_seconds'):
+        result[key] = round(statistics.median(sample[key] for sample in samples), 4)
+    # Counts, not timings: the worst run shows a cache that doesn't hold
+    for key in ('first_invocation_quota_calls', 'warm_invocation_quota_calls'):
+        result[key] = max(sample[key] for sample in samples)
+    result['lazy_loaded'] = sorted({m for sample in samples for m in sample['lazy_loaded']})
+    return result
+
+
+class StubSESClient:
+    """Stand-in for the boto3 SES client: sleeps for the configured latency and returns a MessageId"""
+    
+    def __init__(self, latency: float = 0.02, max_send_rate: float = 1e6):
+        self.latency = latency
+        self.max_send_rate = max_send_rate
+        self.calls = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+    
+    def _respond(self, size: int = 0) -> Dict:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            self.bytes_sent += size
+            return {'MessageId': f'stub-{self.calls}'}
+    
+    def send_email(self, **kwargs) -> Dict:
+        return self._respond()
+    
+    def send_raw_email(self, **kwargs) -> Dict:
+        return self._respond(len(kwargs['RawMessage']['Data']))
+    
+    def send_bulk_templated_email(self, **kwargs) -> Dict:
+        self._respond()
+        return {'Status': [{'Status': 'Success', 'MessageId': f'stub-bulk-{i}'} for i in range(len(kwargs['Destinations']))]}
+    
+    def get_send_quota(self) -> Dict:
+        return {'Max24HourSend': 1e9, 'MaxSendRate': self.max_send_rate, 'SentLast24Hours': 0.0}
+
+
+def stub_emailer(latency: float, workers: int = 1, max_send_rate: Optional[float] = None) -> SESEmailer:
+    """SESEmailer whose SES client is a StubSESClient (the real client is created but never called)"""
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+    emailer = SESEmailer(region_name='us-west-2', max_workers=workers, max_send_rate=max_send_rate or 1e6)
+    emailer.ses_client = StubSESClient(latency)
+    return emailer
+
+
+@contextlib.contextmanager
+def quiet():
+    """Send paths print per message; write that to /dev/null so the terminal doesn't dominate timings"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def write_recipients_file(directory: str, file_format: str, rows: int) -> str:
+    """Synthetic recipients file (email, name, company) in csv, json or jsonl format"""
+    path = os.path.join(directory, f'recipients_{rows}.{file_format}')
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            f.write('email,name,company\n')
+            for r in make_recipients(rows):
+                f.write(f"{r['email']},{r['name']},Example Corp\n")
+        elif file_format == 'jsonl':
+            for r in make_recipients(rows):
+                f.write(json.dumps(dict(r, company='Example Corp')) + '\n')
+        else:
+            f.write('[\n')
+            for i, r in enumerate(make_recipients(rows)):
+                f.write((',\n' if i else '') + json.dumps(dict(r, company='Example Corp')))
+            f.write('\n]\n')
+    return path
+
+
+def bench_loader(rows: int, file_format: str) -> Dict:
+    """Load a synthetic recipients file as addresses and as records, stream it, and stream it through validation"""
+    directory = tempfile.mkdtemp(prefix='ses_emailer_bench_')
+    try:
+        path = write_recipients_file(directory, file_format, rows)
+        
+        start = time.perf_counter()
+        addresses = load_recipients_from_file(path)
+        load_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        records = load_recipients_from_file(path, include_names=True)
+        load_records_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        streamed = sum(1 for _ in iter_recipients(path, include_names=True))
+        stream_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        validated = sum(1 for _ in RecipientValidator().filter(iter_recipients(path, include_names=True)))
+        validate_seconds = time.perf_counter() - start
+        
+        assert len(addresses) == len(records) == streamed == validated == rows
+        return {
+            'format': file_format,
+            'rows': rows,
+            'file_bytes': os.path.getsize(path),
+            'load_seconds': round(load_seconds, 4),
+            'load_records_seconds': round(load_records_seconds, 4),
+            'stream_seconds': round(stream_seconds, 4),
+            'validate_seconds': round(validate_seconds, 4),
+            'rows_per_second': round(rows / load_records_seconds) if load_records_seconds else None
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def legacy_build_raw_message(sender: str, recipients: List[str], subject: str, body_text: str,
+                             body_html: Optional[str], cache: AttachmentCache, attachments: List[str]) -> str:
+    """The original per-message email.mime tree + as_string(), kept as the baseline"""
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    
+    if body_html and attachments:
+        msg = MIMEMultipart('mixed')
+        alt_part = MIMEMultipart('alternative')
+        alt_part.attach(MIMEText(body_text, 'plain', 'utf-8'))
+        alt_part.attach(MIMEText(body_html, 'html', 'utf-8'))
+        msg.attach(alt_part)
+    elif body_html:
+        msg = MIMEMultipart('alternative')
+        msg.attach(MIMEText(body_text, 'plain', 'utf-8'))
+        msg.attach(MIMEText(body_html, 'html', 'utf-8'))
+    else:
+        msg = MIMEMultipart('mixed')
+        msg.attach(MIMEText(body_text, 'plain', 'utf-8'))
+    msg['Subject'] = subject
+    msg['From'] = sender
+    msg['To'] = ', '.join(recipients)
+    for path in attachments:
+        msg.attach(cache.mime_part(path))
+    return msg.as_string()
+
+
+def bench_mime(messages: int, size_kb: int, attachment_kb: int) -> Dict:
+    """Build raw messages (HTML body plus one shared attachment): legacy email.mime tree vs RawMessageBuilder"""
+    directory = tempfile.mkdtemp(prefix='ses_emailer_bench_')
+    try:
+        attachment = os.path.join(directory, 'statement.pdf')
+        with open(attachment, 'wb') as f:
+            f.write(random.Random(0).randbytes(attachment_kb * 1024))
+        subject = 'Your monthly statement'
+        body_text = 'Hi,\n\nYour statement is attached.\n' * 20
+        body_html = make_html_body(size_kb)
+        cache = AttachmentCache()
+        with quiet():
+            cache.get(attachment)  # both sides reuse the encoded payload
+        recipients = [[r['email']] for r in make_recipients(messages)]
+        
+        start = time.perf_counter()
+        for to in recipients:
+            legacy_build_raw_message('sender@example.com', to, subject, body_text, body_html, cache, [attachment])
+        legacy_seconds = time.perf_counter() - start
+        
+        with quiet():
+            builder = RawMessageBuilder('sender@example.com', attachments=[attachment], attachment_cache=cache)
+        start = time.perf_counter()
+        for to in recipients:
+            builder.build(to, subject, body_text, body_html)
+        builder_seconds = time.perf_counter() - start
+        
+        # Full send_email_with_attachments call (builder, SES request, result dict) against the stub
+        emailer = stub_emailer(latency=0)
+        emailer.attachment_cache = cache
+        start = time.perf_counter()
+        with quiet():
+            for to in recipients:
+                emailer.send_email_with_attachments('sender@example.com', to, subject, body_text, body_html,
+                                                    message_builder=builder)
+        send_call_seconds = time.perf_counter() - start
+        
+        return {
+            'messages': messages,
+            'html_bytes': len(body_html),
+            'attachment_bytes': attachment_kb * 1024,
+            'legacy_seconds': round(legacy_seconds, 4),
+            'builder_seconds': round(builder_seconds, 4),
+            'send_call_seconds': round(send_call_seconds, 4),
+            'speedup': round(legacy_seconds / builder_seconds, 2) if builder_seconds else None
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_send_loop(recipients: int, workers: int, latency_ms: float, personalized: bool = False,
+                    pack_bcc: bool = False, max_send_rate: Optional[float] = None) -> Dict:
+    """End-to-end send_email_batch against the stub client"""
+    emailer = stub_emailer(latency_ms / 1000, workers=workers, max_send_rate=max_send_rate)
+    subject = 'Hello [NAME], your account update' if personalized else 'Your account update'
+    body_text = 'Hi [NAME],\n\nImportant changes to your account.\n' * 10
+    body_html = make_html_body(10)
+    
+    start = time.perf_counter()
+    with quiet():
+        result = emailer.send_email_batch(
+            sender='sender@example.com',
+            recipients=make_recipients(recipients) if personalized else (r['email'] for r in make_recipients(recipients)),
+            subject=subject,
+            body_text=body_text,
+            body_html=body_html,
+            personalized=personalized,
+            max_workers=workers,
+            collect_results=False,
+            pack_bcc=pack_bcc
+        )
+    seconds = time.perf_counter() - start
+    assert result['successful'] == recipients, result
+    
+    breakdown = emailer.metrics.time_breakdown()
+    return {
+        'recipients': recipients,
+        'workers': workers,
+        'latency_ms': latency_ms,
+        'personalized': personalized,
+        'pack_bcc': pack_bcc,
+        'api_calls': emailer.ses_client.calls,
+        'send_seconds': round(seconds, 4),
+        'sends_per_second': round(recipients / seconds, 1) if seconds else None,
+        # Where the workers spent their time (summed over workers)
+        'breakdown': breakdown
+    }
+
+
+def run_metadata() -> Dict:
+    """Where and on what revision the benchmarks ran, stored alongside --json results"""
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        'revision': revision,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare the *_seconds timings of two --json result files
+    
+    Args:
+        baseline: Results of the reference revision
+        current: Results to check
+        threshold: Allowed slowdown as a fraction (0.1 = 10% slower is still fine)
+        
+    Returns:
+        One row per timing present in both files, with 'change' and 'regression'
+    """
+    rows = []
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name)
+        if not reference:
+            continue
+        for key, value in result.items():
+            if not key.endswith('_seconds') or not isinstance(value, (int, float)):
+                continue
+            before = reference.get(key)
+            if not before:
+                continue
+            change = (value - before) / before
+            rows.append({'benchmark': name, 'timing': key, 'baseline': before, 'current': value,
+                         'change': round(change, 4), 'regression': change > threshold})
+    return rows
+
+
+def print_result(name: str, result: Dict) -> None:
+    """Human-readable summary of one benchmark result"""
+    if name.startswith('render'):
+        print(f"📊 Rendering {result['recipients']:,} recipients (HTML body {result['html_bytes']:,} bytes)")
+        print(f"  Legacy str.replace: {result['legacy_seconds']:.2f}s")
+        print(f"  Compiled template:  {result['compiled_seconds']:.2f}s")
+        print(f"  Speedup: {result['speedup']}x")
+    elif name.startswith('loader'):
+        print(f"📊 Loading {result['rows']:,} {result['format']} rows ({result['file_bytes']:,} bytes)")
+        print(f"  Addresses only:     {result['load_seconds']:.2f}s")
+        print(f"  Full records:       {result['load_records_seconds']:.2f}s ({result['rows_per_second']:,} rows/s)")
+        print(f"  Streamed records:   {result['stream_seconds']:.2f}s")
+        if 'validate_seconds' in result:
+            print(f"  Streamed+validated: {result['validate_seconds']:.2f}s")
+    elif name.startswith('mime'):
+        print(f"📊 Building {result['messages']:,} raw messages (HTML {result['html_bytes']:,} bytes, "
+              f"attachment {result['attachment_bytes']:,} bytes)")
+        print(f"  Legacy email.mime tree:       {result['legacy_seconds']:.2f}s")
+        print(f"  RawMessageBuilder:            {result['builder_seconds']:.2f}s")
+        print(f"  send_email_with_attachments:  {result['send_call_seconds']:.2f}s (stub client, no latency)")
+        print(f"  Speedup: {result['speedup']}x")
+    elif name.startswith('send-loop'):
+        mode = 'personalized' if result['personalized'] else ('packed BCC' if result['pack_bcc'] else 'individual')
+        print(f"📊 send_email_batch: {result['recipients']:,} {mode} sends, {result['workers']} workers, "
+              f"{result['latency_ms']:g} ms stub latency")
+        print(f"  Total: {result['send_seconds']:.2f}s ({result['sends_per_second']:,} sends/s, {result['api_calls']:,} API calls)")
+        breakdown = result['breakdown']
+        print(f"  Worker time: {breakdown['ses_api_latency_seconds']:.1f}s in API calls, "
+              f"{breakdown['rate_limiter_wait_seconds']:.1f}s pacing, {breakdown['render_seconds']:.1f}s rendering")
+    elif name.startswith('cold-start'):
+        print(f"📊 Cold start (median of {result['runs']} fresh interpreters)")
+        print(f"  import ses_emailer:        {result['import_seconds'] * 1000:.1f} ms")
+        print(f"  SESEmailer() client:       {result['client_seconds'] * 1000:.1f} ms")
+        print(f"  import lambda_handler:     {result['handler_import_seconds'] * 1000:.1f} ms")
+        print(f"  First invocation setup:    {result['first_invocation_setup_seconds'] * 1000:.1f} ms")
+        print(f"  Warm invocation setup:     {result['warm_invocation_setup_seconds'] * 1000:.3f} ms")
+        print(f"  Send quota lookups:        {result['first_invocation_quota_calls']} first invocation, "
+              f"{result['warm_invocation_quota_calls']} warm invocation")
+        if result['warm_invocation_quota_calls']:
+            print("❌ Warm invocations look up the send quota again instead of reusing the cached rate limiter")
+        if result['lazy_loaded']:
+            print(f"❌ Imported at module load but only needed for preview/attachments/--queue-db: {', '.join(result['lazy_loaded'])}")
+        else:
+            print("✓ Preview, attachment and --queue-db modules are loaded lazily")
+
+
+def main():
+    """Main function to run the benchmarks"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Offline benchmarks for ses_emailer.py',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Template rendering at 100k recipients
+  python benchmark_emailer.py render
+
+  # Smaller run with a 10 KB HTML body
+  python benchmark_emailer.py render --recipients 10000 --html-kb 10
+  
+  # Cold-start cost: module import plus SES client and Lambda handler setup (median of 10 runs)
+  python benchmark_emailer.py cold-start --runs 10
+  
+  # Recipient loading from synthetic CSV and JSON Lines files
+  python benchmark_emailer.py loader --rows 10000 100000 1000000 --format csv jsonl
+  
+  # Raw MIME construction with a 100 KB attachment
+  python benchmark_emailer.py mime --messages 5000 --attachment-kb 100
+  
+  # send_email_batch with 8 workers against a stub SES client answering in 50 ms
+  python benchmark_emailer.py send-loop --recipients 2000 --workers 8 --latency-ms 50
+  
+  # Everything at quick sizes, saved for comparison across revisions
+  python benchmark_emailer.py suite --json before.json
+  git checkout my-branch
+  python benchmark_emailer.py suite --json after.json
+  python benchmark_emailer.py compare before.json after.json --threshold 0.10
+        """
+    )
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    
+    # --json is accepted by every benchmark
+    output_parser = argparse.ArgumentParser(add_help=False)
+    output_parser.add_argument('--json', metavar='FILE', help='Also write the results (with revision and platform) as JSON')
+
+    render_parser = subparsers.add_parser('render', parents=[output_parser],
+                                          help='Placeholder rendering: chained str.replace vs compiled templates')
+    render_parser.add_argument('--recipients', type=int, default=100000, help='Number of recipients to render (default: 100000)')
+    render_parser.add_argument('--html-kb', type=int, default=30, help='Approximate HTML body size in KB (default: 30)')
+    
+    cold_parser = subparsers.add_parser('cold-start', parents=[output_parser],
+                                        help='Import time and first-send setup in a fresh interpreter')
+    cold_parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to measure (default: 5)')
+    
+    loader_parser = subparsers.add_parser('loader', parents=[output_parser],
+                                          help='load_recipients_from_file and iter_recipients on synthetic files')
+    loader_parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                               help='Row counts to generate (default: 10000 100000)')
+    loader_parser.add_argument('--format', nargs='+', choices=['csv', 'json', 'jsonl'], default=['csv', 'json'],
+                               help='File formats to generate (default: csv json)')
+    
+    mime_parser = subparsers.add_parser('mime', parents=[output_parser],
+                                        help='Raw message construction: email.mime tree vs RawMessageBuilder')
+    mime_parser.add_argument('--messages', type=int, default=2000, help='Messages to build (default: 2000)')
+    mime_parser.add_argument('--html-kb', type=int, default=30, help='Approximate HTML body size in KB (default: 30)')
+    mime_parser.add_argument('--attachment-kb', type=int, default=100, help='Attachment size in KB (default: 100)')
+    
+    send_parser = subparsers.add_parser('send-loop', parents=[output_parser],
+                                        help='End-to-end send_email_batch against a stub SES client')
+    send_parser.add_argument('--recipients', type=int, default=1000, help='Recipients to send to (default: 1000)')
+    send_parser.add_argument('--workers', type=int, default=8, help='Concurrent send workers (default: 8)')
+    send_parser.add_argument('--latency-ms', type=float, default=20, help='Stub SES response time in ms (default: 20)')
+    send_parser.add_argument('--personalized', action='store_true', help='Render [NAME]/[EMAIL] per recipient')
+    send_parser.add_argument('--pack-bcc', action='store_true', help='Pack identical sends into BCC calls')
+    send_parser.add_argument('--max-send-rate', type=float,
+                             help='Messages per second to pace at (default: unlimited, so only latency and CPU count)')
+    
+    subparsers.add_parser('suite', parents=[output_parser],
+                          help='Run every benchmark at quick sizes (under a minute)')
+    
+    compare_parser = subparsers.add_parser('compare', help='Compare two --json result files and flag slowdowns')
+    compare_parser.add_argument('baseline', help='Results of the reference revision')
+    compare_parser.add_argument('current', help='Results to check')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='Allowed slowdown before a timing counts as a regression (default: 0.10 = 10%%)')
+
+    args = parser.parse_args()
+    
+    if args.benchmark == 'compare':
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+        rows = compare_results(baseline, current, args.threshold)
+        print(f"📊 {baseline['meta'].get('revision') or args.baseline} → {current['meta'].get('revision') or args.current}")
+        for row in rows:
+            marker = '❌' if row['regression'] else '✓'
+            print(f"  {marker} {row['benchmark']} {row['timing']}: {row['baseline']:.4f}s → {row['current']:.4f}s "
+                  f"({row['change']:+.1%})")
+        regressions = [row for row in rows if row['regression']]
+        if not rows:
+            print("⚠️  No timings in common")
+        elif regressions:
+            print(f"❌ {len(regressions)} timing(s) more than {args.threshold:.0%} slower")
+            sys.exit(1)
+        else:
+            print(f"✓ No timing more than {args.threshold:.0%} slower")
+        return
+    
+    results = {}
+    if args.benchmark == 'render':
+        results['render'] = bench_render(args.recipients, args.html_kb)
+    elif args.benchmark == 'cold-start':
+        results['cold-start'] = bench_cold_start(args.runs)
+    elif args.benchmark == 'loader':
+        for file_format in args.format:
+            for rows in args.rows:
+                results[f'loader-{file_format}-{rows}'] = bench_loader(rows, file_format)
+    elif args.benchmark == 'mime':
+        results['mime'] = bench_mime(args.messages, args.html_kb, args.attachment_kb)
+    elif args.benchmark == 'send-loop':
+        results['send-loop'] = bench_send_loop(args.recipients, args.workers, args.latency_ms,
+                                               args.personalized, args.pack_bcc, args.max_send_rate)
+    elif args.benchmark == 'suite':
+        results['render'] = bench_render(20000, 30)
+        for file_format in ('csv', 'json', 'jsonl'):
+            results[f'loader-{file_format}-100000'] = bench_loader(100000, file_format)
+        results['mime'] = bench_mime(2000, 30, 100)
+        results['send-loop'] = bench_send_loop(1000, 8, 20)
+        results['send-loop-personalized'] = bench_send_loop(1000, 8, 20, personalized=True)
+        results['send-loop-pack-bcc'] = bench_send_loop(5000, 8, 20, pack_bcc=True)
+        results['cold-start'] = bench_cold_start(3)
+    
+    for name, result in results.items():
+        print_result(name, result)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'meta': run_metadata(), 'results': results}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+    
+    if any(result.get('lazy_loaded') for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -29,21 +29,17 @@ echo "  Template: $TEMPLATE_NAME"
 echo "  Recipient List: $RECIPIENT_LIST"
 echo ""
 
-# Download files from S3
-echo "📥 Downloading files from S3..."
-aws s3 cp s3://$BUCKET/recipients/$RECIPIENT_LIST /tmp/recipients.csv --region $REGION
-aws s3 cp s3://$BUCKET/templates/${TEMPLATE_NAME}.txt /tmp/email_template.txt --region $REGION
-aws s3 cp s3://$BUCKET/templates/${TEMPLATE_NAME}.html /tmp/email_template.html --region $REGION
+# Files are streamed straight from S3 by ses_emailer.py (nothing is downloaded to /tmp)
+RECIPIENTS_URI="s3://$BUCKET/recipients/$RECIPIENT_LIST"
+TEXT_URI="s3://$BUCKET/templates/${TEMPLATE_NAME}.txt"
+HTML_URI="s3://$BUCKET/templates/${TEMPLATE_NAME}.html"
 
-# Verify files
-if [ ! -f /tmp/recipients.csv ]; then
-    echo "❌ Error: Could not download recipients.csv"
+# Verify files exist
+if ! aws s3 ls "$RECIPIENTS_URI" --region $REGION > /dev/null; then
+    echo "❌ Error: $RECIPIENTS_URI not found"
     exit 1
 fi
-
-# Count recipients
-RECIPIENT_COUNT=$(tail -n +2 /tmp/recipients.csv 2>/dev/null | wc -l | tr -d ' ')
-echo "✅ Found $RECIPIENT_COUNT recipients"
+echo "✅ Recipients: $RECIPIENTS_URI"
 echo ""
 
 # Send emails
@@ -54,14 +50,14 @@ echo ""
 python3 "$SCRIPT_DIR/ses_emailer.py" \
   --sender "$SENDER" \
   --sender-name "$SENDER_NAME" \
-  --recipients-file /tmp/recipients.csv \
+  --recipients-file "$RECIPIENTS_URI" \
   --subject "$SUBJECT" \
-  --body-file /tmp/email_template.txt \
-  --body-html-file /tmp/email_template.html \
+  --body-file "$TEXT_URI" \
+  --body-html-file "$HTML_URI" \
   --region $REGION \
   --batch-size 50 \
   --use-bcc \
-  --rate-limit 0.1
+  --workers 10
 
 echo ""
 echo "✅ Campaign complete!"
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the SES API, for load-testing ses_emailer.py without sending real email
+Speaks the SES Query API (what boto3 uses), so point the emailer at it with --endpoint-url.
+Enforces a send rate and daily quota, injects throttling, failures and latency spikes, and
+records every accepted message.
+"""
+
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from email.header import decode_header, make_header
+from email.parser import BytesHeaderParser
+from email.utils import getaddresses
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+SES_XMLNS = 'http://ses.amazonaws.com/doc/2010-12-01/'
+
+
+class SESError(Exception):
+    """Error returned to the client as an SES ErrorResponse"""
+
+    def __init__(self, code: str, message: str, status: int = 400):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+
+def _members(params: Dict[str, str], prefix: str) -> List[str]:
+    """Values of a Query API list: prefix.member.1, prefix.member.2, ..."""
+    values = []
+    while f'{prefix}.member.{len(values) + 1}' in params:
+        values.append(params[f'{prefix}.member.{len(values) + 1}'])
+    return values
+
+
+def _destination(params: Dict[str, str], prefix: str) -> List[str]:
+    """All To, Cc and Bcc addresses of a Destination structure"""
+    return [address for kind in ('ToAddresses', 'CcAddresses', 'BccAddresses')
+            for address in _members(params, f'{prefix}.{kind}')]
+
+
+def _raw_recipients(data: bytes) -> Tuple[List[str], str]:
+    """Recipients (To, Cc, Bcc headers) and subject of a raw MIME message"""
+    headers = BytesHeaderParser().parsebytes(data)
+    fields = headers.get_all('To', []) + headers.get_all('Cc', []) + headers.get_all('Bcc', [])
+    subject = str(make_header(decode_header(headers.get('Subject', ''))))
+    return [address for _, address in getaddresses(fields) if address], subject
+
+
+class FakeSES:
+    """
+    SES account state shared by all request handler threads
+
+    Args:
+        max_send_rate: Recipients per second accepted before Throttling (0 = unlimited)
+        daily_quota: Recipients accepted in total before the daily quota error (0 = unlimited)
+        latency: Seconds every request takes
+        spike_rate: Fraction of requests that take spike_latency instead
+        spike_latency: Seconds a latency spike takes
+        throttle_rate: Fraction of send requests answered with Throttling regardless of rate
+        failure_rate: Fraction of send requests answered with a 500 InternalFailure
+        record_path: Append every accepted message to this JSON Lines file (optional)
+        seed: Random seed for repeatable fault injection (optional)
+    """
+
+    def __init__(
+        self,
+        max_send_rate: float = 14.0,
+        daily_quota: int = 50000,
+        latency: float = 0.02,
+        spike_rate: float = 0.0,
+        spike_latency: float = 1.0,
+        throttle_rate: float = 0.0,
+        failure_rate: float = 0.0,
+        record_path: Optional[str] = None,
+        seed: Optional[int] = None
+    ):
+        self.max_send_rate = max_send_rate
+        self.daily_quota = daily_quota
+        self.latency = latency
+        self.spike_rate = spike_rate
+        self.spike_latency = spike_latency
+        self.throttle_rate = throttle_rate
+        self.failure_rate = failure_rate
+        self.record_path = record_path
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget recorded messages, templates and counters and refill the rate budget"""
+        with self._lock:
+            self.messages = []
+            self.templates = {}
+            self.sent_recipients = 0
+            self.counters = {}
+            self._tokens = max(self.max_send_rate, 1.0)
+            self._refilled = time.monotonic()
+            self._first_accepted = None
+            self._last_accepted = None
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def _roll(self, probability: float) -> bool:
+        return probability > 0 and self._random.random() < probability
+
+    def delay(self) -> float:
+        """Seconds the next response should be held back (base latency or a spike)"""
+        with self._lock:
+            spike = self._roll(self.spike_rate)
+            if spike:
+                self._count('latency_spikes')
+        return self.spike_latency if spike else self.latency
+
+    def admit(self, recipients: int) -> None:
+        """
+        Apply fault injection, the daily quota and the send rate to one send request
+
+        Args:
+            recipients: Recipients the message (or bulk call) goes to
+
+        Raises:
+            SESError: The request is rejected; nothing is recorded
+        """
+        with self._lock:
+            self._count('send_requests')
+            if self._roll(self.failure_rate):
+                self._count('injected_failures')
+                raise SESError('InternalFailure', 'An internal failure occurred.', status=500)
+            if self._roll(self.throttle_rate):
+                self._count('injected_throttles')
+                raise SESError('Throttling', 'Maximum sending rate exceeded.')
+            if self.daily_quota and self.sent_recipients + recipients > self.daily_quota:
+                self._count('quota_rejections')
+                raise SESError('Throttling', 'Daily message quota exceeded.')
+            if self.max_send_rate:
+                # Token bucket holding one second of sends; a message bigger than the bucket
+                # goes through once the bucket is full and leaves it in debt
+                now = time.monotonic()
+                capacity = max(self.max_send_rate, 1.0)
+                self._tokens = min(capacity, self._tokens + (now - self._refilled) * self.max_send_rate)
+                self._refilled = now
+                if self._tokens < min(recipients, capacity):
+                    self._count('rate_throttles')
+                    raise SESError('Throttling', 'Maximum sending rate exceeded.')
+                self._tokens -= recipients
+            self.sent_recipients += recipients
+            self._count('accepted_requests')
+
+    def record(self, action: str, source: str, recipients: List[str], subject: str) -> str:
+        """Store an accepted message and return its MessageId"""
+        message_id = f'{uuid.uuid4().hex}-000000'
+        entry = {
+            'message_id': message_id,
+            'action': action,
+            'source': source,
+            'recipients': recipients,
+            'subject': subject,
+            'timestamp': round(time.time(), 6)
+        }
+        with self._lock:
+            self.messages.append(entry)
+            self._count('accepted_messages')
+            self._count('accepted_recipients', len(recipients))
+            self._first_accepted = self._first_accepted or entry['timestamp']
+            self._last_accepted = entry['timestamp']
+            if self.record_path:
+                with open(self.record_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+        return message_id
+
+    def stats(self) -> Dict:
+        """Counters plus the rate accepted recipients actually arrived at"""
+        with self._lock:
+            stats = dict(self.counters)
+            elapsed = (self._last_accepted or 0) - (self._first_accepted or 0)
+            stats.update(
+                max_send_rate=self.max_send_rate,
+                daily_quota=self.daily_quota,
+                sent_last_24_hours=self.sent_recipients,
+                accepted_seconds=round(elapsed, 3),
+                accepted_rate=round(stats.get('accepted_recipients', 0) / elapsed, 2) if elapsed else None
+            )
+        return stats
+
+    def handle(self, params: Dict[str, str]) -> str:
+        """
+        Run one Query API action
+
+        Args:
+            params: Decoded form parameters of the request
+
+        Returns:
+            Inner XML of the <ActionResult> element
+        """
+        action = params.get('Action', '')
+        with self._lock:
+            self._count(f'action_{action}')
+
+        if action == 'GetSendQuota':
+            with self._lock:
+                sent = self.sent_recipients
+            return (f'<SentLast24Hours>{float(sent)}</SentLast24Hours>'
+                    f'<Max24HourSend>{float(self.daily_quota or 1e9)}</Max24HourSend>'
+                    f'<MaxSendRate>{float(self.max_send_rate or 1e6)}</MaxSendRate>')
+        if action == 'VerifyEmailIdentity':
+            return ''
+        if action in ('CreateTemplate', 'UpdateTemplate'):
+            name = params.get('Template.TemplateName', '')
+            with self._lock:
+                exists = name in self.templates
+                if action == 'CreateTemplate' and exists:
+                    raise SESError('AlreadyExists', f'Template {name} already exists.')
+                if action == 'UpdateTemplate' and not exists:
+                    raise SESError('TemplateDoesNotExist', f'Template {name} does not exist.')
+                self.templates[name] = {part: params.get(f'Template.{part}', '')
+                                        for part in ('TemplateName', 'SubjectPart', 'TextPart', 'HtmlPart')}
+            return ''
+        if action == 'GetTemplate':
+            template = self.templates.get(params.get('TemplateName', ''))
+            if template is None:
+                raise SESError('TemplateDoesNotExist', f"Template {params.get('TemplateName')} does not exist.")
+            return '<Template>' + ''.join(f'<{part}>{escape(value)}</{part}>' for part, value in template.items()) + '</Template>'
+        if action == 'DeleteTemplate':
+            with self._lock:
+                self.templates.pop(params.get('TemplateName', ''), None)
+            return ''
+
+        source = params.get('Source', '')
+        if action == 'SendEmail':
+            recipients = _destination(params, 'Destination')
+            self.admit(len(recipients))
+            message_id = self.record(action, source, recipients, params.get('Message.Subject.Data', ''))
+            return f'<MessageId>{message_id}</MessageId>'
+        if action == 'SendRawEmail':
+            header_recipients, subject = _raw_recipients(base64.b64decode(params.get('RawMessage.Data', '')))
+            recipients = _members(params, 'Destinations') or header_recipients
+            self.admit(len(recipients))
+            message_id = self.record(action, source, recipients, subject)
+            return f'<MessageId>{message_id}</MessageId>'
+        if action in ('SendTemplatedEmail', 'SendBulkTemplatedEmail'):
+            name = params.get('Template', '')
+            if name not in self.templates:
+                raise SESError('TemplateDoesNotExist', f'Template {name} does not exist.')
+            if action == 'SendTemplatedEmail':
+                recipients = _destination(params, 'Destination')
+                self.admit(len(recipients))
+                return f'<MessageId>{self.record(action, source, recipients, name)}</MessageId>'
+            destinations = []
+            while f'Destinations.member.{len(destinations) + 1}.Destination.ToAddresses.member.1' in params:
+                destinations.append(_destination(params, f'Destinations.member.{len(destinations) + 1}.Destination'))
+            self.admit(sum(len(d) for d in destinations))
+            statuses = ''.join(
+                f'<member><Status>Success</Status><MessageId>{self.record(action, source, d, name)}</MessageId></member>'
+                for d in destinations
+            )
+            return f'<Status>{statuses}</Status>'
+        raise SESError('InvalidAction', f'The action {action} is not valid for this endpoint.')
+
+
+class FakeSESHandler(BaseHTTPRequestHandler):
+    """
+    POST / runs an SES action; GET /stats and GET /messages return JSON, POST /reset clears state
+    """
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, like SES, so botocore's connection pool is exercised
+
+    @property
+    def ses(self) -> FakeSES:
+        return self.server.ses
+
+    def log_message(self, format, *args):
+        # One line per request would swamp a load test
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status: int, body: str, content_type: str = 'text/xml') -> None:
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/stats':
+            self._reply(200, json.dumps(self.ses.stats()), 'application/json')
+        elif path == '/messages':
+            with self.ses._lock:
+                messages = list(self.ses.messages)
+            self._reply(200, json.dumps(messages), 'application/json')
+        else:
+            self._reply(404, json.dumps({'error': 'GET /stats or /messages'}), 'application/json')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode('utf-8')
+        if urlparse(self.path).path == '/reset':
+            self.ses.reset()
+            self._reply(200, json.dumps({'reset': True}), 'application/json')
+            return
+
+        params = {key: values[0] for key, values in parse_qs(body, keep_blank_values=True).items()}
+        action = params.get('Action', '')
+        request_id = str(uuid.uuid4())
+        time.sleep(self.ses.delay())
+        try:
+            result = self.ses.handle(params)
+        except SESError as e:
+            error_type = 'Receiver' if e.status >= 500 else 'Sender'
+            self._reply(e.status, (
+                f'<ErrorResponse xmlns="{SES_XMLNS}"><Error><Type>{error_type}</Type><Code>{e.code}</Code>'
+                f'<Message>{escape(e.message)}</Message></Error><RequestId>{request_id}</RequestId></ErrorResponse>'
+            ))
+            return
+        self._reply(200, (
+            f'<{action}Response xmlns="{SES_XMLNS}"><{action}Result>{result}</{action}Result>'
+            f'<ResponseMetadata><RequestId>{request_id}</RequestId></ResponseMetadata></{action}Response>'
+        ))
+
+
+class FakeSESServer(ThreadingHTTPServer):
+    """Threaded HTTP server around a FakeSES instance"""
+
+    daemon_threads = True
+    request_queue_size = 256  # many workers connect at once
+
+    def __init__(self, address: Tuple[str, int], ses: FakeSES, verbose: bool = False):
+        super().__init__(address, FakeSESHandler)
+        self.ses = ses
+        self.verbose = verbose
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+def start_server(ses: FakeSES, host: str = '127.0.0.1', port: int = 0) -> FakeSESServer:
+    """
+    Serve ses in a background thread
+
+    Args:
+        ses: Account state and fault settings
+        host: Interface to listen on
+        port: Port to listen on (default: any free port; see the returned server's url)
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    server = FakeSESServer((host, port), ses)
+    threading.Thread(target=server.serve_forever, name='fake-ses', daemon=True).start()
+    return server
+
+
+def main():
+    """Main function to run the fake SES server"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Local fake SES endpoint for load tests (nothing is delivered)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # SES-like account: 14 emails/second, 50,000 per day, 20 ms responses
+  python fake_ses_server.py --port 8025
+  python ses_emailer.py --endpoint-url http://127.0.0.1:8025 --sender me@example.com --recipients-file list.csv --subject "Hi" --body "Test" --workers 8
+
+  # Under pressure: 5% injected Throttling, 1% 500 errors, 2% of responses take 2 seconds
+  python fake_ses_server.py --throttle-rate 0.05 --failure-rate 0.01 --spike-rate 0.02 --spike-ms 2000
+
+  # Inspect what arrived
+  curl http://127.0.0.1:8025/stats
+  curl http://127.0.0.1:8025/messages
+        """
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8025, help='Port to listen on (default: 8025)')
+    parser.add_argument('--max-send-rate', type=float, default=14.0, help='Recipients per second before Throttling (default: 14, 0 = unlimited)')
+    parser.add_argument('--daily-quota', type=int, default=50000, help='Recipients per run before "Daily message quota exceeded" (default: 50000, 0 = unlimited)')
+    parser.add_argument('--latency-ms', type=float, default=20, help='Response time of every request in ms (default: 20)')
+    parser.add_argument('--spike-rate', type=float, default=0.0, help='Fraction of requests with a latency spike (default: 0)')
+    parser.add_argument('--spike-ms', type=float, default=1000, help='Response time of a latency spike in ms (default: 1000)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of send requests answered with Throttling regardless of rate (default: 0)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of send requests answered with a 500 InternalFailure (default: 0)')
+    parser.add_argument('--record', help='Append every accepted message to this JSON Lines file')
+    parser.add_argument('--seed', type=int, help='Random seed for repeatable fault injection')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+
+    args = parser.parse_args()
+
+    ses = FakeSES(
+        max_send_rate=args.max_send_rate,
+        daily_quota=args.daily_quota,
+        latency=args.latency_ms / 1000,
+        spike_rate=args.spike_rate,
+        spike_latency=args.spike_ms / 1000,
+        throttle_rate=args.throttle_rate,
+        failure_rate=args.failure_rate,
+        record_path=args.record,
+        seed=args.seed
+    )
+    server = FakeSESServer((args.host, args.port), ses, verbose=args.verbose)
+    print(f"📮 Fake SES listening on {server.url} ({args.max_send_rate:g} emails/second, daily quota {args.daily_quota:,})")
+    print(f"   Stats: {server.url}/stats  Messages: {server.url}/messages")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = ses.stats()
+        print(f"\n📊 Accepted {stats.get('accepted_recipients', 0):,} recipients in {stats.get('accepted_requests', 0):,} requests")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,14 +3,114 @@ AWS Lambda handler for sending emails via SES
 Designed to work with S3-stored templates and recipient lists
 """
 
+import copy
 import json
 import boto3
-import os
-import tempfile
-from ses_emailer import SESEmailer, load_recipients_from_file
+import itertools
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from botocore.exceptions import ClientError
+from ses_emailer import EmailTemplates, MetricsRegistry, SESEmailer, iter_recipient_lines, iter_recipients, merge_send_results
 
 s3_client = boto3.client('s3')
 
+# Bytes read around each chunk boundary when looking for the next line break
+BOUNDARY_PROBE_BYTES = 4096
+
+# Throttled retries a recipient gets across continuations before it counts as failed
+# (each invocation's RetryQueue starts from zero, so the count travels in the payload)
+MAX_RETRY_ATTEMPTS = 5
+
+# Clients are reused across warm invocations: building a boto3 client takes tens of
+# milliseconds, and a cached emailer also keeps its send quota lookup and rate limiter
+_emailers = {}
+_lambda_clients = {}
+
+# Template text per (bucket, key), revalidated by ETag; compiled templates per (subject, text ETag, HTML ETag)
+_template_cache = {}
+_compiled_templates = {}
+MAX_COMPILED_TEMPLATES = 32
+
+
+def get_emailer(region: str, max_send_rate: Optional[float] = None) -> SESEmailer:
+    """
+    SESEmailer for a region, cached in the warm container
+    
+    Args:
+        region: AWS region
+        max_send_rate: Emails/second for this invocation (None: the account's MaxSendRate)
+        
+    Returns:
+        Copy of the cached (or new) SESEmailer with the requested send rate and fresh metrics
+    """
+    emailer = _emailers.get(region)
+    if emailer is None:
+        emailer = _emailers[region] = SESEmailer(region_name=region)
+    emailer.set_max_send_rate(max_send_rate)
+    # Create the rate limiter (one send quota lookup) on the cached emailer itself: created
+    # lazily on a copy, it would be thrown away and looked up again on every invocation
+    emailer.rate_limiter
+    # Metrics describe a single invocation, not everything the warm container has sent;
+    # the copy shares the cached client and rate limiter (and works for concurrent local runs)
+    invocation_emailer = copy.copy(emailer)
+    invocation_emailer.metrics = MetricsRegistry()
+    return invocation_emailer
+
+
+def read_template(bucket: str, key: str, s3=None) -> Tuple[str, str]:
+    """
+    Read a template from S3, reusing the warm container's copy while its ETag is unchanged
+    
+    A cached template is revalidated with a conditional GET (If-None-Match), so an
+    unchanged template costs one round trip and no body transfer.
+    
+    Args:
+        bucket: S3 bucket
+        key: Template object key
+        s3: S3 client (default: the module's client)
+        
+    Returns:
+        Tuple of (template text, ETag)
+    """
+    s3 = s3 or s3_client
+    cached = _template_cache.get((bucket, key))
+    try:
+        if cached:
+            response = s3.get_object(Bucket=bucket, Key=key, IfNoneMatch=cached[1])
+        else:
+            response = s3.get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if cached and (e.response['Error'].get('Code') in ('304', 'NotModified')
+                       or e.response.get('ResponseMetadata', {}).get('HTTPStatusCode') == 304):
+            print(f"Template s3://{bucket}/{key} unchanged (ETag {cached[1]}), using cached copy")
+            return cached
+        raise
+    text = response['Body'].read().decode('utf-8')
+    _template_cache[(bucket, key)] = (text, response['ETag'])
+    print(f"Read template s3://{bucket}/{key} ({len(text)} chars)")
+    return text, response['ETag']
+
+
+def get_compiled_templates(subject: str, body_text: str, text_etag: str,
+                           body_html: Optional[str] = None, html_etag: Optional[str] = None) -> EmailTemplates:
+    """EmailTemplates for this subject and template versions, compiled once per warm container"""
+    cache_key = (subject, text_etag, html_etag)
+    templates = _compiled_templates.get(cache_key)
+    if templates is None:
+        if len(_compiled_templates) >= MAX_COMPILED_TEMPLATES:
+            _compiled_templates.clear()
+        templates = _compiled_templates[cache_key] = EmailTemplates(subject, body_text, body_html)
+    return templates
+
+
+def get_lambda_client(region: str):
+    """Lambda client for a region, cached in the warm container"""
+    if region not in _lambda_clients:
+        _lambda_clients[region] = boto3.client('lambda', region_name=region)
+    return _lambda_clients[region]
+
+
 def lambda_handler(event, context):
     """
     Lambda handler for sending mass emails
@@ -26,7 +126,25 @@ def lambda_handler(event, context):
         "subject": "Your email subject",
         "region": "us-west-2",
         "batch_size": 50,
-        "use_bcc": true
+        "use_bcc": true,
+        "pack_bcc": false,                  # up to 49 BCC recipients per API call
+        "max_fatal_errors": 3,              # stop after this many account/identity errors in a row
+        
+        # Optional, set by the orchestrator: send only this byte range of the recipients object
+        "recipients_range": [start, end],  # inclusive, line-aligned
+        "recipients_format": "csv",         # or "jsonl"
+        "csv_header": "email,name",
+        "max_send_rate": 2.0,               # this invocation's share of the account's MaxSendRate
+        
+        # Optional time budget: stop this long before the Lambda timeout and return a
+        # continuation payload (re-invoked asynchronously if continue_async is true)
+        "time_margin_seconds": 60,
+        "continue_async": false,
+        
+        # Set in continuation payloads
+        "recipients_offset": 0,             # recipients already taken from the list
+        "retry_recipients": [],             # throttled sends to retry first: {"recipient", "attempts"}
+        "totals": {}                        # running totals of earlier invocations
     }
     """
     
@@ -42,6 +160,14 @@ def lambda_handler(event, context):
         region = event.get('region', 'us-west-2')
         batch_size = event.get('batch_size', 50)
         use_bcc = event.get('use_bcc', True)
+        pack_bcc = event.get('pack_bcc', False)
+        max_fatal_errors = event.get('max_fatal_errors', 3)
+        recipients_range = event.get('recipients_range')
+        max_send_rate = event.get('max_send_rate')
+        recipients_offset = event.get('recipients_offset', 0)
+        retry_entries = event.get('retry_recipients') or []
+        retry_recipients = [entry['recipient'] for entry in retry_entries]
+        time_margin = float(event.get('time_margin_seconds', 60))
         
         # Validate required parameters
         if not all([sender, s3_bucket, recipients_key, template_text_key, subject]):
@@ -53,44 +179,37 @@ def lambda_handler(event, context):
                 })
             }
         
-        # Create temp directory
-        temp_dir = tempfile.mkdtemp()
-        
-        # Download files from S3
-        recipients_file = os.path.join(temp_dir, 'recipients.csv')
-        body_text_file = os.path.join(temp_dir, 'email_template.txt')
-        body_html_file = None
-        
-        print(f"Downloading recipients from s3://{s3_bucket}/{recipients_key}")
-        s3_client.download_file(s3_bucket, recipients_key, recipients_file)
-        
-        print(f"Downloading text template from s3://{s3_bucket}/{template_text_key}")
-        s3_client.download_file(s3_bucket, template_text_key, body_text_file)
-        
+        # Templates are small: read them whole, straight from S3 (cached while unchanged)
+        body_text, text_etag = read_template(s3_bucket, template_text_key)
+        body_html, html_etag = None, None
         if template_html_key:
-            body_html_file = os.path.join(temp_dir, 'email_template.html')
-            print(f"Downloading HTML template from s3://{s3_bucket}/{template_html_key}")
-            s3_client.download_file(s3_bucket, template_html_key, body_html_file)
-        
-        # Load recipients
-        print("Loading recipients...")
-        recipients = load_recipients_from_file(recipients_file)
-        print(f"Loaded {len(recipients)} recipients")
+            body_html, html_etag = read_template(s3_bucket, template_html_key)
+        templates = get_compiled_templates(subject, body_text, text_etag, body_html, html_etag)
         
-        # Read templates
-        with open(body_text_file, 'r', encoding='utf-8') as f:
-            body_text = f.read()
-        
-        body_html = None
-        if body_html_file and os.path.exists(body_html_file):
-            with open(body_html_file, 'r', encoding='utf-8') as f:
-                body_html = f.read()
+        # Recipients are streamed from the get_object body: sending starts with the first rows
+        if recipients_range:
+            start, end = recipients_range
+            print(f"Reading bytes {start}-{end} of s3://{s3_bucket}/{recipients_key}")
+            recipients = load_recipients_range(s3_bucket, recipients_key, start, end,
+                                               event.get('recipients_format', 'csv'), event.get('csv_header'))
+        else:
+            print(f"Streaming recipients from s3://{s3_bucket}/{recipients_key}")
+            recipients = iter_recipients(f"s3://{s3_bucket}/{recipients_key}", s3_client=s3_client)
+        if recipients_offset or retry_recipients:
+            print(f"Continuing at recipient {recipients_offset} with {len(retry_recipients)} retries")
+        recipients = itertools.chain(retry_recipients, itertools.islice(recipients, recipients_offset, None))
         
         # Initialize emailer
-        emailer = SESEmailer(region_name=region)
+        emailer = get_emailer(region, max_send_rate)
+        
+        # Stop while there is still time to report back (context is None when run locally)
+        should_stop = None
+        if context is not None:
+            def should_stop() -> bool:
+                return context.get_remaining_time_in_millis() < time_margin * 1000
         
         # Send emails
-        print(f"Sending emails to {len(recipients)} recipients...")
+        print("Sending emails...")
         result = emailer.send_email_batch(
             sender=sender,
             recipients=recipients,
@@ -99,22 +218,66 @@ def lambda_handler(event, context):
             body_html=body_html,
             batch_size=batch_size,
             use_bcc=use_bcc,
-            rate_limit=0.1,
-            sender_name=sender_name
+            pack_bcc=pack_bcc,
+            max_fatal_errors=max_fatal_errors,
+            sender_name=sender_name,
+            collect_results=False,
+            should_stop=should_stop,
+            templates=templates
         )
         
-        # Cleanup temp files
-        import shutil
-        shutil.rmtree(temp_dir)
+        totals = dict(event.get('totals') or {})
+        for key in ('successful', 'failed', 'batches', 'retries'):
+            totals[key] = totals.get(key, 0) + result.get(key, 0)
+        totals['invocations'] = totals.get('invocations', 0) + 1
+        
+        continuation = None
+        if result.get('stopped'):
+            # 'total' counts what was taken from the list: retries first, then the remaining recipients
+            taken = result['total']
+            carried, exhausted = carry_retry_recipients(retry_entries, taken, result.get('unsent', []),
+                                                        result.get('unsent_attempts', []))
+            if exhausted:
+                # Still throttled after MAX_RETRY_ATTEMPTS: fail them rather than re-invoke forever
+                print(f"✗ {exhausted} recipient(s) still throttled after {MAX_RETRY_ATTEMPTS} retries; counted as failed")
+                totals['failed'] = totals.get('failed', 0) + exhausted
+            continuation = dict(
+                event,
+                recipients_offset=recipients_offset + max(0, taken - len(retry_recipients)),
+                retry_recipients=carried,
+                totals=totals
+            )
+            circuit_open = result.get('circuit_open')
+            if circuit_open:
+                # Every further send would fail the same way: keep the continuation for a manual
+                # resume once the account/identity is fixed, but don't chain another invocation
+                print(f"⛔ Stopped by circuit breaker; resume from recipient {continuation['recipients_offset']} once fixed")
+            else:
+                print(f"⏱️  Time budget reached; continuing at recipient {continuation['recipients_offset']}")
+            if event.get('continue_async') and context is not None and not circuit_open:
+                get_lambda_client(region).invoke(
+                    FunctionName=context.invoked_function_arn,
+                    InvocationType='Event',
+                    Payload=json.dumps(continuation).encode('utf-8')
+                )
+                print("🔁 Re-invoked to continue the list")
         
         return {
             'statusCode': 200,
             'body': json.dumps({
-                'success': result['success'],
-                'total': result['total'],
-                'successful': result['successful'],
-                'failed': result['failed'],
-                'batches': result.get('batches', 0)
+                'success': totals['failed'] == 0,
+                'complete': continuation is None,
+                'total': totals['successful'] + totals['failed'],
+                'successful': totals['successful'],
+                'failed': totals['failed'],
+                'batches': totals['batches'],
+                'retries': totals['retries'],
+                'invocations': totals['invocations'],
+                'not_attempted': result.get('not_attempted', 0),
+                'circuit_open': result.get('circuit_open'),
+                'metrics': emailer.metrics.snapshot(),
+                'recipients_range': recipients_range,
+                'continuation': continuation
             })
         }
         
@@ -131,3 +294,323 @@ def lambda_handler(event, context):
             })
         }
 
+
+
+def carry_retry_recipients(retry_entries: List[Dict], taken: int, unsent: List,
+                           unsent_attempts: List[int]) -> Tuple[List[Dict], int]:
+    """
+    Build a continuation's retry_recipients, carrying each recipient's retry count
+    
+    Args:
+        retry_entries: This invocation's retry_recipients ({'recipient', 'attempts'} dicts)
+        taken: Recipients send_email_batch took from the stream (retry entries come first)
+        unsent: Recipients send_email_batch handed back
+        unsent_attempts: Retries each handed-back recipient had in this invocation
+        
+    Returns:
+        Tuple of (retry entries for the continuation, recipients that used up MAX_RETRY_ATTEMPTS)
+    """
+    def address(recipient) -> str:
+        return (recipient['email'] if isinstance(recipient, dict) else recipient).strip().lower()
+    
+    earlier = {address(entry['recipient']): entry['attempts'] for entry in retry_entries[:taken]}
+    carried = list(retry_entries[taken:])
+    exhausted = 0
+    for recipient, attempts in zip(unsent, unsent_attempts):
+        attempts += earlier.get(address(recipient), 0)
+        if attempts >= MAX_RETRY_ATTEMPTS:
+            exhausted += 1
+        else:
+            carried.append({'recipient': recipient, 'attempts': attempts})
+    return carried, exhausted
+
+
+def load_recipients_range(bucket: str, key: str, start: int, end: int,
+                          recipients_format: str = 'csv', csv_header: Optional[str] = None) -> List[str]:
+    """
+    Load the recipients in one line-aligned byte range of an S3 object
+    
+    Args:
+        bucket: S3 bucket
+        key: Recipients object key (CSV or JSON Lines)
+        start: First byte of the range
+        end: Last byte of the range (inclusive)
+        recipients_format: 'csv' or 'jsonl'
+        csv_header: Header row of the CSV, prepended so columns resolve as in the full file
+        
+    Returns:
+        List of email addresses
+    """
+    response = s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")
+    lines = response['Body'].read().decode('utf-8').splitlines(keepends=True)
+    if recipients_format == 'csv' and csv_header:
+        lines.insert(0, csv_header + '\n')
+    return list(iter_recipient_lines(lines, recipients_format))
+
+
+def plan_chunk_count(object_bytes: int, avg_line_bytes: float, max_send_rate: float,
+                     max_in_flight: int, seconds_per_invocation: float) -> int:
+    """
+    Number of chunks to split a recipients object into
+    
+    Concurrent invocations split the account's MaxSendRate between them, so each
+    chunk is sized to what one invocation can send at its share of the rate
+    within its time budget.
+    
+    Args:
+        object_bytes: Size of the recipients data in bytes
+        avg_line_bytes: Average bytes per recipient line
+        max_send_rate: Account MaxSendRate (emails/second)
+        max_in_flight: Maximum concurrent invocations
+        seconds_per_invocation: Sending time budget per invocation
+        
+    Returns:
+        Chunk count (at least 1)
+    """
+    per_invocation_rate = max_send_rate / max_in_flight
+    recipients_per_chunk = max(1, int(per_invocation_rate * seconds_per_invocation))
+    return max(1, math.ceil(object_bytes / (recipients_per_chunk * max(1.0, avg_line_bytes))))
+
+
+def _read_range(s3, bucket: str, key: str, start: int, end: int) -> bytes:
+    return s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")['Body'].read()
+
+
+def split_recipients_object(bucket: str, key: str, chunks: Optional[int] = None,
+                            plan: Optional[Callable[[int, float], int]] = None, s3=None) -> Dict:
+    """
+    Split a CSV or JSON Lines recipients object into line-aligned byte ranges
+    
+    Only the first few KB and a small probe around each boundary are read, never
+    the whole object. Quoted CSV fields spanning lines are not supported.
+    
+    Args:
+        bucket: S3 bucket
+        key: Recipients object key
+        chunks: Number of chunks (default: plan(data_bytes, avg_line_bytes))
+        plan: Chunk count planner, called with the data size and average line length
+        s3: S3 client (default: the module's client)
+        
+    Returns:
+        Dictionary with 'format', 'csv_header', 'ranges' (inclusive (start, end) tuples),
+        'data_bytes' and 'estimated_recipients'
+    """
+    s3 = s3 or s3_client
+    if key.lower().endswith('.json'):
+        raise ValueError("JSON array recipient files can't be split by byte range; use CSV or JSON Lines (.jsonl)")
+    recipients_format = 'jsonl' if key.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+    
+    size = s3.head_object(Bucket=bucket, Key=key)['ContentLength']
+    if size == 0:
+        return {'format': recipients_format, 'csv_header': None, 'ranges': [], 'data_bytes': 0, 'estimated_recipients': 0}
+    sample = _read_range(s3, bucket, key, 0, min(size, 65536) - 1)
+    
+    # CSV header: kept out of the ranges and passed to every chunk instead
+    csv_header = None
+    data_start = 0
+    if recipients_format == 'csv':
+        first_line = sample.split(b'\n', 1)[0]
+        if b'@' in first_line:
+            csv_header = 'email,name'  # no header row; name the first two columns for the parser
+        else:
+            csv_header = first_line.decode('utf-8-sig').rstrip('\r')
+            data_start = len(first_line) + 1
+    
+    sample_lines = sample[data_start:].split(b'\n')
+    if len(sample_lines) > 1 and len(sample) < size:
+        sample_lines = sample_lines[:-1]  # last line may be cut off
+    sample_lines = [line for line in sample_lines if line.strip()]
+    avg_line_bytes = sum(len(line) + 1 for line in sample_lines) / len(sample_lines) if sample_lines else 1.0
+    data_bytes = max(0, size - data_start)
+    
+    if chunks is None:
+        chunks = plan(data_bytes, avg_line_bytes) if plan else 1
+    
+    boundaries = [data_start]
+    for i in range(1, chunks):
+        target = data_start + data_bytes * i // chunks
+        if target <= boundaries[-1]:
+            continue
+        # The next chunk starts right after the first line break at or after target - 1
+        probe_start = target - 1
+        boundary = None
+        while probe_start < size:
+            probe = _read_range(s3, bucket, key, probe_start, min(size, probe_start + BOUNDARY_PROBE_BYTES) - 1)
+            newline = probe.find(b'\n')
+            if newline != -1:
+                boundary = probe_start + newline + 1
+                break
+            probe_start += len(probe)
+        if boundary is None or boundary >= size:
+            break
+        if boundary > boundaries[-1]:
+            boundaries.append(boundary)
+    boundaries.append(size)
+    
+    ranges = [(start, end - 1) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+    return {
+        'format': recipients_format,
+        'csv_header': csv_header,
+        'ranges': ranges,
+        'data_bytes': data_bytes,
+        'estimated_recipients': int(data_bytes / avg_line_bytes)
+    }
+
+
+def invoke_lambda(function_name: str, region: str) -> Callable[[Dict], Dict]:
+    """Build an invoke function that calls the worker Lambda synchronously"""
+    lambda_client = get_lambda_client(region)
+    
+    def invoke(payload: Dict) -> Dict:
+        response = lambda_client.invoke(
+            FunctionName=function_name,
+            InvocationType='RequestResponse',
+            Payload=json.dumps(payload).encode('utf-8')
+        )
+        return json.loads(response['Payload'].read())
+    
+    return invoke
+
+
+def orchestrate(event: Dict, invoke: Optional[Callable[[Dict], Dict]] = None, s3=None, ses=None) -> Dict:
+    """
+    Fan one large recipients object out over concurrent lambda_handler invocations
+    
+    The object is split into line-aligned byte ranges sized from the account's
+    send quota, and each range is sent by one invocation with its share of the
+    MaxSendRate. At most max_in_flight invocations run at once.
+    
+    Expected event structure: the lambda_handler event, plus
+    {
+        "worker_function": "email-sender",  # Lambda to invoke (default: invoke must be given)
+        "max_in_flight": 10,                 # concurrent invocations
+        "seconds_per_invocation": 600,       # sending time budget per invocation
+        "chunks": null                       # override the planned chunk count
+    }
+    
+    Args:
+        event: Orchestrator event
+        invoke: Function taking a worker payload and returning the handler response
+                (default: invoke event['worker_function'] with boto3; pass
+                lambda p: lambda_handler(p, None) to run everything in-process)
+        s3: S3 client (default: the module's client)
+        ses: SES client used to read the send quota (default: a new client for event['region'])
+        
+    Returns:
+        Merged summary with per-chunk responses
+    """
+    region = event.get('region', 'us-west-2')
+    bucket = event['s3_bucket']
+    key = event['recipients_key']
+    max_in_flight = max(1, int(event.get('max_in_flight', 10)))
+    seconds_per_invocation = float(event.get('seconds_per_invocation', 600))
+    
+    if invoke is None:
+        if not event.get('worker_function'):
+            raise ValueError("worker_function is required unless an invoke function is given")
+        invoke = invoke_lambda(event['worker_function'], region)
+    
+    ses = ses or boto3.client('ses', region_name=region)
+    quota = ses.get_send_quota()
+    max_send_rate = float(quota['MaxSendRate'])
+    remaining_today = float(quota['Max24HourSend']) - float(quota['SentLast24Hours'])
+    
+    split = split_recipients_object(
+        bucket, key,
+        chunks=event.get('chunks'),
+        plan=lambda data_bytes, avg_line_bytes: plan_chunk_count(
+            data_bytes, avg_line_bytes, max_send_rate, max_in_flight, seconds_per_invocation
+        ),
+        s3=s3
+    )
+    ranges = split['ranges']
+    in_flight = min(max_in_flight, len(ranges)) or 1
+    per_invocation_rate = max_send_rate / in_flight
+    
+    print(f"🔀 s3://{bucket}/{key}: ~{split['estimated_recipients']} recipients in {len(ranges)} chunk(s), "
+          f"{in_flight} in flight at {per_invocation_rate:.2f} emails/second each")
+    if split['estimated_recipients'] > remaining_today:
+        print(f"⚠️  Estimated recipients exceed the remaining 24-hour quota ({int(remaining_today)})")
+    
+    orchestrator_keys = ('worker_function', 'max_in_flight', 'seconds_per_invocation', 'chunks')
+    base_payload = {k: v for k, v in event.items() if k not in orchestrator_keys}
+    
+    def run_chunk(index_range: Tuple[int, Tuple[int, int]]) -> Dict:
+        index, (start, end) = index_range
+        payload = dict(base_payload,
+                       recipients_range=[start, end],
+                       recipients_format=split['format'],
+                       csv_header=split['csv_header'],
+                       max_send_rate=per_invocation_rate,
+                       continue_async=False)
+        # Each invocation reports its own metrics; add up the chunk's continuations
+        chunk_metrics = MetricsRegistry()
+        try:
+            while True:
+                response = invoke(payload)
+                body = json.loads(response['body']) if isinstance(response.get('body'), str) else response.get('body', {})
+                status = response.get('statusCode', 500)
+                if body.get('metrics'):
+                    chunk_metrics.merge(body['metrics'])
+                    body['metrics'] = chunk_metrics.snapshot()
+                if status != 200 or not body.get('continuation') or body.get('circuit_open'):
+                    break
+                # The invocation ran out of time; pick up where it stopped (totals carry over)
+                payload = body['continuation']
+        except Exception as e:
+            status, body = 500, {'error': str(e), 'type': type(e).__name__}
+        print(f"  Chunk {index + 1}/{len(ranges)} (bytes {start}-{end}): status {status}")
+        return {'chunk': index + 1, 'range': [start, end], 'statusCode': status, 'body': body}
+    
+    with ThreadPoolExecutor(max_workers=in_flight) as executor:
+        chunk_results = list(executor.map(run_chunk, enumerate(ranges)))
+    
+    completed = [c['body'] for c in chunk_results if c['statusCode'] == 200]
+    summary = merge_send_results(completed) if completed else {'success': False, 'total': 0, 'successful': 0, 'failed': 0}
+    summary.pop('results', None)
+    failed_chunks = [c for c in chunk_results if c['statusCode'] != 200]
+    summary['success'] = summary['success'] and not failed_chunks
+    summary['chunks'] = len(ranges)
+    summary['failed_chunks'] = [c['range'] for c in failed_chunks]
+    summary['chunk_results'] = chunk_results
+    
+    print(f"\n📊 Orchestrator Summary:")
+    print(f"  Chunks: {len(ranges)} ({len(failed_chunks)} failed)")
+    print(f"  Successful: {summary.get('successful', 0)}")
+    print(f"  Failed: {summary.get('failed', 0)}")
+    if summary.get('circuit_open'):
+        print(f"  ⛔ Stopped by circuit breaker: {summary['circuit_open']} (see each chunk's continuation to resume)")
+    return summary
+
+
+def orchestrator_handler(event, context):
+    """
+    Lambda entry point for the orchestrator (handler: lambda_handler.orchestrator_handler)
+    
+    event['worker_function'] names the sending Lambda (handler: lambda_handler.lambda_handler).
+    """
+    try:
+        summary = orchestrate(event)
+        summary.pop('chunk_results', None)
+        return {'statusCode': 200, 'body': json.dumps(summary)}
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return {'statusCode': 500, 'body': json.dumps({'error': str(e), 'type': type(e).__name__})}
+
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Fan a recipients object in S3 out over concurrent email Lambda invocations')
+    parser.add_argument('event_file', help='JSON file with the orchestrator event')
+    parser.add_argument('--local', action='store_true', help='Run lambda_handler in-process instead of invoking Lambda')
+    args = parser.parse_args()
+    
+    with open(args.event_file, 'r', encoding='utf-8') as f:
+        orchestrator_event = json.load(f)
+    local_invoke = (lambda payload: lambda_handler(payload, None)) if args.local else None
+    result = orchestrate(orchestrator_event, invoke=local_invoke)
+    result.pop('chunk_results', None)
+    print(json.dumps(result, indent=2))
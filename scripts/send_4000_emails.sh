@@ -15,21 +15,15 @@ echo "📧 Starting email campaign..."
 echo "=============================="
 echo ""
 
-# Download files from S3
-echo "📥 Downloading files from S3..."
-aws s3 cp s3://$BUCKET/recipients/recipients_4000.csv /tmp/recipients.csv
-aws s3 cp s3://$BUCKET/templates/email_template.txt /tmp/email_template.txt
-aws s3 cp s3://$BUCKET/templates/email_template.html /tmp/email_template.html
-
-# Verify files downloaded
-if [ ! -f /tmp/recipients.csv ]; then
-    echo "❌ Error: Could not download recipients.csv"
+# Files are streamed straight from S3 by ses_emailer.py (nothing is downloaded to /tmp)
+RECIPIENTS_URI="s3://$BUCKET/recipients/recipients_4000.csv"
+
+# Verify files exist
+if ! aws s3 ls "$RECIPIENTS_URI" > /dev/null; then
+    echo "❌ Error: $RECIPIENTS_URI not found"
     exit 1
 fi
-
-# Count recipients
-RECIPIENT_COUNT=$(tail -n +2 /tmp/recipients.csv | wc -l)
-echo "✅ Found $RECIPIENT_COUNT recipients"
+echo "✅ Recipients: $RECIPIENTS_URI"
 echo ""
 
 # Send emails
@@ -40,14 +34,14 @@ echo ""
 python3 "$SCRIPT_DIR/ses_emailer.py" \
   --sender "$SENDER" \
   --sender-name "$SENDER_NAME" \
-  --recipients-file /tmp/recipients.csv \
+  --recipients-file "$RECIPIENTS_URI" \
   --subject "$SUBJECT" \
-  --body-file /tmp/email_template.txt \
-  --body-html-file /tmp/email_template.html \
+  --body-file "s3://$BUCKET/templates/email_template.txt" \
+  --body-html-file "s3://$BUCKET/templates/email_template.html" \
   --region $REGION \
   --batch-size 50 \
   --use-bcc \
-  --rate-limit 0.1
+  --workers 10
 
 # Upload logs to S3
 LOG_FILE="send_log_$(date +%Y%m%d_%H%M%S).txt"
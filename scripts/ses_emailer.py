@@ -8,645 +8,2645 @@ import boto3
 import html as html_module
 import json
 import csv
+import hashlib
+import io
+import re
 import sys
 import os
-import webbrowser
-import tempfile
+import signal
+import threading
+import heapq
+import base64
+import bisect
+import itertools
+import random
 import time
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-from typing import List, Dict, Optional
-from botocore.exceptions import ClientError
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed
+from concurrent.futures import wait as wait_futures
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from functools import lru_cache
+from botocore.config import Config
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
 
 
-class SESEmailer:
-    """Class to handle sending emails via AWS SES"""
+# Send rate used when the account quota cannot be read (matches the old fixed 0.07s pacing)
+DEFAULT_MAX_SEND_RATE = 14.0
+
+# SES error codes that clear up by waiting; anything else fails the recipient immediately
+RETRYABLE_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'MaxSendingRateExceeded',
+    'TooManyRequestsException',
+    'ServiceUnavailable',
+    'InternalFailure',
+    'RequestTimeout',
+}
+
+
+def is_retryable_error(error_code: str, error_message: str = '') -> bool:
+    """
+    Classify an SES error as retryable (transient) or fatal
+    
+    Args:
+        error_code: Error code from the ClientError response
+        error_message: Error message from the ClientError response
+        
+    Returns:
+        True if the send should be retried after a backoff
+    """
+    # SES reports both the per-second rate and the 24-hour quota as Throttling;
+    # only the former goes away within a campaign
+    if 'daily message quota' in error_message.lower():
+        return False
+    return error_code in RETRYABLE_ERROR_CODES
+
+
+def is_transient_exception(error: Exception) -> bool:
+    """
+    Classify an exception raised by an SES call (not a ClientError) as retryable
+    
+    botocore's own retries are off (see SESEmailer.__init__), so connection failures
+    and timeouts (EndpointConnectionError, ConnectionClosedError, ReadTimeoutError, ...)
+    reach the send loops and go through the same backoff as throttling.
+    
+    Args:
+        error: Exception raised by the call
+        
+    Returns:
+        True if the send should be retried after a backoff
+    """
+    return isinstance(error, (BotoConnectionError, HTTPClientError))
+
+# SES/AWS error codes that fail every send of the run, not just one recipient
+FATAL_ERROR_CODES = {
+    'MailFromDomainNotVerified',
+    'MailFromDomainNotVerifiedException',
+    'AccountSendingPausedException',
+    'ConfigurationSetDoesNotExist',
+    'ConfigurationSetSendingPausedException',
+    'AccessDenied',
+    'AccessDeniedException',
+    'InvalidClientTokenId',
+    'UnrecognizedClientException',
+    'SignatureDoesNotMatch',
+    'ExpiredToken',
+    'ExpiredTokenException',
+}
+
+
+def is_fatal_error(error_code: str, error_message: str = '', sender: Optional[str] = None) -> bool:
+    """
+    Classify an SES error as account- or identity-level, i.e. every further send will fail too
+    
+    Args:
+        error_code: Error code from the ClientError response
+        error_message: Error message from the ClientError response
+        sender: Sender address of the run (optional). In the SES sandbox unverified
+                recipients are rejected with the same MessageRejected error, so with a
+                sender only rejections naming it count as fatal.
+        
+    Returns:
+        True if retrying this or any other recipient is pointless until the account is fixed
+    """
+    message = error_message.lower()
+    if error_code in FATAL_ERROR_CODES or 'daily message quota' in message:
+        return True
+    if error_code == 'MessageRejected' and 'not verified' in message:
+        return sender is None or sender.lower() in message
+    return False
+
+# SES allows at most 50 destinations per send_bulk_templated_email call
+BULK_DESTINATIONS_LIMIT = 50
+
+# send_email also takes at most 50 destinations; a packed BCC send uses one for the sender in To
+PACKED_BCC_LIMIT = BULK_DESTINATIONS_LIMIT - 1
+
+# Per-destination statuses from send_bulk_templated_email that are worth retrying
+BULK_RETRYABLE_STATUSES = {'AccountThrottled', 'TransientFailure'}
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 30.0) -> float:
+    """
+    Exponential backoff with full jitter for the given retry attempt (1 = first retry)
+    
+    Spreading retries over [0, ceiling] keeps throttled workers from retrying in lockstep.
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+
+class RetryQueue:
+    """Delayed queue of throttled send jobs waiting out an exponential backoff with jitter"""
     
-    def __init__(self, region_name: str = 'us-west-2'):
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 30.0):
         """
-        Initialize the SES client
+        Initialize the retry queue
         
         Args:
-            region_name: AWS region name (default: us-west-2)
+            max_attempts: Retries allowed per job before it counts as failed
+            base_delay: Backoff ceiling in seconds for the first retry (doubles each attempt)
+            max_delay: Upper bound on the backoff ceiling in seconds
         """
-        self.ses_client = boto3.client('ses', region_name=region_name)
-        self.region = region_name
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self.backoff_seconds = 0.0
+        self._heap = []
+        self._seq = itertools.count()
     
-    def verify_email_identity(self, email: str) -> bool:
+    def push(self, job: Dict) -> bool:
         """
-        Verify an email address or domain with SES
+        Schedule a job for another attempt
         
         Args:
-            email: Email address to verify
+            job: Send job dict with an 'attempt' counter
             
         Returns:
-            True if verification request was sent successfully
+            False if the job has used up its attempts (caller should record it as failed)
         """
-        try:
-            response = self.ses_client.verify_email_identity(EmailAddress=email)
-            print(f"Verification email sent to {email}. Please check your inbox.")
-            return True
-        except ClientError as e:
-            print(f"Error verifying email {email}: {e}")
+        attempt = job.get('attempt', 0) + 1
+        if attempt > self.max_attempts:
             return False
+        delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), dict(job, attempt=attempt)))
+        self.retries += 1
+        self.backoff_seconds += delay
+        return True
     
-    def send_email(
-        self,
-        sender: str,
-        recipients: List[str],
-        subject: str,
-        body_text: str,
-        body_html: Optional[str] = None,
-        reply_to: Optional[List[str]] = None,
-        bcc: Optional[List[str]] = None,
-        sender_name: Optional[str] = None
-    ) -> Dict:
+    def pop_due(self) -> List[Dict]:
+        """Remove and return all jobs whose backoff has elapsed"""
+        now = time.monotonic()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+    
+    def pop_all(self) -> List[Dict]:
+        """Remove and return every queued job, due or not (e.g., when stopping early)"""
+        jobs = [entry[2] for entry in sorted(self._heap)]
+        self._heap = []
+        return jobs
+    
+    def next_due_in(self) -> float:
+        """Seconds until the next job becomes due (0 if one is due now or the queue is empty)"""
+        if not self._heap:
+            return 0.0
+        return max(0.0, self._heap[0][0] - time.monotonic())
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class RateLimiter:
+    """Thread-safe token bucket enforcing a messages-per-second budget"""
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
         """
-        Send email to multiple recipients using send_email
+        Initialize the token bucket
         
         Args:
-            sender: Verified sender email address
-            recipients: List of recipient email addresses
-            subject: Email subject
-            body_text: Plain text email body
-            body_html: HTML email body (optional)
-            reply_to: List of reply-to email addresses (optional)
+            rate: Messages per second to allow on average
+            burst: Bucket capacity, i.e. how many messages may go out back-to-back
+                   after an idle period (default: 1/5 of a second's budget, at least 1)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(1.0, burst if burst is not None else self.rate / 5)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Reserve tokens, sleeping until the budget allows them to be spent
+        
+        The reservation is taken under the lock and the sleep happens outside it,
+        so concurrent workers queue up in order without holding each other up.
+        Time spent in the API call itself counts towards the refill.
+        
+        Args:
+            tokens: Number of messages about to be sent (recipients count individually)
             
         Returns:
-            Dictionary with success status and message IDs
+            Seconds spent waiting
         """
-        # Use BCC if provided, otherwise use To
-        if bcc:
-            # Send to sender in To, recipients in BCC (protects privacy)
-            destination = {
-                'ToAddresses': [sender],  # Send to yourself
-                'BccAddresses': bcc
-            }
-        else:
-            destination = {
-                'ToAddresses': recipients
-            }
-        
-        message = {
-            'Subject': {'Data': subject, 'Charset': 'UTF-8'},
-            'Body': {'Text': {'Data': body_text, 'Charset': 'UTF-8'}}
-        }
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    RateLimiter whose bucket lives in shared memory, so one budget covers several processes
+    
+    Create it in the parent and hand it to worker processes (e.g., through a
+    process pool initializer); every copy draws from the same tokens.
+    """
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Initialize the shared token bucket
         
-        if body_html:
-            message['Body']['Html'] = {'Data': body_html, 'Charset': 'UTF-8'}
+        Args:
+            rate: Messages per second to allow on average, across all processes
+            burst: Bucket capacity (default: 1/5 of a second's budget, at least 1)
+        """
+        import multiprocessing
         
-        # Format sender with display name if provided
-        if sender_name:
-            formatted_sender = f'{sender_name} <{sender}>'
-        else:
-            formatted_sender = sender
+        super().__init__(rate, burst)
+        # [tokens, last refill]; time.monotonic() is system-wide, so it is comparable across processes
+        self._state = multiprocessing.Array('d', [self.capacity, time.monotonic()])
+    
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Reserve tokens from the shared budget, sleeping until they may be spent
         
-        try:
-            response = self.ses_client.send_email(
-                Source=formatted_sender,
-                Destination=destination,
-                Message=message,
-                ReplyToAddresses=reply_to if reply_to else []
-            )
-            
-            recipient_count = len(bcc) if bcc else len(recipients)
-            print(f"✓ Email sent successfully!")
-            print(f"  Message ID: {response['MessageId']}")
-            if bcc:
-                print(f"  Recipients (BCC): {recipient_count} addresses")
-            else:
-                print(f"  Recipients: {', '.join(recipients)}")
-            
-            return {
-                'success': True,
-                'message_id': response['MessageId'],
-                'recipients': bcc if bcc else recipients
-            }
-        except ClientError as e:
-            error_code = e.response['Error']['Code']
-            error_message = e.response['Error']['Message']
-            print(f"✗ Error sending email: {error_code} - {error_message}")
-            
-            if error_code == 'MessageRejected':
-                print("  Note: Make sure your sender email is verified in SES")
-            elif error_code == 'MailFromDomainNotVerified':
-                print("  Note: The sending domain needs to be verified")
+        Args:
+            tokens: Number of messages about to be sent
             
-            return {
-                'success': False,
-                'error': error_code,
-                'message': error_message
-            }
+        Returns:
+            Seconds spent waiting
+        """
+        with self._state.get_lock():
+            now = time.monotonic()
+            available = min(self.capacity, self._state[0] + (now - self._state[1]) * self.rate)
+            available -= tokens
+            self._state[0] = available
+            self._state[1] = now
+            wait = -available / self.rate if available < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
     
-    def send_email_batch(
-        self,
-        sender: str,
-        recipients: List[str],
-        subject: str,
-        body_text: str,
-        body_html: Optional[str] = None,
-        batch_size: int = 50,
-        use_bcc: bool = True,
-        rate_limit: float = 0.1,  # seconds between batches (10 emails/second = 0.1s)
-        reply_to: Optional[List[str]] = None,
-        sender_name: Optional[str] = None,
-        personalized: bool = False,
-        recipient_data: Optional[List[Dict[str, str]]] = None,
-        generic_greeting: Optional[str] = None
-    ) -> Dict:
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_lock']  # thread lock is per process; the shared array carries its own lock
+        return state
+    
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """
+    Trips after repeated fatal (account or identity) errors so a doomed run stops early
+    
+    Workers report each send result; once threshold fatal errors arrive in a row
+    (any success resets the count), tripped turns True and stays True.
+    """
+    
+    def __init__(self, threshold: int = 3, sender: Optional[str] = None):
         """
-        Send emails in batches with rate limiting and BCC support
+        Initialize the breaker
         
         Args:
-            sender: Verified sender email address
-            recipients: List of recipient email addresses (or list of dicts with 'email' key if personalized)
-            subject: Email subject (can contain placeholders like [NAME] if personalized=True)
-            body_text: Plain text email body (can contain placeholders like [NAME] if personalized=True)
-            body_html: HTML email body (optional, can contain placeholders if personalized=True)
-            batch_size: Number of recipients per batch (default: 50)
-            use_bcc: Use BCC to protect recipient privacy (default: True)
-            rate_limit: Seconds to wait between batches (default: 0.1 = 10 batches/second)
-            reply_to: List of reply-to email addresses (optional)
-            personalized: If True, replace placeholders like [NAME] with recipient data
-            recipient_data: List of dicts with recipient data (required if personalized=True)
-            generic_greeting: Generic greeting to use when name is not available (e.g., "Hi There!")
+            threshold: Consecutive fatal errors that trip it (0 disables the breaker)
+            sender: Sender address of the run, passed to is_fatal_error (optional)
+        """
+        self.threshold = threshold
+        self.sender = sender
+        self.reason = None
+        self._consecutive = 0
+        self._tripped = threading.Event()
+        self._lock = threading.Lock()
+    
+    @property
+    def tripped(self) -> bool:
+        return self._tripped.is_set()
+    
+    def record(self, result: Dict) -> bool:
+        """
+        Count a send result
+        
+        Args:
+            result: Result dict from send_email/send_email_with_attachments
             
         Returns:
-            Dictionary with success status and batch results
+            True if this result tripped the breaker
         """
-        # Normalize recipients to list of dicts if personalized
-        if personalized:
-            if not recipient_data:
-                # If recipients are already dicts, use them; otherwise create dicts
-                if recipients and isinstance(recipients[0], dict):
-                    recipient_data = recipients
-                else:
-                    recipient_data = [{'email': r, 'name': ''} for r in recipients]
-            recipients_list = [r['email'] for r in recipient_data]
-        else:
-            # Convert recipients to list if needed
-            if recipients and isinstance(recipients[0], dict):
-                recipients_list = [r['email'] for r in recipients]
-            else:
-                recipients_list = recipients
-            recipient_data = [{'email': r, 'name': ''} for r in recipients_list]
+        if result.get('success'):
+            with self._lock:
+                self._consecutive = 0
+            return False
+        if self.threshold <= 0 or not is_fatal_error(result.get('error', ''), result.get('message', ''), self.sender):
+            return False
+        with self._lock:
+            self._consecutive += 1
+            if self._tripped.is_set() or self._consecutive < self.threshold:
+                return False
+            self.reason = f"{result.get('error')}: {result.get('message')}"
+            self._tripped.set()
+        print(f"⛔ Circuit breaker tripped after {self.threshold} fatal errors in a row ({self.reason}); stopping")
+        return True
+
+
+class SharedCircuitBreaker(CircuitBreaker):
+    """
+    CircuitBreaker whose count lives in shared memory, so one threshold covers several processes
+    
+    Create it in the parent and hand it to worker processes (e.g., through a
+    process pool initializer), like SharedRateLimiter: fatal errors in any
+    process count toward the same run, and a trip stops every process.
+    """
+    
+    # Bytes of the tripping error kept as the shared reason
+    REASON_BYTES = 512
+    
+    def __init__(self, threshold: int = 3, sender: Optional[str] = None):
+        """
+        Initialize the shared breaker
         
-        total_recipients = len(recipients_list)
-        total_batches = (total_recipients + batch_size - 1) // batch_size
+        Args:
+            threshold: Consecutive fatal errors, across all processes, that trip it (0 disables it)
+            sender: Sender address of the run, passed to is_fatal_error (optional)
+        """
+        import multiprocessing
         
-        print(f"\n📧 Batch Sending Configuration:")
-        print(f"  Total recipients: {total_recipients}")
-        print(f"  Batch size: {batch_size}")
-        print(f"  Total batches: {total_batches}")
-        print(f"  Use BCC: {use_bcc}")
-        print(f"  Personalized: {personalized}")
-        print(f"  Rate limit: {1/rate_limit:.1f} batches/second\n")
+        self._count = multiprocessing.Value('i', 0)
+        self._reason = multiprocessing.Array('c', self.REASON_BYTES)
+        super().__init__(threshold, sender)
+        # The count's lock guards the shared state the way the thread lock does in one process
+        self._tripped = multiprocessing.Event()
+        self._lock = self._count.get_lock()
+    
+    @property
+    def _consecutive(self) -> int:
+        return self._count.value
+    
+    @_consecutive.setter
+    def _consecutive(self, value: int) -> None:
+        self._count.value = value
+    
+    @property
+    def reason(self) -> Optional[str]:
+        return self._reason.value.decode('utf-8', 'ignore') or None
+    
+    @reason.setter
+    def reason(self, value: Optional[str]) -> None:
+        self._reason.value = (value or '').encode('utf-8')[:self.REASON_BYTES - 1]
+
+
+# Histogram bucket upper bounds in seconds, from template rendering (sub-ms) to slow API calls
+METRICS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prefix for exported metric names
+METRICS_PREFIX = 'ses_emailer_'
+
+METRICS_HELP = {
+    'emails_attempted_total': 'Recipient sends attempted (each retry counts again)',
+    'emails_sent_total': 'Recipients sent successfully',
+    'emails_failed_total': 'Recipients that failed for good, by error code',
+    'emails_retried_total': 'Recipient sends scheduled for another attempt',
+    'emails_not_attempted_total': 'Recipients skipped after the circuit breaker tripped',
+    'recipients_rejected_total': 'Recipients dropped by the validation pre-pass, by reason',
+    'ses_api_calls_total': 'SES API calls, by operation',
+    'ses_api_latency_seconds': 'SES API call latency, by operation',
+    'render_seconds': 'Time spent personalizing one message',
+    'mime_build_seconds': 'Time spent building one raw MIME message',
+    'load_seconds': 'Time spent reading and parsing a chunk of recipients',
+    'rate_limiter_wait_seconds': 'Time a send waited on the rate limiter',
+}
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms describing a send
+    
+    Sending code calls inc() and observe(); snapshot() returns plain JSON-able
+    data and to_prometheus() the Prometheus text exposition format. Snapshots
+    from several processes or invocations can be combined with merge().
+    """
+    
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_BUCKETS):
+        """
+        Initialize an empty registry
         
-        results = []
-        success_count = 0
-        fail_count = 0
+        Args:
+            buckets: Histogram bucket upper bounds in seconds
+        """
+        self.buckets = tuple(buckets)
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        # Core counters exist from the start so dashboards see zeros rather than gaps
+        for name in ('emails_attempted_total', 'emails_sent_total', 'emails_retried_total'):
+            self._counters[(name, ())] = 0
+    
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """Add amount to a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+    
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record one value (in seconds) in a histogram"""
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+    
+    def snapshot(self) -> Dict:
+        """
+        Current values as plain data
         
-        for batch_num in range(total_batches):
-            start_idx = batch_num * batch_size
-            end_idx = min(start_idx + batch_size, total_recipients)
-            batch_recipients = recipients_list[start_idx:end_idx]
-            batch_recipient_data = recipient_data[start_idx:end_idx]
-            
-            print(f"📦 Batch {batch_num + 1}/{total_batches} ({len(batch_recipients)} recipients)...")
-            
-            try:
-                if use_bcc:
-                    # For BCC privacy, send individual emails so each recipient only sees their own address
-                    batch_success = 0
-                    batch_fail = 0
-                    for i, recipient in enumerate(batch_recipients):
-                        # Personalize content if enabled
-                        personalized_subject = subject
-                        personalized_body_text = body_text
-                        personalized_body_html = body_html
-                        
-                        if personalized:
-                            recipient_info = batch_recipient_data[i]
-                            personalized_subject = replace_template_placeholders(subject, recipient_info, generic_greeting)
-                            personalized_body_text = replace_template_placeholders(body_text, recipient_info, generic_greeting)
-                            if body_html:
-                                personalized_body_html = replace_template_placeholders(body_html, recipient_info, generic_greeting)
-                        
-                        result = self.send_email(
-                            sender=sender,
-                            recipients=[recipient],  # Individual recipient
-                            subject=personalized_subject,
-                            body_text=personalized_body_text,
-                            body_html=personalized_body_html,
-                            reply_to=reply_to,
-                            bcc=None,  # No BCC needed since it's individual
-                            sender_name=sender_name
-                        )
-                        if result['success']:
-                            batch_success += 1
-                        else:
-                            batch_fail += 1
-                        # Small delay between individual sends to respect rate limits
-                        time.sleep(0.07)  # ~14 emails/second
-                    
-                    if batch_fail == 0:
-                        success_count += batch_success
-                        print(f"  ✓ Batch {batch_num + 1} sent successfully ({batch_success} emails)")
-                    else:
-                        success_count += batch_success
-                        fail_count += batch_fail
-                        print(f"  ⚠ Batch {batch_num + 1} completed: {batch_success} success, {batch_fail} failed")
-                    
-                    results.append({
-                        'batch': batch_num + 1,
-                        'recipients': batch_recipients,
-                        'success': batch_fail == 0,
-                        'successful': batch_success,
-                        'failed': batch_fail
-                    })
-                else:
-                    # Send to all recipients in batch (they'll see each other)
-                    # Note: If personalized, we still need to send individually
-                    if personalized:
-                        # For personalized emails, send individually even without BCC
-                        batch_success = 0
-                        batch_fail = 0
-                        for i, recipient in enumerate(batch_recipients):
-                            recipient_info = batch_recipient_data[i]
-                            personalized_subject = replace_template_placeholders(subject, recipient_info, generic_greeting)
-                            personalized_body_text = replace_template_placeholders(body_text, recipient_info, generic_greeting)
-                            personalized_body_html = replace_template_placeholders(body_html, recipient_info, generic_greeting) if body_html else None
-                            
-                            result = self.send_email(
-                                sender=sender,
-                                recipients=[recipient],
-                                subject=personalized_subject,
-                                body_text=personalized_body_text,
-                                body_html=personalized_body_html,
-                                reply_to=reply_to,
-                                bcc=None,
-                                sender_name=sender_name
-                            )
-                            if result['success']:
-                                batch_success += 1
-                            else:
-                                batch_fail += 1
-                            time.sleep(0.07)  # Small delay between sends
-                        
-                        if batch_fail == 0:
-                            success_count += batch_success
-                            print(f"  ✓ Batch {batch_num + 1} sent successfully ({batch_success} emails)")
-                        else:
-                            success_count += batch_success
-                            fail_count += batch_fail
-                            print(f"  ⚠ Batch {batch_num + 1} completed: {batch_success} success, {batch_fail} failed")
-                        
-                        results.append({
-                            'batch': batch_num + 1,
-                            'recipients': batch_recipients,
-                            'success': batch_fail == 0,
-                            'successful': batch_success,
-                            'failed': batch_fail
-                        })
-                    else:
-                        # Non-personalized - send to all at once
-                        result = self.send_email(
-                            sender=sender,
-                            recipients=batch_recipients,
-                            subject=subject,
-                            body_text=body_text,
-                            body_html=body_html,
-                            reply_to=reply_to,
-                            bcc=None,
-                            sender_name=sender_name
-                        )
-                    
-                    if result['success']:
-                        success_count += len(batch_recipients)
-                        print(f"  ✓ Batch {batch_num + 1} sent successfully")
-                    else:
-                        fail_count += len(batch_recipients)
-                        print(f"  ✗ Batch {batch_num + 1} failed: {result.get('error', 'Unknown error')}")
-                    
-                    results.append({
-                        'batch': batch_num + 1,
-                        'recipients': batch_recipients,
-                        'success': result['success'],
-                        'result': result
-                    })
-                
-                # Rate limiting - wait between batches (except for last batch)
-                if batch_num < total_batches - 1:
-                    time.sleep(rate_limit)
-                    
-            except Exception as e:
-                fail_count += len(batch_recipients)
-                print(f"  ✗ Batch {batch_num + 1} error: {e}")
-                results.append({
-                    'batch': batch_num + 1,
-                    'recipients': batch_recipients,
-                    'success': False,
-                    'error': str(e)
+        Returns:
+            Dict with 'timestamp', 'counters' and 'histograms'; each metric maps to a list
+            of {'labels', ...} series. Histogram buckets are cumulative [upper bound, count]
+            pairs, with None standing for +Inf.
+        """
+        with self._lock:
+            counters = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+            histograms = {}
+            for (name, labels), (counts, total, count) in sorted(self._histograms.items()):
+                cumulative = list(itertools.accumulate(counts))
+                histograms.setdefault(name, []).append({
+                    'labels': dict(labels),
+                    'count': count,
+                    'sum': round(total, 6),
+                    'buckets': [[bound, n] for bound, n in zip(self.buckets + (None,), cumulative)]
                 })
+        return {'timestamp': round(time.time(), 3), 'counters': counters, 'histograms': histograms}
+    
+    def merge(self, snapshot: Dict) -> None:
+        """
+        Add another registry's snapshot (e.g. from a shard process or a Lambda invocation)
         
-        print(f"\n📊 Batch Sending Summary:")
-        print(f"  Total: {total_recipients}")
-        print(f"  Successful: {success_count}")
-        print(f"  Failed: {fail_count}")
-        print(f"  Success rate: {(success_count/total_recipients*100):.1f}%")
+        Args:
+            snapshot: Result of snapshot() from a registry with the same buckets
+        """
+        with self._lock:
+            for name, series in snapshot.get('counters', {}).items():
+                for entry in series:
+                    key = (name, tuple(sorted(entry['labels'].items())))
+                    self._counters[key] = self._counters.get(key, 0) + entry['value']
+            for name, series in snapshot.get('histograms', {}).items():
+                for entry in series:
+                    key = (name, tuple(sorted(entry['labels'].items())))
+                    histogram = self._histograms.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+                    previous = 0
+                    for i, (_, cumulative) in enumerate(entry['buckets']):
+                        histogram[0][i] += cumulative - previous
+                        previous = cumulative
+                    histogram[1] += entry['sum']
+                    histogram[2] += entry['count']
+    
+    def to_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format (for the node_exporter textfile collector)"""
+        def series(name: str, labels: Dict, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = [f'{k}="{_prometheus_label(v)}"' for k, v in labels.items()]
+            if extra:
+                pairs.append(f'{extra[0]}="{extra[1]}"')
+            return METRICS_PREFIX + name + ('{' + ','.join(pairs) + '}' if pairs else '')
         
-        return {
-            'success': fail_count == 0,
-            'total': total_recipients,
-            'successful': success_count,
-            'failed': fail_count,
-            'batches': total_batches,
-            'results': results
-        }
+        snapshot = self.snapshot()
+        lines = []
+        for kind, metrics in (('counter', snapshot['counters']), ('histogram', snapshot['histograms'])):
+            for name, entries in metrics.items():
+                if name in METRICS_HELP:
+                    lines.append(f"# HELP {METRICS_PREFIX}{name} {METRICS_HELP[name]}")
+                lines.append(f"# TYPE {METRICS_PREFIX}{name} {kind}")
+                for entry in entries:
+                    if kind == 'counter':
+                        lines.append(f"{series(name, entry['labels'])} {entry['value']:g}")
+                        continue
+                    for bound, count in entry['buckets']:
+                        le = '+Inf' if bound is None else f'{bound:g}'
+                        lines.append(f"{series(name + '_bucket', entry['labels'], ('le', le))} {count}")
+                    lines.append(f"{series(name + '_sum', entry['labels'])} {entry['sum']:g}")
+                    lines.append(f"{series(name + '_count', entry['labels'])} {entry['count']}")
+        return '\n'.join(lines) + '\n'
     
-    def send_email_with_attachments(
-        self,
-        sender: str,
-        recipients: List[str],
-        subject: str,
-        body_text: str,
-        body_html: Optional[str] = None,
-        attachments: Optional[List[str]] = None,
-        reply_to: Optional[List[str]] = None,
-        sender_name: Optional[str] = None
-    ) -> Dict:
+    def time_breakdown(self) -> Dict[str, float]:
         """
-        Send email with attachments using send_raw_email
+        Total seconds spent waiting on the send rate, in SES API calls and rendering
+        
+        Comparing them shows whether a slow send is bound by quota, network or CPU.
+        """
+        with self._lock:
+            totals = {'rate_limiter_wait_seconds': 0.0, 'ses_api_latency_seconds': 0.0, 'render_seconds': 0.0}
+            for (name, _), (_, total, _) in self._histograms.items():
+                if name in totals:
+                    totals[name] += total
+            calls = sum(count for (name, _), (_, _, count) in self._histograms.items()
+                        if name == 'ses_api_latency_seconds')
+        totals = {name: round(value, 3) for name, value in totals.items()}
+        totals['ses_api_calls'] = calls
+        return totals
+
+
+def _prometheus_label(value) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsExporter:
+    """
+    Background thread writing a MetricsRegistry to a Prometheus textfile and/or JSON file
+    
+    Files are replaced atomically, so a collector never reads a half-written file.
+    """
+    
+    def __init__(self, registry: MetricsRegistry, prometheus_path: Optional[str] = None,
+                 json_path: Optional[str] = None, interval: float = 15.0):
+        """
+        Initialize the exporter
         
         Args:
-            sender: Verified sender email address
-            recipients: List of recipient email addresses
-            subject: Email subject
-            body_text: Plain text email body
-            body_html: HTML email body (optional)
-            attachments: List of file paths to attach (optional)
-            reply_to: List of reply-to email addresses (optional)
-            
-        Returns:
-            Dictionary with success status and message IDs
+            registry: MetricsRegistry to export
+            prometheus_path: Prometheus textfile to write, e.g. for node_exporter's textfile collector (optional)
+            json_path: JSON snapshot file to write (optional)
+            interval: Seconds between writes while running
         """
+        self.registry = registry
+        self.prometheus_path = prometheus_path
+        self.json_path = json_path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+    
+    @staticmethod
+    def _replace(path: str, text: str) -> None:
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    
+    def write(self) -> None:
+        """Write the current metrics to the configured files"""
         try:
-            # Create MIME message structure
-            # If we have both HTML and attachments, we need: mixed -> alternative (text/html) + attachments
-            if body_html and attachments:
-                msg = MIMEMultipart('mixed')
-                # Create alternative part for text/html
-                alt_part = MIMEMultipart('alternative')
-                text_part = MIMEText(body_text, 'plain', 'utf-8')
-                html_part = MIMEText(body_html, 'html', 'utf-8')
-                alt_part.attach(text_part)
-                alt_part.attach(html_part)
-                msg.attach(alt_part)
-            elif body_html:
-                # Only HTML, no attachments - use alternative
-                msg = MIMEMultipart('alternative')
-                text_part = MIMEText(body_text, 'plain', 'utf-8')
-                html_part = MIMEText(body_html, 'html', 'utf-8')
-                msg.attach(text_part)
-                msg.attach(html_part)
-            else:
-                # Plain text only
-                msg = MIMEMultipart('mixed')
-                text_part = MIMEText(body_text, 'plain', 'utf-8')
-                msg.attach(text_part)
-            
-            msg['Subject'] = subject
-            # Format sender with display name if provided
-            if sender_name:
-                msg['From'] = f'{sender_name} <{sender}>'
-            else:
-                msg['From'] = sender
-            msg['To'] = ', '.join(recipients)
-            
-            if reply_to:
-                msg['Reply-To'] = ', '.join(reply_to)
-            
-            # Add attachments if provided
-            if attachments:
-                for attachment_path in attachments:
-                    if not os.path.exists(attachment_path):
-                        print(f"Warning: Attachment file not found: {attachment_path}")
-                        continue
-                    
-                    try:
-                        with open(attachment_path, 'rb') as f:
-                            attachment_data = f.read()
-                        
-                        # Get filename from path
-                        filename = os.path.basename(attachment_path)
-                        
-                        # Create attachment
-                        attachment = MIMEBase('application', 'octet-stream')
-                        attachment.set_payload(attachment_data)
-                        encoders.encode_base64(attachment)
-                        attachment.add_header(
-                            'Content-Disposition',
-                            f'attachment; filename= {filename}'
-                        )
-                        msg.attach(attachment)
-                        print(f"  Attached: {filename} ({len(attachment_data)} bytes)")
-                    except Exception as e:
-                        print(f"Warning: Failed to attach {attachment_path}: {e}")
-                        continue
-            
-            # Convert message to string
-            raw_message = msg.as_string()
-            
-            # Format sender with display name if provided (for Source field)
-            if sender_name:
-                formatted_sender = f'{sender_name} <{sender}>'
-            else:
-                formatted_sender = sender
-            
-            # Send via SES
-            response = self.ses_client.send_raw_email(
-                Source=formatted_sender,
-                Destinations=recipients,
-                RawMessage={'Data': raw_message}
-            )
-            
-            print(f"✓ Email with attachments sent successfully!")
-            print(f"  Message ID: {response['MessageId']}")
-            print(f"  Recipients: {', '.join(recipients)}")
-            if attachments:
-                print(f"  Attachments: {len([a for a in attachments if os.path.exists(a)])} file(s)")
-            
-            return {
-                'success': True,
-                'message_id': response['MessageId'],
-                'recipients': recipients,
-                'attachments': attachments or []
-            }
-            
-        except ClientError as e:
-            error_code = e.response['Error']['Code']
-            error_message = e.response['Error']['Message']
-            print(f"✗ Error sending email: {error_code} - {error_message}")
-            
-            if error_code == 'MessageRejected':
-                print("  Note: Make sure your sender email is verified in SES")
-            elif error_code == 'MailFromDomainNotVerified':
-                print("  Note: The sending domain needs to be verified")
-            
-            return {
-                'success': False,
-                'error': error_code,
-                'message': error_message
-            }
-        except Exception as e:
-            print(f"✗ Error creating email: {e}")
-            return {
-                'success': False,
-                'error': 'EmailCreationError',
-                'message': str(e)
-            }
+            if self.prometheus_path:
+                self._replace(self.prometheus_path, self.registry.to_prometheus())
+            if self.json_path:
+                self._replace(self.json_path, json.dumps(self.registry.snapshot(), indent=2) + '\n')
+        except OSError as e:
+            print(f"Warning: Could not write metrics: {e}")
     
-    def send_bulk_email(
-        self,
-        sender: str,
-        recipients: List[Dict[str, str]],
-        subject: str,
-        body_text: str,
-        body_html: Optional[str] = None,
-        default_tags: Optional[List[Dict[str, str]]] = None
-    ) -> Dict:
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+    
+    def start(self) -> 'MetricsExporter':
+        """Start writing every interval seconds"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop the background thread and write the final values"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.write()
+
+
+class SendProfiler:
+    """
+    Opt-in profiling for --profile: exact SES API latencies, the slowest sends and cProfile
+    
+    Phase totals (loading, rendering, MIME building, API calls, pacing sleeps) come from
+    the emailer's MetricsRegistry; this adds what a histogram can't keep.
+    """
+    
+    # Metric histograms reported as phases, in pipeline order
+    PHASES = (
+        ('load_seconds', 'Loading recipients'),
+        ('render_seconds', 'Rendering'),
+        ('mime_build_seconds', 'MIME building'),
+        ('ses_api_latency_seconds', 'SES API calls'),
+        ('rate_limiter_wait_seconds', 'Pacing sleeps'),
+    )
+    
+    def __init__(self, slowest: int = 10):
         """
-        Send bulk emails with personalized content using send_bulk_email
+        Initialize the profiler
         
         Args:
-            sender: Verified sender email address
-            recipients: List of dicts with 'email' and optional 'name' keys
-            subject: Email subject (can use template variables)
-            body_text: Plain text email body (can use template variables)
-            body_html: HTML email body (optional, can use template variables)
-            default_tags: List of tags for email tracking (optional)
-            
-        Returns:
-            Dictionary with success status and results
+            slowest: How many of the slowest sends to keep for the report
         """
-        destinations = []
-        for recipient in recipients:
-            dest = {'Destination': {'ToAddresses': [recipient['email']]}}
-            if 'name' in recipient:
-                # Simple template replacement (SES doesn't support this directly,
-                # but we can prepare personalized messages)
-                dest['ReplacementTemplateData'] = json.dumps({
-                    'name': recipient.get('name', '')
-                })
-            destinations.append(dest)
+        self.slowest = slowest
+        self.started = time.perf_counter()
+        self._latencies = []
+        self._slowest = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._profiles = []
+    
+    def record_call(self, operation: str, seconds: float, recipients: Optional[List[str]], error: Optional[str]) -> None:
+        """Record one SES API call (called by SESEmailer._call_ses)"""
+        entry = (seconds, next(self._seq), operation, list(recipients or []), error)
+        with self._lock:
+            self._latencies.append(seconds)
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, entry)
+            elif self._slowest and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile (0-100) of the recorded API latencies, in seconds"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, max(0, int(round(q / 100 * len(latencies))) - 1))]
+    
+    def start_cprofile(self) -> None:
+        """Profile the whole process with cProfile, including worker threads started from now on"""
+        import cProfile
         
-        message = {
-            'Subject': {'Data': subject, 'Charset': 'UTF-8'},
-            'Body': {'Text': {'Data': body_text, 'Charset': 'UTF-8'}}
-        }
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        profile.enable()
+        if sys.version_info < (3, 12):
+            # Before 3.12 cProfile only sees the thread that enabled it; give each new thread its own
+            threading.setprofile(self._profile_thread)
+    
+    def _profile_thread(self, frame, event, arg) -> None:
+        import cProfile
         
-        if body_html:
-            message['Body']['Html'] = {'Data': body_html, 'Charset': 'UTF-8'}
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+    
+    def dump_cprofile(self, path: str) -> None:
+        """Stop cProfile and write the combined stats (read with python -m pstats or snakeviz)"""
+        import pstats
         
-        try:
-            response = self.ses_client.send_bulk_templated_email(
-                Source=sender,
-                Template='',  # Not using template, using direct message
-                DefaultTemplateData=json.dumps({}),
-                Destinations=destinations
-            )
-            
-            # Actually, send_bulk_templated_email requires a template
-            # Let's use send_bulk_email instead (if available) or fall back to individual sends
-            # For simplicity, let's use a loop with send_email for bulk sending
-            print("Note: Using individual send_email calls for bulk sending...")
-            results = []
-            success_count = 0
-            fail_count = 0
-            
-            for recipient in recipients:
-                result = self.send_email(
-                    sender=sender,
-                    recipients=[recipient['email']],
-                    subject=subject,
-                    body_text=body_text,
-                    body_html=body_html
-                )
-                results.append(result)
-                if result['success']:
-                    success_count += 1
-                else:
-                    fail_count += 1
-            
-            print(f"\nBulk email summary:")
-            print(f"  Total: {len(recipients)}")
-            print(f"  Successful: {success_count}")
-            print(f"  Failed: {fail_count}")
-            
-            return {
-                'success': fail_count == 0,
-                'total': len(recipients),
-                'successful': success_count,
-                'failed': fail_count,
-                'results': results
-            }
+        threading.setprofile(None)
+        for profile in self._profiles:
+            profile.disable()
+        stats = pstats.Stats(self._profiles[0])
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+    
+    def report(self, metrics: 'MetricsRegistry') -> None:
+        """Print the phase breakdown, API latency percentiles and slowest sends"""
+        snapshot = metrics.snapshot()['histograms']
+        print(f"\n🔬 Profile (wall time {time.perf_counter() - self.started:.1f}s)")
+        print("  Phase breakdown (summed over all workers):")
+        for name, label in self.PHASES:
+            series = snapshot.get(name, [])
+            seconds = sum(entry['sum'] for entry in series)
+            count = sum(entry['count'] for entry in series)
+            print(f"    {label + ':':<22}{seconds:8.2f}s  ({count} timed)")
+        
+        if not self._latencies:
+            print("  SES API latency: no per-call samples (collected in this process only)")
+            return
+        p50, p95, p99 = (self.percentile(q) * 1000 for q in (50, 95, 99))
+        print(f"  SES API latency: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, "
+              f"max {max(self._latencies) * 1000:.1f} ms ({len(self._latencies)} calls)")
+        print(f"  Slowest {len(self._slowest)} sends:")
+        for seconds, _, operation, recipients, error in sorted(self._slowest, reverse=True):
+            who = recipients[0] if recipients else '-'
+            if len(recipients) > 1:
+                who += f" +{len(recipients) - 1} more"
+            outcome = f"  ({error})" if error else ""
+            print(f"    {seconds * 1000:8.1f} ms  {operation:<22} {who}{outcome}")
+
+
+class SendJournal:
+    """
+    Append-only journal of (recipient, message ID, status) records for resuming campaigns
+    
+    Records are buffered and written with fsync every sync_every records or
+    sync_interval seconds, whichever comes first, so a crash loses at most that
+    window (those recipients are re-sent on resume). Each flush is a single
+    O_APPEND write, so several processes can share one journal file.
+    """
+    
+    def __init__(self, path: str, sync_every: int = 100, sync_interval: float = 1.0):
+        """
+        Open (or create) the journal for appending
+        
+        Args:
+            path: Journal file path
+            sync_every: Flush and fsync after this many buffered records
+            sync_interval: Flush and fsync at least this often (seconds) while recording
+        """
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._buffer = []
+        self._lock = threading.RLock()
+        self._last_sync = time.monotonic()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # Terminate a line torn by a previous crash so the next record starts clean
+        size = os.fstat(self._fd).st_size
+        if size:
+            with open(path, 'rb') as f:
+                f.seek(size - 1)
+                if f.read(1) != b'\n':
+                    os.write(self._fd, b'\n')
+    
+    def record(self, recipient: str, message_id: Optional[str], status: str) -> None:
+        """
+        Append one outcome
+        
+        Args:
+            recipient: Recipient email address
+            message_id: SES message ID (None for failures)
+            status: 'sent' or 'failed'
+        """
+        line = json.dumps([recipient, message_id, status]) + '\n'
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self.flush()
+    
+    def flush(self) -> None:
+        """Write buffered records and fsync them to disk"""
+        with self._lock:
+            if self._fd is None:
+                return
+            if self._buffer:
+                data = ''.join(self._buffer).encode('utf-8')
+                self._buffer = []
+                while data:
+                    written = os.write(self._fd, data)
+                    data = data[written:]
+                os.fsync(self._fd)
+            self._last_sync = time.monotonic()
+    
+    def close(self) -> None:
+        """Flush and close the journal"""
+        with self._lock:
+            self.flush()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+    
+    @staticmethod
+    def load_sent(path: str) -> set:
+        """
+        Rebuild the set of already-sent recipients from a journal in one pass
+        
+        Args:
+            path: Journal file path (missing file = nothing sent yet)
             
-        except ClientError as e:
-            print(f"Error in bulk email: {e}")
-            return {'success': False, 'error': str(e)}
+        Returns:
+            Set of lowercased addresses with a 'sent' record
+        """
+        sent = set()
+        if not os.path.exists(path):
+            return sent
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                try:
+                    recipient, _, status = json.loads(line)
+                except (ValueError, TypeError):
+                    continue  # torn or blank line from an interrupted write
+                if status == 'sent':
+                    sent.add(recipient.strip().lower())
+        return sent
 
 
-def _preview_recipients_html(recipients: Optional[List[str]]) -> str:
-    """Short summary for preview HTML when many recipients."""
-    if not recipients:
-        return "Not specified"
-    n = len(recipients)
-    if n <= 10:
-        return html_module.escape(", ".join(recipients))
-    sample = ", ".join(recipients[:5])
-    return html_module.escape(f"{n} addresses (first 5: {sample}, …)")
+def encode_attachment(path: str, s3_client=None) -> Tuple[str, str]:
+    """
+    Read a local file or s3:// object and base64-encode it exactly as email.encoders does
+    
+    Args:
+        path: Local path or s3://bucket/key URI
+        s3_client: boto3 S3 client (or stand-in) for s3:// URIs (optional)
+        
+    Returns:
+        Tuple of (filename, base64 payload)
+    """
+    from email import encoders
+    from email.mime.base import MIMEBase
+    
+    data = read_bytes(path, s3_client=s3_client)
+    part = MIMEBase('application', 'octet-stream')
+    part.set_payload(data)
+    encoders.encode_base64(part)
+    return os.path.basename(path), part.get_payload()
 
 
-def preview_email(
-    subject: str,
-    body_text: str,
-    body_html: Optional[str] = None,
-    sender: Optional[str] = None,
-    recipients: Optional[List[str]] = None,
-    attachments: Optional[List[str]] = None,
-    sender_name: Optional[str] = None,
-    open_browser: bool = True
-) -> None:
+def attachment_part(filename: str, payload: str):
     """
-    Preview email content before sending
+    New MIME attachment part around an already base64-encoded payload
     
     Args:
-        subject: Email subject
-        body_text: Plain text email body
-        body_html: HTML email body (optional)
-        sender: Sender email address (optional)
-        recipients: List of recipients (optional)
-        open_browser: Whether to open HTML preview in browser
+        filename: Attachment file name
+        payload: Base64 payload (from encode_attachment or AttachmentCache)
+        
+    Returns:
+        email.mime.base.MIMEBase part, ready to attach
     """
-    print("=" * 70)
-    print("EMAIL PREVIEW")
-    print("=" * 70)
+    from email.mime.base import MIMEBase
     
-    if sender:
-        if sender_name:
-            print(f"From: {sender_name} <{sender}>")
-        else:
-            print(f"From: {sender}")
-    if recipients:
-        n = len(recipients)
-        if n <= 5:
-            print(f"To ({n}): {', '.join(recipients)}")
-        else:
-            sample = ", ".join(recipients[:3])
-            print(f"To: {n} recipients (showing first 3: {sample}, …)")
-    print(f"Subject: {subject}")
+    part = MIMEBase('application', 'octet-stream')
+    part.set_payload(payload)
+    part['Content-Transfer-Encoding'] = 'base64'
+    part.add_header('Content-Disposition', f'attachment; filename= {filename}')
+    return part
+
+
+def prefetch_attachments(recipients: Iterable, column: str, window: int = 100,
+                         workers: int = 8, s3_client=None) -> Iterator[Tuple[Dict, object]]:
+    """
+    Load and encode each recipient's own attachments ahead of sending
+    
+    Up to window recipients' files are read (locally or from S3) and encoded in
+    background threads while earlier recipients are being sent, so memory is
+    bounded by the window rather than the list size.
+    
+    Args:
+        recipients: Recipient dicts (e.g., from iter_recipients(..., include_names=True))
+        column: Key holding the attachment path(s) or s3:// URI(s); several are separated by ';'
+        window: Recipients to load ahead
+        workers: Threads reading files
+        s3_client: boto3 S3 client (or stand-in) for s3:// URIs (optional)
+        
+    Yields:
+        (recipient, attachments) in input order, where attachments is a list of
+        (filename, base64 payload) pairs, or the exception raised while loading them
+        (including FileNotFoundError for an empty or blank column)
+    """
+    def load(recipient) -> List[Tuple[str, str]]:
+        refs = (recipient.get(column) or '') if isinstance(recipient, dict) else ''
+        refs = [ref.strip() for ref in refs.split(';') if ref.strip()]
+        if not refs:
+            # A blank cell is a missing document, not a recipient who gets none
+            raise FileNotFoundError(f"no attachment in the '{column}' column")
+        return [encode_attachment(ref, s3_client=s3_client) for ref in refs]
+    
+    def resolved(recipient, future) -> Tuple[Dict, object]:
+        try:
+            return recipient, future.result()
+        except Exception as e:
+            return recipient, e
+    
+    window = max(1, window)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, window))) as executor:
+        for recipient in recipients:
+            pending.append((recipient, executor.submit(load, recipient)))
+            if len(pending) >= window:
+                yield resolved(*pending.popleft())
+        while pending:
+            yield resolved(*pending.popleft())
+
+
+class AttachmentCache:
+    """
+    Attachments read and base64-encoded once, kept in an LRU bounded by encoded size
+    
+    Sending the same file to many recipients then costs one read and one encode;
+    each message only wraps the cached payload in a fresh MIME part.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the cache
+        
+        Args:
+            max_bytes: Upper bound on cached encoded payloads (files larger than this aren't cached)
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loading = {}
+    
+    def get(self, path: str) -> Tuple[str, str]:
+        """
+        Encoded payload for a file, reading and encoding it on a miss
+        
+        Entries are keyed by path, size and modification time, so an edited file is re-read.
+        
+        Args:
+            path: Attachment file path
+            
+        Returns:
+            Tuple of (filename, base64 payload)
+        """
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                loading = self._loading.get(key)
+                if loading is None:
+                    # This thread encodes; concurrent requests for the same file wait for it
+                    loading = self._loading[key] = threading.Event()
+                    break
+            loading.wait()
+            if key not in self._entries:
+                break  # too large to cache (or failed): encode it here
+        
+        try:
+            entry = self._encode(path)
+            with self._lock:
+                self.misses += 1
+                size = len(entry[1])
+                if size <= self.max_bytes and key not in self._entries:
+                    self._entries[key] = entry
+                    self._bytes += size
+                    while self._bytes > self.max_bytes:
+                        _, (_, evicted) = self._entries.popitem(last=False)
+                        self._bytes -= len(evicted)
+            return entry
+        finally:
+            with self._lock:
+                if self._loading.get(key) is loading:
+                    del self._loading[key]
+            loading.set()
+    
+    @staticmethod
+    def _encode(path: str) -> Tuple[str, str]:
+        entry = encode_attachment(path)
+        print(f"  Encoded attachment: {entry[0]} ({len(entry[1])} bytes encoded)")
+        return entry
+    
+    def mime_part(self, path: str):
+        """
+        New MIME attachment part for a file, built around its cached encoded payload
+        
+        Args:
+            path: Attachment file path
+            
+        Returns:
+            email.mime.base.MIMEBase part, ready to attach
+        """
+        return attachment_part(*self.get(path))
+
+
+class RawMessageBuilder:
+    """
+    Raw MIME messages built from a skeleton serialized once per send
+    
+    The structure every message shares (multipart layout, boundaries, From and
+    Reply-To headers, the encoded shared attachments) is serialized a single time.
+    Each message then only folds its To and Subject headers, base64-encodes its
+    text/HTML bodies and joins them with the precomputed bytes. The result parses
+    exactly like the email.mime tree it replaces.
+    """
+    
+    # Placeholders marking the per-message slots in the serialized skeleton
+    _SLOT = re.compile('\x00([A-Z]+)\x00')
+    
+    def __init__(
+        self,
+        sender: str,
+        attachments: Optional[List[str]] = None,
+        reply_to: Optional[List[str]] = None,
+        sender_name: Optional[str] = None,
+        attachment_cache: Optional[AttachmentCache] = None
+    ):
+        """
+        Encode the shared attachments and prepare the skeletons
+        
+        Args:
+            sender: Verified sender email address
+            attachments: File paths to attach to every message (optional). Missing or
+                         unreadable files are skipped with a warning.
+            reply_to: List of reply-to email addresses (optional)
+            sender_name: Display name for the sender (optional)
+            attachment_cache: AttachmentCache to encode the files through (optional)
+        """
+        from email import policy
+        
+        self.sender = sender
+        self.reply_to = reply_to
+        self.sender_name = sender_name
+        # Same header folding as Message.as_string() (compat32, no line length limit)
+        self._policy = policy.compat32.clone(max_line_length=0)
+        self._skeletons = {}
+        self._lock = threading.Lock()
+        
+        cache = attachment_cache or AttachmentCache()
+        self.attachments = []
+        self._encoded = []
+        for attachment_path in attachments or []:
+            if not os.path.exists(attachment_path):
+                print(f"Warning: Attachment file not found: {attachment_path}")
+                continue
+            try:
+                self._encoded.append(cache.get(attachment_path))
+                self.attachments.append(attachment_path)
+            except Exception as e:
+                print(f"Warning: Failed to attach {attachment_path}: {e}")
+    
+    @staticmethod
+    def _make_boundary() -> str:
+        # Same shape as email.generator's boundaries: a run of '=' can't occur at the
+        # start of a base64 line, so the boundary never collides with spliced content
+        return ('=' * 15) + ('%019d' % random.randrange(sys.maxsize)) + '=='
+    
+    def _skeleton(self, has_html: bool, has_attachments: bool) -> Tuple[List, bytes]:
+        """
+        Serialized skeleton for one layout, built on first use
+        
+        Returns:
+            Tuple of (alternating literal bytes / slot names, closing delimiter of the outer multipart)
+        """
+        key = (has_html, has_attachments)
+        with self._lock:
+            if key in self._skeletons:
+                return self._skeletons[key]
+        
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+        
+        def body_part(subtype: str, slot: str):
+            part = MIMEText('', subtype, 'utf-8')
+            part.set_payload(f'\x00{slot}\x00')
+            return part
+        
+        outer = self._make_boundary()
+        # Same layouts send_email_with_attachments has always produced
+        if has_html and has_attachments:
+            msg = MIMEMultipart('mixed', boundary=outer)
+            alt_part = MIMEMultipart('alternative', boundary=self._make_boundary())
+            alt_part.attach(body_part('plain', 'TEXT'))
+            alt_part.attach(body_part('html', 'HTML'))
+            msg.attach(alt_part)
+        elif has_html:
+            msg = MIMEMultipart('alternative', boundary=outer)
+            msg.attach(body_part('plain', 'TEXT'))
+            msg.attach(body_part('html', 'HTML'))
+        else:
+            msg = MIMEMultipart('mixed', boundary=outer)
+            msg.attach(body_part('plain', 'TEXT'))
+        
+        msg['Subject'] = '\x00SUBJECT\x00'
+        if self.sender_name:
+            msg['From'] = f'{self.sender_name} <{self.sender}>'
+        else:
+            msg['From'] = self.sender
+        msg['To'] = '\x00TO\x00'
+        if self.reply_to:
+            msg['Reply-To'] = ', '.join(self.reply_to)
+        for filename, payload in self._encoded:
+            msg.attach(attachment_part(filename, payload))
+        
+        pieces = self._SLOT.split(msg.as_string())
+        # Odd entries are slot names; literals are stored as ready-to-join bytes
+        segments = [piece if i % 2 else piece.encode('utf-8') for i, piece in enumerate(pieces)]
+        skeleton = (segments, f'\n--{outer}--'.encode('ascii'))
+        with self._lock:
+            self._skeletons.setdefault(key, skeleton)
+            return self._skeletons[key]
+    
+    def _header_value(self, name: str, value: str) -> bytes:
+        # fold() returns 'Name: value' plus a line ending; the skeleton already has the rest
+        return self._policy.fold(name, value)[len(name) + 2:-1].encode('utf-8')
+    
+    def build(
+        self,
+        recipients: List[str],
+        subject: str,
+        body_text: str,
+        body_html: Optional[str] = None,
+        encoded_attachments: Optional[List[Tuple[str, str]]] = None
+    ) -> bytes:
+        """
+        Raw message for one send
+        
+        Args:
+            recipients: To addresses
+            subject: Email subject
+            body_text: Plain text email body
+            body_html: HTML email body (optional)
+            encoded_attachments: This message's own (filename, base64 payload) pairs,
+                                 attached after the shared attachments (optional)
+            
+        Returns:
+            The message as bytes, ready for send_raw_email
+        """
+        segments, closing = self._skeleton(bool(body_html), bool(self._encoded or encoded_attachments))
+        values = {
+            'SUBJECT': lambda: self._header_value('Subject', subject),
+            'TO': lambda: self._header_value('To', ', '.join(recipients)),
+            'TEXT': lambda: base64.encodebytes(body_text.encode('utf-8')),
+            'HTML': lambda: base64.encodebytes(body_html.encode('utf-8'))
+        }
+        out = [segment if isinstance(segment, bytes) else values[segment]() for segment in segments]
+        
+        if encoded_attachments:
+            # Own attachments go in as extra parts just before the outer closing delimiter
+            tail = out[-1]
+            end = tail.rindex(closing)
+            out[-1] = tail[:end]
+            delimiter = closing[:-2] + b'\n'
+            for filename, payload in encoded_attachments:
+                # Headers come from the email package; the payload is already encoded
+                out.append(delimiter + attachment_part(filename, '').as_string().encode('utf-8') + payload.encode('ascii'))
+            out.append(tail[end:])
+        return b''.join(out)
+
+
+class SendQueue:
+    """
+    Durable local queue of pending sends, stored in SQLite (WAL mode)
+    
+    Enqueue a campaign once, then drain it from any number of threads or
+    processes. Dequeued rows are leased to a worker; a worker that dies
+    without acking lets its lease expire and the rows go back to pending.
+    A worker renews a row's lease right before sending it, and every update
+    is conditional on still owning the lease, so a row whose lease ran out
+    and was taken over by another worker is never sent or settled twice.
+    """
+    
+    def __init__(self, path: str, lease_seconds: float = 120.0, max_attempts: int = 5):
+        """
+        Open (or create) the queue database
+        
+        Args:
+            path: SQLite database file
+            lease_seconds: How long a dequeued row stays reserved for its worker
+            max_attempts: Attempts per recipient before a retryable error counts as failed
+        """
+        import sqlite3
+        
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sends (
+                id INTEGER PRIMARY KEY,
+                email TEXT NOT NULL,
+                data TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                message_id TEXT,
+                last_error TEXT,
+                updated_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS sends_status ON sends (status, available_at);
+        """)
+        try:
+            # One row per address (case-insensitive, like RecipientValidator), so enqueueing
+            # the same list again never queues a second send to anyone
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS sends_email ON sends (lower(email))")
+        except sqlite3.IntegrityError:
+            print(f"Warning: {path} already holds duplicate addresses; new duplicates can't be prevented")
+    
+    def _connection(self) -> 'sqlite3.Connection':
+        """One connection per thread (sqlite3 connections can't be shared across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            import sqlite3
+            # Autocommit mode; write transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def enqueue(self, recipients: Iterable, chunk_size: int = 1000) -> Tuple[int, int]:
+        """
+        Bulk-insert recipients as pending sends
+        
+        Addresses already in the queue (in any state, including sent) are skipped, so
+        rerunning with the same list and queue only adds the new recipients.
+        
+        Args:
+            recipients: Email addresses or recipient dicts (e.g., from iter_recipients)
+            chunk_size: Rows per insert transaction
+            
+        Returns:
+            Tuple of (rows enqueued, recipients skipped as already queued)
+        """
+        conn = self._connection()
+        total = 0
+        added = 0
+        rows = (
+            (r['email'].strip(), json.dumps(r)) if isinstance(r, dict) else (r.strip(), None)
+            for r in recipients
+        )
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                changes = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO sends (email, data, updated_at) VALUES (?, ?, ?)",
+                    [(email, data, now) for email, data in chunk]
+                )
+                added += conn.total_changes - changes
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            total += len(chunk)
+        return added, total - added
+    
+    def dequeue(self, limit: int, worker_id: str) -> List[Dict]:
+        """
+        Lease up to limit pending sends to a worker
+        
+        Args:
+            limit: Maximum rows to lease
+            worker_id: Identifier of the leasing worker
+            
+        Returns:
+            List of dicts with 'id', 'email', 'data' (recipient dict or None), 'attempts'
+            and 'lease_owner'
+        """
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases belong to workers that died - put them back in play
+            conn.execute(
+                "UPDATE sends SET status = 'pending', lease_owner = NULL "
+                "WHERE status = 'leased' AND lease_expires < ?",
+                (now,)
+            )
+            rows = conn.execute(
+                "SELECT id, email, data, attempts FROM sends "
+                "WHERE status = 'pending' AND available_at <= ? ORDER BY id LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE sends SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [(worker_id, now + self.lease_seconds, now, row[0]) for row in rows]
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [
+            {'id': row[0], 'email': row[1], 'data': json.loads(row[2]) if row[2] else None,
+             'attempts': row[3] + 1, 'lease_owner': worker_id}
+            for row in rows
+        ]
+    
+    def renew(self, item: Dict) -> bool:
+        """
+        Extend a leased send's lease, e.g. right before sending it
+        
+        Args:
+            item: Row dict returned by dequeue
+            
+        Returns:
+            False if the lease expired and the row now belongs to another worker (don't send it)
+        """
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE sends SET lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (now + self.lease_seconds, now, item['id'], item['lease_owner'])
+        )
+        return cursor.rowcount > 0
+    
+    def ack(self, item: Dict, message_id: Optional[str]) -> bool:
+        """
+        Mark a leased send as sent
+        
+        Returns:
+            False if the lease had been lost to another worker (the row is left to its new owner)
+        """
+        cursor = self._connection().execute(
+            "UPDATE sends SET status = 'sent', message_id = ?, lease_owner = NULL, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (message_id, time.time(), item['id'], item['lease_owner'])
+        )
+        return cursor.rowcount > 0
+    
+    def release(self, items: List[Dict]) -> None:
+        """Hand leased sends that were never attempted back to pending, without counting an attempt"""
+        now = time.time()
+        self._connection().executemany(
+            "UPDATE sends SET status = 'pending', attempts = attempts - 1, lease_owner = NULL, "
+            "updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            [(now, item['id'], item['lease_owner']) for item in items]
+        )
+    
+    def nack(self, item: Dict, error: str, retryable: bool) -> Optional[bool]:
+        """
+        Record a failed attempt, putting retryable failures back with a backoff delay
+        
+        Args:
+            item: Row dict returned by dequeue
+            error: Error code to store
+            retryable: Whether the error is transient (see is_retryable_error)
+            
+        Returns:
+            True if the send was requeued, False if it is now failed for good, None if the
+            lease had been lost to another worker (the row is left to its new owner)
+        """
+        now = time.time()
+        if retryable and item['attempts'] < self.max_attempts:
+            cursor = self._connection().execute(
+                "UPDATE sends SET status = 'pending', available_at = ?, last_error = ?, "
+                "lease_owner = NULL, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + backoff_delay(item['attempts']), error, now, item['id'], item['lease_owner'])
+            )
+            requeued = True
+        else:
+            cursor = self._connection().execute(
+                "UPDATE sends SET status = 'failed', last_error = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (error, now, item['id'], item['lease_owner'])
+            )
+            requeued = False
+        return requeued if cursor.rowcount > 0 else None
+    
+    def stats(self, window: float = 60.0) -> Dict:
+        """
+        Queue counts and recent throughput; safe to call while workers are draining
+        
+        Args:
+            window: Seconds of history used for the throughput figure
+            
+        Returns:
+            Dict with 'pending', 'in_flight', 'sent', 'failed', 'total' and 'sent_per_second'
+        """
+        conn = self._connection()
+        counts = dict(conn.execute("SELECT status, COUNT(*) FROM sends GROUP BY status").fetchall())
+        recent = conn.execute(
+            "SELECT COUNT(*) FROM sends WHERE status = 'sent' AND updated_at >= ?",
+            (time.time() - window,)
+        ).fetchone()[0]
+        return {
+            'pending': counts.get('pending', 0),
+            'in_flight': counts.get('leased', 0),
+            'sent': counts.get('sent', 0),
+            'failed': counts.get('failed', 0),
+            'total': sum(counts.values()),
+            'sent_per_second': round(recent / window, 2)
+        }
+
+
+class SESEmailer:
+    """Class to handle sending emails via AWS SES"""
+    
+    def __init__(
+        self,
+        region_name: str = 'us-west-2',
+        max_workers: int = 1,
+        max_send_rate: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        attachment_cache: Optional[AttachmentCache] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        profiler: Optional[SendProfiler] = None,
+        endpoint_url: Optional[str] = None
+    ):
+        """
+        Initialize the SES client
+        
+        Args:
+            region_name: AWS region name (default: us-west-2)
+            max_workers: Default number of concurrent send workers (default: 1 = sequential)
+            max_send_rate: Messages per second to send at (default: the account's MaxSendRate)
+            rate_limiter: Existing RateLimiter to draw from, e.g. a SharedRateLimiter
+                          covering several processes (default: one is created on first use)
+            attachment_cache: AttachmentCache for encoded attachments (default: a new 64 MB cache)
+            metrics: MetricsRegistry the send paths report to (default: a new registry)
+            profiler: SendProfiler to record every SES call in (optional, for --profile)
+            endpoint_url: Send SES API calls here instead of AWS (optional, e.g. the
+                          local fake_ses_server.py for load tests)
+        """
+        self.max_workers = max(1, max_workers)
+        # One client is shared by all workers; size the HTTP connection pool so
+        # concurrent sends don't queue behind botocore's default of 10 connections.
+        # botocore's own retries are off: throttling goes through the RetryQueue backoff
+        # and a fatal error (e.g. daily quota exceeded) must reach is_fatal_error() at once
+        config = Config(max_pool_connections=max(10, self.max_workers),
+                        retries={'mode': 'standard', 'total_max_attempts': 1})
+        self.ses_client = boto3.client('ses', region_name=region_name, config=config, endpoint_url=endpoint_url)
+        self.region = region_name
+        self.max_send_rate = max_send_rate
+        self._rate_limiter = rate_limiter
+        self._ses_templates = set()
+        self.attachment_cache = attachment_cache or AttachmentCache()
+        self.metrics = metrics or MetricsRegistry()
+        self.profiler = profiler
+    
+    def _call_ses(self, operation: str, method: Callable, recipients: Optional[List[str]] = None, **kwargs) -> Dict:
+        """
+        Make an SES API call, recording its latency (successful or not) in self.metrics
+        
+        recipients only labels the call in the --profile slow-send report.
+        """
+        start = time.perf_counter()
+        error = None
+        try:
+            return method(**kwargs)
+        except ClientError as e:
+            error = e.response['Error']['Code']
+            raise
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.observe('ses_api_latency_seconds', elapsed, operation=operation)
+            self.metrics.inc('ses_api_calls_total', operation=operation)
+            if self.profiler:
+                self.profiler.record_call(operation, elapsed, recipients, error)
+    
+    def set_max_send_rate(self, max_send_rate: Optional[float]) -> None:
+        """
+        Change the send rate, e.g. when a cached emailer is reused for another Lambda invocation
+        
+        The rate limiter (and its bucket state) is kept when the rate is unchanged.
+        
+        Args:
+            max_send_rate: Messages per second to send at (None: the account's MaxSendRate)
+        """
+        if max_send_rate != self.max_send_rate:
+            self.max_send_rate = max_send_rate
+            self._rate_limiter = None
+    
+    def get_max_send_rate(self) -> float:
+        """
+        Read the account's MaxSendRate from get_send_quota
+        
+        Returns:
+            Messages per second allowed by SES (DEFAULT_MAX_SEND_RATE if the quota can't be read)
+        """
+        try:
+            quota = self.ses_client.get_send_quota()
+            return float(quota['MaxSendRate'])
+        except (ClientError, KeyError, ValueError) as e:
+            print(f"Warning: Could not read SES send quota ({e}); using {DEFAULT_MAX_SEND_RATE:.0f} emails/second")
+            return DEFAULT_MAX_SEND_RATE
+    
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Rate limiter shared by all send paths, created from the send quota on first use"""
+        if self._rate_limiter is None:
+            rate = self.max_send_rate or self.get_max_send_rate()
+            self._rate_limiter = RateLimiter(rate)
+        return self._rate_limiter
+    
+    def verify_email_identity(self, email: str) -> bool:
+        """
+        Verify an email address or domain with SES
+        
+        Args:
+            email: Email address to verify
+            
+        Returns:
+            True if verification request was sent successfully
+        """
+        try:
+            response = self.ses_client.verify_email_identity(EmailAddress=email)
+            print(f"Verification email sent to {email}. Please check your inbox.")
+            return True
+        except ClientError as e:
+            print(f"Error verifying email {email}: {e}")
+            return False
+    
+    def send_email(
+        self,
+        sender: str,
+        recipients: List[str],
+        subject: str,
+        body_text: str,
+        body_html: Optional[str] = None,
+        reply_to: Optional[List[str]] = None,
+        bcc: Optional[List[str]] = None,
+        sender_name: Optional[str] = None
+    ) -> Dict:
+        """
+        Send email to multiple recipients using send_email
+        
+        Args:
+            sender: Verified sender email address
+            recipients: List of recipient email addresses
+            subject: Email subject
+            body_text: Plain text email body
+            body_html: HTML email body (optional)
+            reply_to: List of reply-to email addresses (optional)
+            
+        Returns:
+            Dictionary with success status and message IDs
+        """
+        # Use BCC if provided, otherwise use To
+        if bcc:
+            # Send to sender in To, recipients in BCC (protects privacy)
+            destination = {
+                'ToAddresses': [sender],  # Send to yourself
+                'BccAddresses': bcc
+            }
+        else:
+            destination = {
+                'ToAddresses': recipients
+            }
+        
+        message = {
+            'Subject': {'Data': subject, 'Charset': 'UTF-8'},
+            'Body': {'Text': {'Data': body_text, 'Charset': 'UTF-8'}}
+        }
+        
+        if body_html:
+            message['Body']['Html'] = {'Data': body_html, 'Charset': 'UTF-8'}
+        
+        # Format sender with display name if provided
+        if sender_name:
+            formatted_sender = f'{sender_name} <{sender}>'
+        else:
+            formatted_sender = sender
+        
+        try:
+            response = self._call_ses(
+                'SendEmail', self.ses_client.send_email,
+                recipients=bcc or recipients,
+                Source=formatted_sender,
+                Destination=destination,
+                Message=message,
+                ReplyToAddresses=reply_to if reply_to else []
+            )
+            
+            recipient_count = len(bcc) if bcc else len(recipients)
+            print(f"✓ Email sent successfully!")
+            print(f"  Message ID: {response['MessageId']}")
+            if bcc:
+                print(f"  Recipients (BCC): {recipient_count} addresses")
+            else:
+                print(f"  Recipients: {', '.join(recipients)}")
+            
+            return {
+                'success': True,
+                'message_id': response['MessageId'],
+                'recipients': bcc if bcc else recipients
+            }
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            error_message = e.response['Error']['Message']
+            print(f"✗ Error sending email: {error_code} - {error_message}")
+            
+            retryable = is_retryable_error(error_code, error_message)
+            if error_code == 'MessageRejected':
+                print("  Note: Make sure your sender email is verified in SES")
+            elif error_code == 'MailFromDomainNotVerified':
+                print("  Note: The sending domain needs to be verified")
+            elif retryable:
+                print("  Note: Transient SES error, the send can be retried")
+            
+            return {
+                'success': False,
+                'error': error_code,
+                'message': error_message,
+                'retryable': retryable
+            }
+    
+    def send_email_batch(
+        self,
+        sender: str,
+        recipients: Iterable,
+        subject: str,
+        body_text: str,
+        body_html: Optional[str] = None,
+        batch_size: int = 50,
+        use_bcc: bool = True,
+        rate_limit: float = 0.1,  # deprecated: pacing comes from the SES send quota
+        reply_to: Optional[List[str]] = None,
+        sender_name: Optional[str] = None,
+        personalized: bool = False,
+        recipient_data: Optional[Iterable[Dict[str, str]]] = None,
+        generic_greeting: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        collect_results: bool = True,
+        journal: Optional['SendJournal'] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        templates: Optional['EmailTemplates'] = None,
+        attachments: Optional[List[str]] = None,
+        attachment_column: Optional[str] = None,
+        prefetch: int = 100,
+        pack_bcc: bool = False,
+        max_fatal_errors: int = 3,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ) -> Dict:
+        """
+        Send emails in batches with rate limiting and BCC support
+        
+        Args:
+            sender: Verified sender email address
+            recipients: Recipient email addresses (or dicts with 'email' key if personalized). Any
+                        iterable works, including a generator from iter_recipients(); recipients
+                        are pulled one batch at a time.
+            subject: Email subject (can contain placeholders like [NAME] if personalized=True)
+            body_text: Plain text email body (can contain placeholders like [NAME] if personalized=True)
+            body_html: HTML email body (optional, can contain placeholders if personalized=True)
+            batch_size: Number of recipients per batch (default: 50)
+            use_bcc: Use BCC to protect recipient privacy (default: True)
+            rate_limit: Deprecated and ignored; sends are paced by self.rate_limiter, which
+                        enforces the account's MaxSendRate (or max_send_rate if set)
+            reply_to: List of reply-to email addresses (optional)
+            personalized: If True, replace placeholders like [NAME] with recipient data
+            recipient_data: Dicts with recipient data (used instead of recipients if personalized=True)
+            generic_greeting: Generic greeting to use when name is not available (e.g., "Hi There!")
+            max_workers: Number of concurrent send workers (default: the emailer's max_workers).
+                Individual sends within a batch are spread across a thread pool sharing this client.
+            collect_results: Keep per-batch results (including recipient lists) in the summary.
+                             Set to False for very large lists to keep memory flat.
+            journal: SendJournal to record each recipient's outcome in, for --resume (optional)
+            should_stop: Called before each batch and retry round; when it returns True, sending
+                         stops early. 'total' then counts the recipients taken from the stream
+                         (resume at that offset), and retries still backing off are returned
+                         in 'unsent', with the retries each has had so far in 'unsent_attempts'
+                         (optional, e.g. a Lambda time budget check)
+            templates: EmailTemplates already compiled from subject, body_text and body_html
+                       (optional, e.g. cached across warm Lambda invocations)
+            attachments: File paths to attach to every message (optional). Messages go out
+                         through send_raw_email; each file is read and encoded only once.
+            attachment_column: Recipient key holding that recipient's own attachment path(s) or
+                               s3:// URI(s), ';'-separated (optional; recipients must be dicts).
+                               Every recipient then gets an individual message.
+            prefetch: With attachment_column, how many recipients' attachments to load ahead
+            pack_bcc: With use_bcc and identical content, put up to PACKED_BCC_LIMIT recipients in
+                      the BCC of one send_email call (the sender goes in To) instead of one call
+                      per recipient. Each batch then holds at least one packed call per worker.
+                      If a packed call is rejected (e.g. one malformed address), its recipients
+                      are sent individually so only the bad addresses fail.
+            max_fatal_errors: Stop the whole send after this many account- or identity-level
+                              errors in a row (e.g. unverified sender, paused account; see
+                              is_fatal_error) instead of failing every remaining recipient.
+                              Recipients not attempted are counted in 'not_attempted' and the
+                              summary has 'circuit_open' set to the error. 0 never stops.
+            circuit_breaker: Breaker to use instead of one built from max_fatal_errors (optional,
+                             e.g. a SharedCircuitBreaker shared by every --processes shard)
+            
+        Returns:
+            Dictionary with success status and batch results
+        """
+        # Recipient data (when given) carries the personalization fields for each recipient
+        source = recipient_data if personalized and recipient_data is not None else recipients
+        try:
+            expected_total = len(source)
+        except TypeError:
+            expected_total = None  # streamed from a generator - count as we go
+        total_batches = (expected_total + batch_size - 1) // batch_size if expected_total is not None else None
+        
+        workers = max(1, max_workers or self.max_workers)
+        limiter = self.rate_limiter
+        # Packing only applies when every recipient gets the same message
+        pack_bcc = pack_bcc and use_bcc and not (personalized or attachments or attachment_column)
+        if pack_bcc:
+            # Pull enough recipients per batch to keep every worker on a full packed call
+            batch_size = max(batch_size, PACKED_BCC_LIMIT * workers)
+            if expected_total is not None:
+                total_batches = (expected_total + batch_size - 1) // batch_size
+        
+        print(f"\n📧 Batch Sending Configuration:")
+        print(f"  Total recipients: {expected_total if expected_total is not None else 'streaming'}")
+        print(f"  Batch size: {batch_size}")
+        if total_batches is not None:
+            print(f"  Total batches: {total_batches}")
+        print(f"  Use BCC: {use_bcc}")
+        if pack_bcc:
+            print(f"  Packed BCC: up to {PACKED_BCC_LIMIT} recipients per API call")
+        print(f"  Personalized: {personalized}")
+        print(f"  Workers: {workers}")
+        if attachments:
+            print(f"  Attachments: {len(attachments)} file(s), encoded once and reused")
+        if attachment_column:
+            print(f"  Per-recipient attachments: '{attachment_column}' column ({prefetch} prefetched)")
+        print(f"  Send rate: {limiter.rate:.1f} emails/second\n")
+        
+        results = []
+        total_recipients = 0
+        batch_count = 0
+        success_count = 0
+        fail_count = 0
+        stopped = False
+        unsent = []
+        unsent_attempts = []
+        retry_queue = RetryQueue()
+        breaker = circuit_breaker or CircuitBreaker(max_fatal_errors, sender=sender)
+        metrics = self.metrics
+        not_attempted = {'error': 'NotAttempted', 'message': 'Circuit breaker open',
+                         'success': False, 'retryable': False, 'not_attempted': True}
+        # Parse the templates once; each recipient is then a single join per part
+        if templates is None:
+            templates = EmailTemplates(subject, body_text, body_html)
+        # Raw sends share one pre-serialized skeleton (with the shared attachments encoded once)
+        message_builder = None
+        if attachments or attachment_column:
+            message_builder = RawMessageBuilder(
+                sender, attachments=attachments, reply_to=reply_to,
+                sender_name=sender_name, attachment_cache=self.attachment_cache
+            )
+        
+        def send_job(job: Dict) -> Dict:
+            result = attempt_job(job)
+            breaker.record(result)
+            return result
+        
+        def attempt_job(job: Dict) -> Dict:
+            if breaker.tripped:
+                # Queued behind the send that tripped the breaker - don't touch SES
+                return not_attempted
+            
+            # Personalize content if enabled
+            personalized_subject = subject
+            personalized_body_text = body_text
+            personalized_body_html = body_html
+            
+            if personalized:
+                render_start = time.perf_counter()
+                context = build_recipient_context(job['recipient_info'], generic_greeting)
+                personalized_subject, personalized_body_text, personalized_body_html = templates.render(context)
+                metrics.observe('render_seconds', time.perf_counter() - render_start)
+            
+            own_attachments = job.get('attachments')
+            if isinstance(own_attachments, Exception):
+                # This recipient's document couldn't be loaded - never send without it
+                print(f"✗ Attachment error for {', '.join(job['recipients'])}: {own_attachments}")
+                return {'success': False, 'error': 'AttachmentError', 'message': str(own_attachments), 'retryable': False}
+            
+            if job.get('packed'):
+                # SES counts every destination against the send rate, including the sender in To
+                metrics.observe('rate_limiter_wait_seconds', limiter.acquire(len(job['recipients']) + 1))
+                if breaker.tripped:
+                    return not_attempted
+                metrics.inc('emails_attempted_total', len(job['recipients']))
+                result = self.send_email(
+                    sender=sender,
+                    recipients=job['recipients'],
+                    subject=subject,
+                    body_text=body_text,
+                    body_html=body_html,
+                    reply_to=reply_to,
+                    bcc=job['recipients'],
+                    sender_name=sender_name
+                )
+                if journal and result['success']:
+                    for recipient in job['recipients']:
+                        journal.record(recipient, result.get('message_id'), 'sent')
+                return result
+            
+            # SES counts every recipient against the send rate
+            metrics.observe('rate_limiter_wait_seconds', limiter.acquire(len(job['recipients'])))
+            if breaker.tripped:
+                return not_attempted
+            metrics.inc('emails_attempted_total', len(job['recipients']))
+            if attachments or own_attachments:
+                result = self.send_email_with_attachments(
+                    sender=sender,
+                    recipients=job['recipients'],
+                    subject=personalized_subject,
+                    body_text=personalized_body_text,
+                    body_html=personalized_body_html,
+                    attachments=attachments,
+                    reply_to=reply_to,
+                    sender_name=sender_name,
+                    encoded_attachments=own_attachments,
+                    message_builder=message_builder
+                )
+            else:
+                result = self.send_email(
+                    sender=sender,
+                    recipients=job['recipients'],
+                    subject=personalized_subject,
+                    body_text=personalized_body_text,
+                    body_html=personalized_body_html,
+                    reply_to=reply_to,
+                    bcc=None,  # No BCC needed since each job has its own message
+                    sender_name=sender_name
+                )
+            # Journal successes straight away so a crash mid-batch doesn't lose them
+            if journal and result['success']:
+                for recipient in job['recipients']:
+                    journal.record(recipient, result.get('message_id'), 'sent')
+            return result
+        
+        def unsent_job(job: Dict) -> None:
+            if personalized and job['recipient_info'] is not None:
+                unsent.append(job['recipient_info'])
+                unsent_attempts.append(job.get('attempt', 0))
+            else:
+                unsent.extend(job['recipients'])
+                unsent_attempts.extend([job.get('attempt', 0)] * len(job['recipients']))
+        
+        def record_outcome(job: Dict, result: Dict) -> None:
+            nonlocal success_count, fail_count
+            group = job['group']
+            if result['success']:
+                group['successful'] += len(job['recipients'])
+                metrics.inc('emails_sent_total', len(job['recipients']))
+            elif result.get('not_attempted'):
+                # Hand back like a pending retry, so it can be resumed once the problem is fixed
+                unsent_job(job)
+                group['skipped'] += len(job['recipients'])
+                metrics.inc('emails_not_attempted_total', len(job['recipients']))
+            elif result.get('retryable') and retry_queue.push(job):
+                # Throttled: back off and try again later while the rest keeps flowing
+                group['retrying'] += len(job['recipients'])
+                metrics.inc('emails_retried_total', len(job['recipients']))
+            elif job.get('packed') and not result.get('retryable') and not breaker.tripped:
+                # One bad address rejects the whole call; send individually to isolate it
+                group['unpacked'].extend({'recipients': [recipient], 'recipient_info': None, 'attempt': 0}
+                                         for recipient in job['recipients'])
+            else:
+                group['failed'] += len(job['recipients'])
+                metrics.inc('emails_failed_total', len(job['recipients']), error=result.get('error', 'Unknown'))
+                if journal:
+                    for recipient in job['recipients']:
+                        journal.record(recipient, None, 'failed')
+            
+            group['pending'] -= 1
+            if group['pending']:
+                return
+            # Last job of the batch is back: report it as a whole
+            success_count += group['successful']
+            fail_count += group['failed']
+            label = group['label']
+            if not (group['failed'] or group['retrying'] or group['skipped'] or group['unpacked']):
+                print(f"  ✓ {label} sent successfully ({group['successful']} emails)")
+            else:
+                print(f"  ⚠ {label} completed: {group['successful']} success, {group['failed']} failed, "
+                      f"{group['retrying']} queued for retry, {group['skipped']} not attempted")
+            if group['unpacked']:
+                print(f"  ↪ {len(group['unpacked'])} recipient(s) from rejected packed sends go out individually")
+                followups.append((group['batch'], f"{label} (individual fallback)", group['unpacked']))
+            if collect_results:
+                results.append({
+                    'batch': group['batch'],
+                    'recipients': group['recipients'],
+                    'success': group['failed'] == 0,
+                    'successful': group['successful'],
+                    'failed': group['failed'],
+                    'retrying': group['retrying'],
+                    'skipped': group['skipped']
+                })
+        
+        def run_job(job: Dict) -> Dict:
+            try:
+                return send_job(job)
+            except Exception as e:
+                # e.g. EndpointConnectionError: only this job failed, the others stand, and
+                # network errors are retried like throttling
+                print(f"✗ Error sending to {', '.join(job['recipients'])}: {e}")
+                return {'success': False, 'error': type(e).__name__, 'message': str(e),
+                        'retryable': is_transient_exception(e)}
+        
+        def collect(timeout: Optional[float] = None) -> None:
+            done, _ = wait_futures(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                record_outcome(in_flight.pop(future), future.result())
+        
+        def submit_jobs(batch_id, label: str, jobs: List[Dict]) -> None:
+            group = {
+                'batch': batch_id, 'label': label, 'pending': len(jobs),
+                'recipients': [r for job in jobs for r in job['recipients']],
+                'successful': 0, 'failed': 0, 'retrying': 0, 'skipped': 0, 'unpacked': []
+            }
+            for job in jobs:
+                job['group'] = group
+                if executor is None:
+                    record_outcome(job, run_job(job))
+                    continue
+                # Keep the pool fed without queueing the whole batch: wait for a slot, not the batch
+                while len(in_flight) >= max_in_flight:
+                    collect()
+                in_flight[executor.submit(run_job, job)] = job
+        
+        def submit_followups() -> None:
+            while followups:
+                submit_jobs(*followups.pop(0))
+        
+        # Workers share self.ses_client; boto3 clients are thread-safe and the
+        # connection pool is sized to max_workers in __init__.
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        # Sends are submitted as slots free up, so a slow send holds up one worker instead of
+        # the next batch; a few spare jobs per worker keep them busy between completions
+        max_in_flight = workers * 2
+        in_flight = {}
+        followups = []
+        
+        try:
+            recipient_stream = iter(source)
+            if attachment_column:
+                # Load the next recipients' documents while the current batch is sending
+                recipient_stream = prefetch_attachments(recipient_stream, attachment_column, prefetch)
+            while True:
+                submit_followups()
+                if breaker.tripped or (should_stop and should_stop()):
+                    stopped = True
+                    break
+                load_start = time.perf_counter()
+                batch = list(itertools.islice(recipient_stream, batch_size))
+                metrics.observe('load_seconds', time.perf_counter() - load_start)
+                if not batch:
+                    break
+                if attachment_column:
+                    batch, batch_attachments = (list(column) for column in zip(*batch))
+                else:
+                    batch_attachments = [None] * len(batch)
+                batch_count += 1
+                total_recipients += len(batch)
+                batch_recipients = [r['email'] if isinstance(r, dict) else r for r in batch]
+                batch_recipient_data = [r if isinstance(r, dict) else {'email': r, 'name': ''} for r in batch]
+                
+                if pack_bcc:
+                    # Identical content: one call per PACKED_BCC_LIMIT recipients, all in BCC
+                    jobs = [
+                        {'recipients': batch_recipients[i:i + PACKED_BCC_LIMIT], 'recipient_info': None,
+                         'attempt': 0, 'packed': True}
+                        for i in range(0, len(batch_recipients), PACKED_BCC_LIMIT)
+                    ]
+                elif use_bcc or personalized or attachment_column:
+                    # For BCC privacy (or personalized content), send individual emails so each
+                    # recipient only sees their own address
+                    jobs = [
+                        {'recipients': [recipient], 'recipient_info': recipient_info, 'attempt': 0,
+                         'attachments': own_attachments}
+                        for recipient, recipient_info, own_attachments
+                        in zip(batch_recipients, batch_recipient_data, batch_attachments)
+                    ]
+                else:
+                    # Non-personalized without BCC - send to all at once (they'll see each other)
+                    jobs = [{'recipients': batch_recipients, 'recipient_info': None, 'attempt': 0}]
+                
+                # Retries whose backoff has elapsed ride along with the next batch
+                retry_jobs = retry_queue.pop_due()
+                retry_note = f", {len(retry_jobs)} retries" if retry_jobs else ""
+                of_total = f"/{total_batches}" if total_batches is not None else ""
+                print(f"📦 Batch {batch_count}{of_total} ({len(batch_recipients)} recipients{retry_note})...")
+                submit_jobs(batch_count, f"Batch {batch_count}", jobs + retry_jobs)
+            
+            # Drain the sends still in flight, then whatever is still backing off
+            while in_flight or followups or len(retry_queue):
+                submit_followups()
+                if len(retry_queue) and (stopped or breaker.tripped or (should_stop and should_stop())):
+                    stopped = True
+                    # Hand pending retries back to the caller instead of waiting them out
+                    for job in retry_queue.pop_all():
+                        unsent_job(job)
+                    continue
+                retry_jobs = retry_queue.pop_due()
+                if retry_jobs:
+                    print(f"🔁 Retrying {len(retry_jobs)} throttled send(s)...")
+                    submit_jobs('retry', "Retry", retry_jobs)
+                elif in_flight:
+                    collect(timeout=retry_queue.next_due_in() if len(retry_queue) else None)
+                elif len(retry_queue):
+                    time.sleep(max(0.0, retry_queue.next_due_in()))
+        finally:
+            if executor:
+                # Let in-flight sends finish (and get journaled) but drop queued ones on interruption
+                executor.shutdown(wait=True, cancel_futures=True)
+            if journal:
+                journal.flush()
+        
+        print(f"\n📊 Batch Sending Summary:")
+        print(f"  Total: {total_recipients}")
+        print(f"  Successful: {success_count}")
+        print(f"  Failed: {fail_count}")
+        print(f"  Retries: {retry_queue.retries} ({retry_queue.backoff_seconds:.1f}s in backoff)")
+        # Recipients never sent: handed back ones, plus whatever is left of a list of known length
+        not_attempted_count = len(unsent)
+        if breaker.tripped and expected_total is not None:
+            not_attempted_count += expected_total - total_recipients
+        if breaker.tripped:
+            rest = "" if expected_total is not None else " (plus the rest of the list)"
+            print(f"  Not attempted: {not_attempted_count}{rest}")
+            print(f"  ⛔ Stopped by circuit breaker: {breaker.reason}")
+            print(f"     Fix the problem, then resume (e.g. rerun with --journal and --resume)")
+        elif stopped:
+            print(f"  Stopped early: {len(unsent)} pending retries not sent")
+        if total_recipients:
+            print(f"  Success rate: {(success_count/total_recipients*100):.1f}%")
+        
+        return {
+            'success': fail_count == 0,
+            'total': total_recipients,
+            'successful': success_count,
+            'failed': fail_count,
+            'batches': batch_count,
+            'retries': retry_queue.retries,
+            'backoff_seconds': round(retry_queue.backoff_seconds, 3),
+            'stopped': stopped,
+            'unsent': unsent,
+            'unsent_attempts': unsent_attempts,
+            'not_attempted': not_attempted_count,
+            'circuit_open': breaker.reason,
+            'results': results
+        }
+    
+    def drain_queue(
+        self,
+        queue: SendQueue,
+        sender: str,
+        subject: str,
+        body_text: str,
+        body_html: Optional[str] = None,
+        reply_to: Optional[List[str]] = None,
+        sender_name: Optional[str] = None,
+        personalized: bool = False,
+        generic_greeting: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        batch_size: int = 50,
+        journal: Optional[SendJournal] = None,
+        progress_interval: float = 10.0,
+        max_fatal_errors: int = 3
+    ) -> Dict:
+        """
+        Send everything pending in a SendQueue with a pool of worker threads
+        
+        Each worker leases batch_size rows at a time, sends them individually and
+        acks or nacks each one. Other processes can drain the same queue at the
+        same time. Returns once nothing is pending or in flight.
+        
+        Args:
+            queue: SendQueue to drain
+            sender: Verified sender email address
+            subject: Email subject (can contain placeholders if personalized=True)
+            body_text: Plain text email body (can contain placeholders if personalized=True)
+            body_html: HTML email body (optional, can contain placeholders if personalized=True)
+            reply_to: List of reply-to email addresses (optional)
+            sender_name: Display name for sender (optional)
+            personalized: If True, replace placeholders with each row's recipient data
+            generic_greeting: Generic greeting to use when name is not available (e.g., "Hi There!")
+            max_workers: Number of worker threads (default: the emailer's max_workers)
+            batch_size: Rows leased per dequeue
+            journal: SendJournal to record outcomes in (optional)
+            progress_interval: Seconds between queue progress lines
+            max_fatal_errors: Stop draining after this many account- or identity-level errors
+                              in a row (see CircuitBreaker; 0 = never stop). Leased rows not yet
+                              attempted go back to pending for the next drain.
+            
+        Returns:
+            Dictionary with success status and counts for this process
+        """
+        import socket
+        
+        workers = max(1, max_workers or self.max_workers)
+        limiter = self.rate_limiter
+        templates = EmailTemplates(subject, body_text, body_html)
+        breaker = CircuitBreaker(max_fatal_errors, sender=sender)
+        counts = {'successful': 0, 'failed': 0, 'retries': 0, 'not_attempted': 0, 'lost_leases': 0}
+        counts_lock = threading.Lock()
+        stop = threading.Event()
+        worker_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        
+        def record(key: str, count: int = 1) -> None:
+            with counts_lock:
+                counts[key] += count
+        
+        def worker(worker_num: int) -> None:
+            worker_id = f"{worker_prefix}-{worker_num}"
+            while not stop.is_set():
+                items = queue.dequeue(batch_size, worker_id)
+                if not items:
+                    stats = queue.stats()
+                    if stats['pending'] == 0 and stats['in_flight'] == 0:
+                        return
+                    # Rows are backing off or leased elsewhere - check again shortly
+                    time.sleep(0.5)
+                    continue
+                
+                for index, item in enumerate(items):
+                    if stop.is_set():
+                        # Not attempted: back to pending now rather than when the lease expires
+                        queue.release(items[index:])
+                        record('not_attempted', len(items) - index)
+                        self.metrics.inc('emails_not_attempted_total', len(items) - index)
+                        return
+                    info = item['data'] or {'email': item['email'], 'name': ''}
+                    if personalized:
+                        render_start = time.perf_counter()
+                        item_subject, item_text, item_html = templates.render(build_recipient_context(info, generic_greeting))
+                        self.metrics.observe('render_seconds', time.perf_counter() - render_start)
+                    else:
+                        item_subject, item_text, item_html = subject, body_text, body_html
+                    
+                    self.metrics.observe('rate_limiter_wait_seconds', limiter.acquire())
+                    # Pacing can outlast the lease on a big batch at a low send rate: renew it
+                    # now, and leave the row alone if another worker has taken it over
+                    if not queue.renew(item):
+                        print(f"⚠️  Lease on {item['email']} expired and was taken over; skipping it")
+                        record('lost_leases')
+                        continue
+                    self.metrics.inc('emails_attempted_total')
+                    try:
+                        result = self.send_email(
+                            sender=sender,
+                            recipients=[item['email']],
+                            subject=item_subject,
+                            body_text=item_text,
+                            body_html=item_html,
+                            reply_to=reply_to,
+                            sender_name=sender_name
+                        )
+                    except Exception as e:
+                        # Network errors and the like - treat as transient
+                        print(f"✗ Error sending to {item['email']}: {e}")
+                        result = {'success': False, 'error': type(e).__name__, 'retryable': True}
+                    if breaker.record(result):
+                        stop.set()
+                    
+                    if result['success']:
+                        if not queue.ack(item, result.get('message_id')):
+                            print(f"⚠️  Lease on {item['email']} was lost while sending; another worker may send it again")
+                            record('lost_leases')
+                        record('successful')
+                        self.metrics.inc('emails_sent_total')
+                        if journal:
+                            journal.record(item['email'], result.get('message_id'), 'sent')
+                        continue
+                    requeued = queue.nack(item, result.get('error', 'Unknown'), result.get('retryable', False))
+                    if requeued is None:
+                        # Another worker owns the row now and settles it
+                        record('lost_leases')
+                    elif requeued:
+                        record('retries')
+                        self.metrics.inc('emails_retried_total')
+                    else:
+                        record('failed')
+                        self.metrics.inc('emails_failed_total', error=result.get('error', 'Unknown'))
+                        if journal:
+                            journal.record(item['email'], None, 'failed')
+        
+        print(f"\n📬 Draining send queue {queue.path} with {workers} worker(s)...")
+        threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                deadline = time.time() + progress_interval
+                for thread in threads:
+                    thread.join(max(0.0, deadline - time.time()))
+                stats = queue.stats()
+                print(f"📊 Queue: {stats['pending']} pending, {stats['in_flight']} in flight, "
+                      f"{stats['sent']} sent, {stats['failed']} failed ({stats['sent_per_second']}/s over the last minute)")
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            if journal:
+                journal.flush()
+        
+        print(f"\n📊 Queue Drain Summary:")
+        print(f"  Successful: {counts['successful']}")
+        print(f"  Failed: {counts['failed']}")
+        print(f"  Retries: {counts['retries']}")
+        if counts['lost_leases']:
+            print(f"  Lost leases: {counts['lost_leases']} (taken over by another worker; lower --batch-size)")
+        if breaker.tripped:
+            print(f"  Not attempted: {counts['not_attempted']} leased (plus the rest of the queue)")
+            print(f"  ⛔ Stopped by circuit breaker: {breaker.reason}")
+            print(f"     Fix the problem, then drain the queue again (rerun with the same --queue-db)")
+        
+        return {
+            'success': counts['failed'] == 0 and not breaker.tripped,
+            'total': counts['successful'] + counts['failed'],
+            'successful': counts['successful'],
+            'failed': counts['failed'],
+            'retries': counts['retries'],
+            'not_attempted': counts['not_attempted'],
+            'lost_leases': counts['lost_leases'],
+            'circuit_open': breaker.reason,
+            'queue': queue.stats()
+        }
+    
+    def send_email_with_attachments(
+        self,
+        sender: str,
+        recipients: List[str],
+        subject: str,
+        body_text: str,
+        body_html: Optional[str] = None,
+        attachments: Optional[List[str]] = None,
+        reply_to: Optional[List[str]] = None,
+        sender_name: Optional[str] = None,
+        encoded_attachments: Optional[List[Tuple[str, str]]] = None,
+        message_builder: Optional[RawMessageBuilder] = None
+    ) -> Dict:
+        """
+        Send email with attachments using send_raw_email
+        
+        Args:
+            sender: Verified sender email address
+            recipients: List of recipient email addresses
+            subject: Email subject
+            body_text: Plain text email body
+            body_html: HTML email body (optional)
+            attachments: List of file paths to attach (optional)
+            reply_to: List of reply-to email addresses (optional)
+            encoded_attachments: Already-encoded (filename, base64 payload) pairs to attach
+                                 after attachments, e.g. from prefetch_attachments (optional)
+            message_builder: RawMessageBuilder already set up for this sender, reply-to and
+                             attachments, reused across a batch (optional; ignores attachments)
+            
+        Returns:
+            Dictionary with success status and message IDs
+        """
+        try:
+            if message_builder is None:
+                message_builder = RawMessageBuilder(
+                    sender, attachments=attachments, reply_to=reply_to,
+                    sender_name=sender_name, attachment_cache=self.attachment_cache
+                )
+            # Shared structure comes pre-serialized; only this message's parts are encoded
+            build_start = time.perf_counter()
+            raw_message = message_builder.build(
+                recipients, subject, body_text, body_html, encoded_attachments=encoded_attachments
+            )
+            self.metrics.observe('mime_build_seconds', time.perf_counter() - build_start)
+            attached = len(message_builder.attachments) + len(encoded_attachments or [])
+            
+            # Format sender with display name if provided (for Source field)
+            if sender_name:
+                formatted_sender = f'{sender_name} <{sender}>'
+            else:
+                formatted_sender = sender
+            
+            # Send via SES
+            response = self._call_ses(
+                'SendRawEmail', self.ses_client.send_raw_email,
+                recipients=recipients,
+                Source=formatted_sender,
+                Destinations=recipients,
+                RawMessage={'Data': raw_message}
+            )
+            
+            print(f"✓ Email with attachments sent successfully!")
+            print(f"  Message ID: {response['MessageId']}")
+            print(f"  Recipients: {', '.join(recipients)}")
+            if message_builder.attachments or encoded_attachments:
+                print(f"  Attachments: {attached} file(s)")
+            
+            return {
+                'success': True,
+                'message_id': response['MessageId'],
+                'recipients': recipients,
+                'attachments': message_builder.attachments + [filename for filename, _ in encoded_attachments or []]
+            }
+            
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            error_message = e.response['Error']['Message']
+            print(f"✗ Error sending email: {error_code} - {error_message}")
+            
+            if error_code == 'MessageRejected':
+                print("  Note: Make sure your sender email is verified in SES")
+            elif error_code == 'MailFromDomainNotVerified':
+                print("  Note: The sending domain needs to be verified")
+            
+            return {
+                'success': False,
+                'error': error_code,
+                'message': error_message,
+                'retryable': is_retryable_error(error_code, error_message)
+            }
+        except Exception as e:
+            if is_transient_exception(e):
+                print(f"✗ Error sending email: {e}")
+                return {'success': False, 'error': type(e).__name__, 'message': str(e), 'retryable': True}
+            print(f"✗ Error creating email: {e}")
+            return {
+                'success': False,
+                'error': 'EmailCreationError',
+                'message': str(e)
+            }
+    
+    def ensure_ses_template(self, subject: str, body_text: str, body_html: Optional[str] = None) -> str:
+        """
+        Create (or update) an SES template for our placeholder content
+        
+        The template name is derived from a hash of the content, so each distinct
+        subject/body combination is uploaded once and reused on later runs.
+        
+        Args:
+            subject: Email subject with placeholders
+            body_text: Plain text email body with placeholders
+            body_html: HTML email body with placeholders (optional)
+            
+        Returns:
+            Name of the SES template
+        """
+        digest = hashlib.sha256(
+            '\0'.join([subject, body_text, body_html or '']).encode('utf-8')
+        ).hexdigest()
+        template_name = f"ses-emailer-{digest[:32]}"
+        if template_name in self._ses_templates:
+            return template_name
+        
+        template = {
+            'TemplateName': template_name,
+            'SubjectPart': to_ses_template(subject),
+            'TextPart': to_ses_template(body_text)
+        }
+        if body_html:
+            template['HtmlPart'] = to_ses_template(body_html)
+        
+        try:
+            self.ses_client.create_template(Template=template)
+            print(f"Created SES template {template_name}")
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'AlreadyExists':
+                raise
+            self.ses_client.update_template(Template=template)
+            print(f"Updated SES template {template_name}")
+        
+        self._ses_templates.add(template_name)
+        return template_name
+    
+    def send_bulk_email(
+        self,
+        sender: str,
+        recipients: Iterable,
+        subject: str,
+        body_text: str,
+        body_html: Optional[str] = None,
+        default_tags: Optional[List[Dict[str, str]]] = None,
+        sender_name: Optional[str] = None,
+        reply_to: Optional[List[str]] = None,
+        generic_greeting: Optional[str] = None,
+        journal: Optional['SendJournal'] = None,
+        max_fatal_errors: int = 3,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ) -> Dict:
+        """
+        Send personalized emails with SES templates, up to 50 destinations per API call
+        
+        The placeholders are turned into an SES template (see ensure_ses_template) and
+        each destination gets its own ReplacementTemplateData with [NAME]/[EMAIL]/[GREETING]
+        and any [COLUMN] slot from its extra columns, so every recipient still receives
+        an individual message.
+        
+        Args:
+            sender: Verified sender email address
+            recipients: Dicts with 'email' and optional 'name' keys (or plain addresses); any iterable
+                        works and is consumed 50 recipients at a time
+            subject: Email subject (can contain placeholders)
+            body_text: Plain text email body (can contain placeholders)
+            body_html: HTML email body (optional, can contain placeholders)
+            default_tags: List of {'Name': ..., 'Value': ...} tags for email tracking (optional)
+            sender_name: Display name for sender (optional)
+            reply_to: List of reply-to email addresses (optional)
+            generic_greeting: Generic greeting to use when name is not available (e.g., "Hi There!")
+            journal: SendJournal to record each recipient's outcome in, for --resume (optional)
+            max_fatal_errors: Stop after this many account- or identity-level errors in a row
+                              (see CircuitBreaker; 0 = never stop). The rest of the recipients
+                              are not attempted and can be resumed with the journal.
+            circuit_breaker: Breaker to use instead of one built from max_fatal_errors (optional,
+                             e.g. a SharedCircuitBreaker shared by every --processes shard)
+            
+        Returns:
+            Dictionary with success status and per-recipient results
+        """
+        try:
+            template_name = self.ensure_ses_template(subject, body_text, body_html)
+        except ClientError as e:
+            print(f"Error creating SES template: {e}")
+            return {'success': False, 'error': str(e)}
+        
+        formatted_sender = f'{sender_name} <{sender}>' if sender_name else sender
+        slot_keys = EmailTemplates(subject, body_text, body_html).slot_keys
+        # Used by SES for any destination that doesn't supply a value; a [COLUMN] the
+        # recipient has no value for stays as written, like in a per-recipient send
+        defaults = {key: f'[{key.upper()}]' for key in slot_keys}
+        defaults.update({
+            'name': generic_greeting or '',
+            'greeting': generic_greeting or 'Hi!',
+            'email': ''
+        })
+        default_data = json.dumps(defaults)
+        limiter = self.rate_limiter
+        retry_queue = RetryQueue()
+        breaker = circuit_breaker or CircuitBreaker(max_fatal_errors, sender=sender)
+        results = []
+        success_count = 0
+        fail_count = 0
+        not_attempted = 0
+        api_calls = 0
+        
+        def send_chunk(jobs: List[Dict]) -> None:
+            nonlocal success_count, fail_count, not_attempted, api_calls
+            if breaker.tripped:
+                # Queued behind the sends that tripped the breaker - don't touch SES
+                not_attempted += len(jobs)
+                self.metrics.inc('emails_not_attempted_total', len(jobs))
+                return
+            destinations = [
+                {
+                    'Destination': {'ToAddresses': job['recipients']},
+                    'ReplacementTemplateData': json.dumps(job['recipient_info'])
+                }
+                for job in jobs
+            ]
+            request = {
+                'Source': formatted_sender,
+                'Template': template_name,
+                'DefaultTemplateData': default_data,
+                'Destinations': destinations
+            }
+            if reply_to:
+                request['ReplyToAddresses'] = reply_to
+            if default_tags:
+                request['DefaultTags'] = default_tags
+            
+            self.metrics.observe('rate_limiter_wait_seconds', limiter.acquire(len(jobs)))
+            self.metrics.inc('emails_attempted_total', len(jobs))
+            api_calls += 1
+            try:
+                response = self._call_ses(
+                    'SendBulkTemplatedEmail', self.ses_client.send_bulk_templated_email,
+                    recipients=[job['recipients'][0] for job in jobs], **request
+                )
+                statuses = response.get('Status', [])
+            except ClientError as e:
+                # The whole call failed - every destination shares the error
+                error = e.response['Error']
+                print(f"✗ Error in bulk email: {error['Code']} - {error['Message']}")
+                statuses = [{'Status': error['Code'], 'Error': error['Message']}] * len(jobs)
+            except Exception as e:
+                # e.g. EndpointConnectionError: this call failed, the campaign goes on
+                print(f"✗ Error in bulk email: {e}")
+                code = 'TransientFailure' if is_transient_exception(e) else type(e).__name__
+                statuses = [{'Status': code, 'Error': str(e)}] * len(jobs)
+            if len(statuses) < len(jobs):
+                # SES answers with one status per destination; never let a missing one pass silently
+                print(f"⚠️  Bulk call returned {len(statuses)} statuses for {len(jobs)} destinations")
+                statuses = statuses + [{'Status': 'Failed', 'Error': 'No status returned for this destination'}] * (len(jobs) - len(statuses))
+            
+            for job, status in zip(jobs, statuses):
+                code = status.get('Status', 'Failed')
+                if code == 'Success':
+                    result = {
+                        'success': True,
+                        'message_id': status.get('MessageId'),
+                        'recipients': job['recipients']
+                    }
+                else:
+                    result = {
+                        'success': False,
+                        'error': code,
+                        'message': status.get('Error', ''),
+                        'retryable': code in BULK_RETRYABLE_STATUSES or is_retryable_error(code, status.get('Error', '')),
+                        'recipients': job['recipients']
+                    }
+                    if result['retryable'] and retry_queue.push(job):
+                        self.metrics.inc('emails_retried_total')
+                        continue
+                breaker.record(result)
+                results.append(result)
+                if journal:
+                    journal.record(job['recipients'][0], result.get('message_id'), 'sent' if result['success'] else 'failed')
+                if result['success']:
+                    success_count += 1
+                    self.metrics.inc('emails_sent_total')
+                else:
+                    fail_count += 1
+                    self.metrics.inc('emails_failed_total', error=code)
+        
+        def template_data(recipient) -> Dict[str, str]:
+            context = build_recipient_context(recipient if isinstance(recipient, dict) else {'email': recipient},
+                                              generic_greeting)
+            # Only the values the template uses; other columns never leave the machine
+            return {key: context[key] for key in slot_keys if key in context}
+        
+        jobs = (
+            {
+                'recipients': [r['email'] if isinstance(r, dict) else r],
+                'recipient_info': template_data(r),
+                'attempt': 0
+            }
+            for r in recipients
+        )
+        print(f"Sending with template {template_name} ({BULK_DESTINATIONS_LIMIT} destinations per call)...")
+        
+        total = 0
+        chunk_num = 0
+        while not breaker.tripped:
+            chunk = list(itertools.islice(jobs, BULK_DESTINATIONS_LIMIT))
+            if not chunk:
+                break
+            chunk_num += 1
+            total += len(chunk)
+            print(f"📦 Bulk call {chunk_num} ({len(chunk)} destinations)...")
+            send_chunk(chunk)
+            # Retries whose backoff has elapsed go out in their own call
+            retry_jobs = retry_queue.pop_due()
+            for i in range(0, len(retry_jobs), BULK_DESTINATIONS_LIMIT):
+                send_chunk(retry_jobs[i:i + BULK_DESTINATIONS_LIMIT])
+        
+        while len(retry_queue):
+            if breaker.tripped:
+                # Pending retries are left for --resume instead of being waited out
+                send_chunk(retry_queue.pop_all())
+                break
+            time.sleep(retry_queue.next_due_in())
+            retry_jobs = retry_queue.pop_due()
+            if retry_jobs:
+                print(f"🔁 Retrying {len(retry_jobs)} throttled destination(s)...")
+            for i in range(0, len(retry_jobs), BULK_DESTINATIONS_LIMIT):
+                send_chunk(retry_jobs[i:i + BULK_DESTINATIONS_LIMIT])
+        
+        if journal:
+            journal.flush()
+        
+        print(f"\nBulk email summary:")
+        print(f"  Total: {total}")
+        print(f"  Successful: {success_count}")
+        print(f"  Failed: {fail_count}")
+        print(f"  API calls: {api_calls}")
+        print(f"  Retries: {retry_queue.retries} ({retry_queue.backoff_seconds:.1f}s in backoff)")
+        if breaker.tripped:
+            print(f"  Not attempted: {not_attempted} (plus the rest of the list)")
+            print(f"  ⛔ Stopped by circuit breaker: {breaker.reason}")
+            print(f"     Fix the problem, then resume (e.g. rerun with --journal and --resume)")
+        
+        return {
+            'success': fail_count == 0,
+            'total': total,
+            'successful': success_count,
+            'failed': fail_count,
+            'not_attempted': not_attempted,
+            'circuit_open': breaker.reason,
+            'api_calls': api_calls,
+            'template': template_name,
+            'retries': retry_queue.retries,
+            'backoff_seconds': round(retry_queue.backoff_seconds, 3),
+            'results': results
+        }
+
+def _preview_recipients_html(recipients: Optional[List[str]]) -> str:
+    """Short summary for preview HTML when many recipients."""
+    if not recipients:
+        return "Not specified"
+    n = len(recipients)
+    if n <= 10:
+        return html_module.escape(", ".join(recipients))
+    sample = ", ".join(recipients[:5])
+    return html_module.escape(f"{n} addresses (first 5: {sample}, …)")
+
+
+def preview_email(
+    subject: str,
+    body_text: str,
+    body_html: Optional[str] = None,
+    sender: Optional[str] = None,
+    recipients: Optional[List[str]] = None,
+    attachments: Optional[List[str]] = None,
+    sender_name: Optional[str] = None,
+    open_browser: bool = True
+) -> None:
+    """
+    Preview email content before sending
+    
+    Args:
+        subject: Email subject
+        body_text: Plain text email body
+        body_html: HTML email body (optional)
+        sender: Sender email address (optional)
+        recipients: List of recipients (optional)
+        open_browser: Whether to open HTML preview in browser
+    """
+    print("=" * 70)
+    print("EMAIL PREVIEW")
+    print("=" * 70)
+    
+    if sender:
+        if sender_name:
+            print(f"From: {sender_name} <{sender}>")
+        else:
+            print(f"From: {sender}")
+    if recipients:
+        n = len(recipients)
+        if n <= 5:
+            print(f"To ({n}): {', '.join(recipients)}")
+        else:
+            sample = ", ".join(recipients[:3])
+            print(f"To: {n} recipients (showing first 3: {sample}, …)")
+    print(f"Subject: {subject}")
     if attachments:
         print(f"Attachments: {len(attachments)} file(s)")
         for att in attachments:
@@ -654,329 +2654,1059 @@ def preview_email(
                 size = os.path.getsize(att)
                 print(f"  - {os.path.basename(att)} ({size:,} bytes)")
             else:
-                print(f"  - {os.path.basename(att)} (FILE NOT FOUND)")
-    print("=" * 70)
-    print("\nPLAIN TEXT VERSION:")
-    print("-" * 70)
-    print(body_text)
-    print("-" * 70)
+                print(f"  - {os.path.basename(att)} (FILE NOT FOUND)")
+    print("=" * 70)
+    print("\nPLAIN TEXT VERSION:")
+    print("-" * 70)
+    print(body_text)
+    print("-" * 70)
+    
+    if body_html:
+        print("\nHTML VERSION:")
+        print("(Opening in browser...)\n")
+        
+        # Create a preview HTML file
+        preview_html = f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Email Preview - {subject}</title>
+    <style>
+        body {{
+            font-family: Arial, sans-serif;
+            max-width: 800px;
+            margin: 20px auto;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }}
+        .preview-header {{
+            background-color: #333;
+            color: white;
+            padding: 15px;
+            border-radius: 5px 5px 0 0;
+            margin-bottom: 0;
+        }}
+        .preview-header h2 {{
+            margin: 0;
+            font-size: 16px;
+        }}
+        .preview-info {{
+            background-color: #e8e8e8;
+            padding: 10px 15px;
+            font-size: 12px;
+            border-top: 1px solid #ccc;
+        }}
+        .email-content {{
+            background-color: white;
+            padding: 20px;
+            border: 1px solid #ddd;
+            border-top: none;
+            border-radius: 0 0 5px 5px;
+        }}
+        .warning {{
+            background-color: #fff3cd;
+            border: 1px solid #ffc107;
+            padding: 15px;
+            margin-bottom: 20px;
+            border-radius: 5px;
+        }}
+    </style>
+</head>
+<body>
+    <div class="warning">
+        <strong>⚠️ PREVIEW MODE</strong><br>
+        This is how your email will appear to recipients. This preview will not be sent.<br>
+        <em>When you send for real, each address gets its own message (recipients do not see each other).</em>
+    </div>
+    
+    <div class="preview-header">
+        <h2>Email Preview</h2>
+    </div>
+    <div class="preview-info">
+        <strong>From:</strong> {f'{sender_name} <{sender}>' if sender_name and sender else sender or 'Not specified'}<br>
+        <strong>To:</strong> {_preview_recipients_html(recipients)}<br>
+        <strong>Subject:</strong> {subject}
+    </div>
+    <div class="email-content">
+        {body_html}
+    </div>
+</body>
+</html>"""
+        
+        # Save to temporary file and open in browser
+        import tempfile
+        import webbrowser
+        try:
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
+                f.write(preview_html)
+                preview_path = f.name
+            
+            if open_browser:
+                print(f"Opening preview in browser: {preview_path}")
+                webbrowser.open(f'file://{preview_path}')
+                print("\nPreview opened in your default browser.")
+                print("Close the browser window when done reviewing.")
+            else:
+                print(f"Preview saved to: {preview_path}")
+                print("Open this file in your browser to preview the email.")
+        except Exception as e:
+            print(f"Error creating preview: {e}")
+            print("\nHTML content:")
+            print("-" * 70)
+            print(body_html)
+            print("-" * 70)
+    else:
+        print("\n(No HTML version provided)")
+    
+    print("\n" + "=" * 70)
+    print("END OF PREVIEW")
+    print("=" * 70)
+
+
+@lru_cache(maxsize=16384)
+def _derive_replacements(email: str, name: str, generic_greeting: Optional[str]) -> Tuple[str, str, str]:
+    """Derive ([NAME], [GREETING], [EMAIL]) values; memoized so duplicate recipients are computed once"""
+    # Replace [NAME] with recipient name, or use email address as fallback, or generic greeting
+    if not name and email:
+        # Extract name from email (part before @) and format it nicely
+        email_local = email.split('@')[0] if '@' in email else email
+        # Remove dots, underscores, and numbers, then capitalize
+        name = email_local.replace('.', ' ').replace('_', ' ').replace('-', ' ')
+        # Capitalize first letter of each word
+        name = ' '.join(word.capitalize() for word in name.split() if word and not word.isdigit())
+        # If still empty or just numbers, use the original email local part
+        if not name or name.strip() == '':
+            name = email_local.split('.')[0].capitalize()  # Use first part before first dot
+    
+    # [NAME] placeholder - use name if available, otherwise use generic greeting as fallback
+    if name:
+        name_replacement = name
+    elif generic_greeting:
+        # If no name but generic greeting provided, use it for [NAME] placeholder
+        name_replacement = generic_greeting
+    else:
+        name_replacement = ''
+    
+    # [GREETING] placeholder - use name if available, otherwise generic greeting
+    if name:
+        greeting = f"Hi {name}!"
+    elif generic_greeting:
+        greeting = generic_greeting
+    else:
+        greeting = "Hi!"
+    
+    return name_replacement, greeting, email
+
+
+def get_recipient_replacements(recipient_data: Dict[str, str], generic_greeting: Optional[str] = None) -> Dict[str, str]:
+    """
+    Work out the values for the [NAME], [GREETING] and [EMAIL] placeholders
+    
+    Args:
+        recipient_data: Dictionary with recipient data (e.g., {'name': 'John', 'email': 'john@example.com'})
+        generic_greeting: Generic greeting to use when name is not available (e.g., "Hi There!")
+        
+    Returns:
+        Dict with 'name', 'greeting' and 'email' values
+    """
+    name, greeting, email = _derive_replacements(
+        recipient_data.get('email', '').strip(),
+        recipient_data.get('name', '').strip(),
+        generic_greeting
+    )
+    return {'name': name, 'greeting': greeting, 'email': email}
+
+
+def replace_template_placeholders(text: str, recipient_data: Dict[str, str], generic_greeting: Optional[str] = None) -> str:
+    """
+    Replace template placeholders in text with recipient data
+    
+    For repeated rendering of the same text, compile_template() once and call
+    render() per recipient instead.
+    
+    Args:
+        text: Text with placeholders like [NAME], [EMAIL], [GREETING] (or any [COLUMN] from recipient_data)
+        recipient_data: Dictionary with recipient data (e.g., {'name': 'John', 'email': 'john@example.com'})
+        generic_greeting: Generic greeting to use when name is not available (e.g., "Hi There!")
+        
+    Returns:
+        Text with placeholders replaced
+    """
+    template = compile_template(text)
+    if not template.has_slots:
+        return text
+    return template.render(build_recipient_context(recipient_data, generic_greeting))
+
+
+def to_ses_template(text: str) -> str:
+    """
+    Translate placeholders into SES (Handlebars) template syntax
+    
+    Every slot compile_template() would fill becomes a variable named after its
+    slot key ([COMPANY] -> {{{company}}}), so the ReplacementTemplateData built by
+    send_bulk_email covers them all. Values are inserted unescaped ({{{...}}}) to
+    match replace_template_placeholders, and any literal "{{" in the content is
+    escaped so Handlebars leaves it alone.
+    
+    Args:
+        text: Text with placeholders like [NAME], [EMAIL], [GREETING], [COMPANY]
+        
+    Returns:
+        Text usable as an SES template part
+    """
+    def slot(match):
+        token = match.group(1)
+        return f'{{{{{{{token.lower()}}}}}}}' if _is_slot(token) else match.group(0)
+    
+    return _PLACEHOLDER_PATTERN.sub(slot, text.replace('{{', '\\{{'))
+
+
+# [TOKEN] placeholders; only uppercase tokens are slots, so [Name] and the [endif] of
+# Outlook conditional comments stay literal
+_PLACEHOLDER_PATTERN = re.compile(r'\[([A-Za-z][A-Za-z0-9_]*)\]')
+# The built-in placeholders are also accepted in lowercase ([name]), as they always were
+_BUILTIN_SLOTS = ('name', 'greeting', 'email')
+
+
+def _is_slot(token: str) -> bool:
+    """Whether a [TOKEN] is a placeholder to fill rather than literal text"""
+    return token == token.upper() or token in _BUILTIN_SLOTS
+
+
+def column_slot_key(column: str) -> str:
+    """
+    Normalize a CSV/JSON column name into a placeholder key ("First Name" -> "first_name",
+    usable as [FIRST_NAME])
+    """
+    return re.sub(r'[^a-z0-9]+', '_', column.strip().lower()).strip('_')
+
+
+class CompiledTemplate:
+    """
+    Template text parsed once into literal and placeholder (slot) segments
+    
+    Rendering fills the slots and does a single join, instead of one full-string
+    str.replace pass per placeholder. Output matches replace_template_placeholders
+    for [NAME], [EMAIL] and [GREETING]; any other [COLUMN] slot is filled from the
+    recipient's extra columns, or left as-is when the recipient has no such column.
+    """
+    
+    __slots__ = ('text', '_segments', '_slots')
+    
+    def __init__(self, text: str):
+        self.text = text
+        parts = _PLACEHOLDER_PATTERN.split(text)
+        # parts alternates literal, token, literal, token, ..., literal
+        self._segments = parts[:]
+        self._slots = []
+        for index in range(1, len(parts), 2):
+            token = parts[index]
+            self._segments[index] = f'[{token}]'
+            if _is_slot(token):
+                self._slots.append((index, token.lower()))
+    
+    @property
+    def has_slots(self) -> bool:
+        """True if the template contains any placeholders"""
+        return bool(self._slots)
+    
+    @property
+    def slot_keys(self) -> List[str]:
+        """Distinct slot keys in order of first use ('name', 'company', ...)"""
+        return list(dict.fromkeys(key for _, key in self._slots))
+    
+    def render(self, values: Dict[str, str]) -> str:
+        """
+        Fill the slots from values
+        
+        Args:
+            values: Placeholder values keyed by lowercase slot name ('name', 'email', 'greeting', 'company', ...)
+            
+        Returns:
+            Rendered text
+        """
+        if not self._slots:
+            return self.text
+        segments = self._segments[:]
+        for index, key in self._slots:
+            value = values.get(key)
+            if value is not None:
+                segments[index] = value
+        return ''.join(segments)
+
+
+@lru_cache(maxsize=64)
+def compile_template(text: str) -> CompiledTemplate:
+    """
+    Parse template text into a CompiledTemplate (cached, so repeated calls with the same text are free)
+    
+    Args:
+        text: Text with placeholders like [NAME], [EMAIL], [GREETING], [COMPANY]
+        
+    Returns:
+        CompiledTemplate ready for per-recipient rendering
+    """
+    return CompiledTemplate(text)
+
+
+def build_recipient_context(recipient_data: Dict[str, str], generic_greeting: Optional[str] = None) -> Dict[str, str]:
+    """
+    Build the render context for one recipient: extra columns plus [NAME]/[GREETING]/[EMAIL]
+    
+    Compute this once per recipient and pass it to EmailTemplates.render (or
+    CompiledTemplate.render) for the subject, text and HTML parts. The derived
+    name and greeting are memoized, so duplicate addresses cost a dict lookup.
+    
+    Args:
+        recipient_data: Dictionary with recipient data (e.g., {'name': 'John', 'email': 'john@example.com', 'company': 'Amaze'})
+        generic_greeting: Generic greeting to use when name is not available (e.g., "Hi There!")
+        
+    Returns:
+        Dict of placeholder values keyed by lowercase slot name
+    """
+    context = {column_slot_key(k): v for k, v in recipient_data.items() if isinstance(v, str)}
+    context.update(get_recipient_replacements(recipient_data, generic_greeting))
+    return context
+
+
+class EmailTemplates:
+    """Compiled subject, text and HTML templates rendered together from one recipient context"""
+    
+    def __init__(self, subject: str, body_text: str, body_html: Optional[str] = None):
+        """
+        Compile the three message parts
+        
+        Args:
+            subject: Email subject with placeholders
+            body_text: Plain text email body with placeholders
+            body_html: HTML email body with placeholders (optional)
+        """
+        self.subject = compile_template(subject)
+        self.body_text = compile_template(body_text)
+        self.body_html = compile_template(body_html) if body_html else None
+    
+    def render(self, context: Dict[str, str]) -> Tuple[str, str, Optional[str]]:
+        """
+        Render all parts for one recipient
+        
+        Args:
+            context: Recipient context from build_recipient_context
+            
+        Returns:
+            Tuple of (subject, body_text, body_html)
+        """
+        return (
+            self.subject.render(context),
+            self.body_text.render(context),
+            self.body_html.render(context) if self.body_html else None
+        )
+    
+    @property
+    def slot_keys(self) -> List[str]:
+        """Distinct slot keys used by any of the parts"""
+        parts = (self.subject, self.body_text, self.body_html) if self.body_html else (self.subject, self.body_text)
+        return list(dict.fromkeys(key for part in parts for key in part.slot_keys))
+
+
+def _add_extra_columns(record: Dict[str, str], row: Dict) -> Dict[str, str]:
+    """Copy non-email/name columns from a CSV row or JSON object into a recipient record"""
+    for column, value in row.items():
+        if not column or value is None:
+            continue
+        key = column_slot_key(column)
+        if key and key not in record:
+            record[key] = value.strip() if isinstance(value, str) else str(value)
+    return record
+
+
+def _iter_csv_recipients(lines: Iterator[str], include_names: bool) -> Iterator:
+    """Parse recipients from CSV lines, detecting a header row from the first line"""
+    first_line = next(lines, '')
+    
+    # Check if first line looks like a header
+    header = first_line.strip()
+    has_header = header.lower() in ['email', 'e-mail', 'email_address', 'emailaddress'] or \
+                any(col.lower() in header.lower() for col in ['email', 'name'])
+    
+    # Put the first line back in front of the rest of the stream
+    lines = itertools.chain([first_line], lines)
+    reader = csv.DictReader(lines) if has_header else csv.reader(lines)
+    
+    found = 0
+    for row in reader:
+        if isinstance(row, dict):
+            # CSV with header - look for common email column names
+            email = None
+            name = None
+            
+            # Find email column
+            for col in ['email', 'Email', 'EMAIL', 'e-mail', 'E-mail', 'email_address', 'EmailAddress']:
+                if col in row and row[col]:
+                    email = row[col].strip()
+                    break
+            
+            # If no standard column found, use first column
+            if not email:
+                email = list(row.values())[0].strip() if row.values() else None
+            
+            # Find name column if include_names is True
+            if include_names:
+                for col in ['name', 'Name', 'NAME', 'first_name', 'First Name', 'firstname', 'FirstName']:
+                    if col in row and row[col]:
+                        name = row[col].strip()
+                        break
+                # If no name found, try second column
+                if not name and len(row) > 1:
+                    values = list(row.values())
+                    if len(values) > 1:
+                        name = values[1].strip() if values[1] else None
+        else:
+            # CSV without header - use first column for email
+            email = row[0].strip() if row else None
+            # Use second column for name if available
+            name = row[1].strip() if include_names and len(row) > 1 and row[1] else None
+        
+        if email and '@' in email:
+            found += 1
+            if include_names:
+                record = {'email': email, 'name': name or ''}
+                if isinstance(row, dict):
+                    # Keep the other columns so they can be used as [COLUMN] placeholders
+                    _add_extra_columns(record, row)
+                yield record
+            else:
+                yield email
     
-    if body_html:
-        print("\nHTML VERSION:")
-        print("(Opening in browser...)\n")
+    if not found:
+        print("Warning: No valid email addresses found in CSV file")
+
+
+def _iter_json_array(chunks: Iterator[str]) -> Iterator:
+    """
+    Yield the elements of a JSON document incrementally
+    
+    A top-level array is decoded one element at a time, so memory stays at roughly
+    one read chunk. The {"recipients": [...]} form is decoded in one go.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = next(chunks, '')
+        if not chunk:
+            eof = True
+            return False
+        # Drop what has been consumed so the buffer doesn't grow with the file
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+    
+    def skip_whitespace() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return ''
+    
+    first = skip_whitespace()
+    if first == '{':
+        # Wrapper object - not streamable element by element
+        while fill():
+            pass
+        data = json.loads(buffer[pos:])
+        if not isinstance(data, dict) or 'recipients' not in data:
+            raise ValueError("JSON file must contain a list or dict with 'recipients' key")
+        yield from data['recipients']
+        return
+    if first != '[':
+        raise ValueError("JSON file must contain a list or dict with 'recipients' key")
+    pos += 1
+    
+    while True:
+        char = skip_whitespace()
+        if char == ']':
+            return
+        if char == ',':
+            pos += 1
+            continue
+        if not char:
+            raise json.JSONDecodeError("Unterminated array", buffer, pos)
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+            # A value that ends exactly at the buffer edge may be cut short (e.g. a number)
+            if end == len(buffer) and not eof:
+                raise json.JSONDecodeError("Incomplete value", buffer, pos)
+        except json.JSONDecodeError:
+            if eof or not fill():
+                raise
+            continue
+        pos = end
+        yield value
+
+
+def _json_recipient(r, include_names: bool):
+    """Normalize a JSON recipient (string or object) to an address or a recipient dict"""
+    if include_names:
+        if isinstance(r, str):
+            return {'email': r, 'name': ''}
+        if isinstance(r, dict):
+            return _add_extra_columns({'email': r.get('email', ''), 'name': r.get('name', '')}, r)
+        return None
+    return r if isinstance(r, str) else r['email']
+
+
+_s3_client = None
+
+
+def is_s3_uri(path: str) -> bool:
+    """True for s3://bucket/key URIs"""
+    return path.startswith('s3://')
+
+
+def parse_s3_uri(uri: str) -> Tuple[str, str]:
+    """
+    Split an s3://bucket/key URI into bucket and key
+    
+    Args:
+        uri: S3 URI
         
-        # Create a preview HTML file
-        preview_html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Email Preview - {subject}</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            max-width: 800px;
-            margin: 20px auto;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .preview-header {{
-            background-color: #333;
-            color: white;
-            padding: 15px;
-            border-radius: 5px 5px 0 0;
-            margin-bottom: 0;
-        }}
-        .preview-header h2 {{
-            margin: 0;
-            font-size: 16px;
-        }}
-        .preview-info {{
-            background-color: #e8e8e8;
-            padding: 10px 15px;
-            font-size: 12px;
-            border-top: 1px solid #ccc;
-        }}
-        .email-content {{
-            background-color: white;
-            padding: 20px;
-            border: 1px solid #ddd;
-            border-top: none;
-            border-radius: 0 0 5px 5px;
-        }}
-        .warning {{
-            background-color: #fff3cd;
-            border: 1px solid #ffc107;
-            padding: 15px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="warning">
-        <strong>⚠️ PREVIEW MODE</strong><br>
-        This is how your email will appear to recipients. This preview will not be sent.<br>
-        <em>When you send for real, each address gets its own message (recipients do not see each other).</em>
-    </div>
+    Returns:
+        Tuple of (bucket, key)
+    """
+    bucket, _, key = uri[len('s3://'):].partition('/')
+    if not bucket or not key:
+        raise ValueError(f"Invalid S3 URI (expected s3://bucket/key): {uri}")
+    return bucket, key
+
+
+class _StreamingBodyIO(io.RawIOBase):
+    """Raw binary stream over an S3 get_object body, so io can buffer and decode it incrementally"""
     
-    <div class="preview-header">
-        <h2>Email Preview</h2>
-    </div>
-    <div class="preview-info">
-        <strong>From:</strong> {f'{sender_name} <{sender}>' if sender_name and sender else sender or 'Not specified'}<br>
-        <strong>To:</strong> {_preview_recipients_html(recipients)}<br>
-        <strong>Subject:</strong> {subject}
-    </div>
-    <div class="email-content">
-        {body_html}
-    </div>
-</body>
-</html>"""
+    def __init__(self, body):
+        self._body = body
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._body.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    def close(self) -> None:
+        if not self.closed:
+            self._body.close()
+        super().close()
+
+
+def open_text(path: str, newline: Optional[str] = None, s3_client=None):
+    """
+    Open a local file or s3://bucket/key URI for reading UTF-8 text
+    
+    S3 objects are streamed from get_object as they are read, never downloaded
+    to disk first.
+    
+    Args:
+        path: Local path or s3:// URI
+        newline: Newline handling, as for open() ('' for CSV)
+        s3_client: boto3 S3 client (or stand-in) for s3:// URIs (default: a shared client)
+        
+    Returns:
+        Text file object (use as a context manager)
+    """
+    if not is_s3_uri(path):
+        return open(path, 'r', encoding='utf-8', newline=newline)
+    
+    global _s3_client
+    if s3_client is None:
+        if _s3_client is None:
+            _s3_client = boto3.client('s3')
+        s3_client = _s3_client
+    bucket, key = parse_s3_uri(path)
+    try:
+        body = s3_client.get_object(Bucket=bucket, Key=key)['Body']
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', 'NoSuchBucket', '404'):
+            raise FileNotFoundError(f"{path} not found") from e
+        raise
+    return io.TextIOWrapper(io.BufferedReader(_StreamingBodyIO(body), 65536), encoding='utf-8', newline=newline)
+
+
+def read_bytes(path: str, s3_client=None) -> bytes:
+    """
+    Read a whole local file or s3:// object as bytes
+    
+    Args:
+        path: Local path or s3:// URI
+        s3_client: boto3 S3 client (or stand-in) for s3:// URIs (default: a shared client)
+        
+    Returns:
+        File contents
+    """
+    if not is_s3_uri(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    with open_text(path, s3_client=s3_client) as f:
+        return f.buffer.read()
+
+
+def iter_recipient_lines(lines: Iterable[str], file_format: str = 'csv', include_names: bool = False) -> Iterator:
+    """
+    Parse recipients from lines of CSV or JSON Lines text (e.g., a byte range of a larger file)
+    
+    Args:
+        lines: Text lines; for CSV the first line may be a header row
+        file_format: 'csv' or 'jsonl'
+        include_names: If True, yields dicts with 'email' and 'name' keys
+        
+    Yields:
+        Email addresses (or dicts if include_names=True)
+    """
+    if file_format == 'csv':
+        yield from _iter_csv_recipients(iter(lines), include_names)
+    elif file_format == 'jsonl':
+        for line in lines:
+            line = line.strip()
+            if line:
+                recipient = _json_recipient(json.loads(line), include_names)
+                if recipient is not None:
+                    yield recipient
+    else:
+        raise ValueError(f"Unsupported recipient line format: {file_format}")
+
+
+def iter_recipients(file_path: str, include_names: bool = False, s3_client=None) -> Iterator:
+    """
+    Stream recipients from a CSV, JSON or JSON Lines file
+    
+    Recipients are yielded one at a time, so memory use stays flat regardless of
+    list size. JSON arrays are decoded incrementally; JSON Lines (.jsonl/.ndjson)
+    files hold one address or object per line. s3://bucket/key URIs are parsed
+    straight from the get_object stream.
+    
+    Args:
+        file_path: Path or s3:// URI of the CSV, JSON or JSON Lines file
+        include_names: If True, yields dicts with 'email' and 'name' keys
+                       (plus any other columns, keyed by column_slot_key)
+        s3_client: boto3 S3 client (or stand-in) for s3:// URIs (optional)
+        
+    Yields:
+        Email addresses (or dicts if include_names=True)
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    
+    if file_ext == '.csv':
+        try:
+            with open_text(file_path, newline='', s3_client=s3_client) as f:
+                yield from _iter_csv_recipients(iter(f), include_names)
+        except Exception as e:
+            print(f"Error reading CSV file: {e}")
+            sys.exit(1)
+    
+    elif file_ext in ('.jsonl', '.ndjson'):
+        try:
+            with open_text(file_path, s3_client=s3_client) as f:
+                yield from iter_recipient_lines(f, 'jsonl', include_names)
+        except FileNotFoundError:
+            print(f"Error: File {file_path} not found")
+            sys.exit(1)
+        except json.JSONDecodeError as e:
+            print(f"Error parsing JSON Lines file: {e}")
+            sys.exit(1)
+    
+    elif file_ext == '.json':
+        try:
+            with open_text(file_path, s3_client=s3_client) as f:
+                for r in _iter_json_array(iter(lambda: f.read(65536), '')):
+                    recipient = _json_recipient(r, include_names)
+                    if recipient is not None:
+                        yield recipient
+        except FileNotFoundError:
+            print(f"Error: File {file_path} not found")
+            sys.exit(1)
+        except json.JSONDecodeError as e:
+            print(f"Error parsing JSON file: {e}")
+            sys.exit(1)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    
+    else:
+        # Try to auto-detect format from the first line: JSON if it opens an array/object, else CSV
+        try:
+            with open_text(file_path, newline='', s3_client=s3_client) as f:
+                first_line = f.readline()
+                if first_line.lstrip()[:1] in ('[', '{'):
+                    chunks = itertools.chain([first_line], iter(lambda: f.read(65536), ''))
+                    for r in _iter_json_array(chunks):
+                        recipient = _json_recipient(r, include_names)
+                        if recipient is not None:
+                            yield recipient
+                else:
+                    for row in csv.reader(itertools.chain([first_line], f)):
+                        if row and '@' in row[0]:
+                            if include_names:
+                                name = row[1].strip() if len(row) > 1 and row[1] else ''
+                                yield {'email': row[0].strip(), 'name': name}
+                            else:
+                                yield row[0].strip()
+        except Exception as e:
+            print(f"Error: Could not parse file as JSON or CSV: {e}")
+            print("Please use a .csv, .json or .jsonl file, or ensure the file format is correct")
+            sys.exit(1)
+
+
+def load_recipients_from_file(file_path: str, include_names: bool = False) -> List[str]:
+    """
+    Load recipients from a CSV, JSON or JSON Lines file
+    
+    Use iter_recipients() instead for large lists that shouldn't be held in memory.
+    
+    Args:
+        file_path: Path or s3:// URI of the CSV, JSON or JSON Lines file
+        include_names: If True, returns list of dicts with 'email' and 'name' keys
+                       (plus any other columns, keyed by column_slot_key)
+        
+    Returns:
+        List of email addresses (or list of dicts if include_names=True)
+    """
+    return list(iter_recipients(file_path, include_names=include_names))
+
+
+# Address syntax accepted by the validation pre-pass: a dot-atom local part and a dotted
+# domain name (what SES accepts without quoting; it rejects the rest per message)
+EMAIL_PATTERN = re.compile(
+    r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r"@(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z][A-Za-z0-9-]{0,62}"
+)
+
+
+def normalize_email(email: str) -> str:
+    """
+    Canonical form of an address: surrounding whitespace removed, domain lowercased
+    
+    The local part keeps its case (it is technically case-sensitive), but two addresses
+    that differ only in case are still treated as the same recipient when deduplicating.
+    """
+    email = email.strip()
+    local, at, domain = email.rpartition('@')
+    return f"{local}@{domain.lower()}" if at else email
+
+
+class RecipientValidator:
+    """
+    One-pass validation of a recipient stream before sending
+    
+    Addresses are normalized (normalize_email), checked against EMAIL_PATTERN and
+    deduplicated case-insensitively against a set of the addresses seen so far, so
+    memory grows only with the number of unique addresses. Dropped recipients are
+    counted and optionally written to a CSV side file (email, reason, position).
+    """
+    
+    def __init__(self, rejects_path: Optional[str] = None, append: bool = False, flush_every: int = 1000):
+        """
+        Set up the validator
+        
+        Args:
+            rejects_path: CSV file to write dropped recipients to (optional)
+            append: Append to an existing rejects file (e.g. one per shard process) instead of
+                    starting a new one with a header row; each flush is one O_APPEND write
+            flush_every: Rejects buffered before writing them out
+        """
+        self.rejects_path = rejects_path
+        self.flush_every = flush_every
+        self.counts = {'valid': 0, 'invalid': 0, 'duplicate': 0}
+        self._seen = set()
+        self._buffer = []
+        self._fd = None
+        if rejects_path:
+            flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if append else os.O_TRUNC)
+            self._fd = os.open(rejects_path, flags, 0o644)
+            if not append:
+                os.write(self._fd, b'email,reason,position\n')
+    
+    def check(self, email: str) -> Tuple[str, Optional[str]]:
+        """
+        Validate one address and remember it
         
-        # Save to temporary file and open in browser
-        try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-                f.write(preview_html)
-                preview_path = f.name
+        Args:
+            email: Address as read from the list
             
-            if open_browser:
-                print(f"Opening preview in browser: {preview_path}")
-                webbrowser.open(f'file://{preview_path}')
-                print("\nPreview opened in your default browser.")
-                print("Close the browser window when done reviewing.")
+        Returns:
+            (normalized address, None) if it should be sent, else (address, 'invalid' or 'duplicate')
+        """
+        if not isinstance(email, str):
+            return '', 'invalid'
+        email = email.strip()
+        key = email.lower()
+        if key != email:
+            email = normalize_email(email)
+        # Only valid addresses are remembered, so a seen address needs no pattern match
+        if key in self._seen:
+            return email, 'duplicate'
+        if len(email) > 254 or not EMAIL_PATTERN.fullmatch(email) or email.index('@') > 64:
+            return email, 'invalid'
+        self._seen.add(key)
+        return email, None
+    
+    def filter(self, recipients: Iterable, keep: Optional[Callable] = None) -> Iterator:
+        """
+        Yield the recipients that pass, with normalized addresses
+        
+        Args:
+            recipients: Email addresses or recipient dicts with an 'email' key (dicts are updated in place)
+            keep: Only validate recipients for which this returns True, e.g. one shard's share
+                  of the list; the others are skipped silently but still count for positions
+            
+        Yields:
+            Valid, first-seen recipients in their original order
+        """
+        for position, recipient in enumerate(recipients, 1):
+            if keep and not keep(recipient):
+                continue
+            is_record = isinstance(recipient, dict)
+            raw = recipient.get('email') if is_record else recipient
+            email, reason = self.check(raw)
+            if reason:
+                # Invalid addresses are reported as they appear in the list
+                self._reject(email if reason == 'duplicate' else str(raw or '').strip(), reason, position)
+                continue
+            self.counts['valid'] += 1
+            if is_record:
+                recipient['email'] = email
+                yield recipient
             else:
-                print(f"Preview saved to: {preview_path}")
-                print("Open this file in your browser to preview the email.")
-        except Exception as e:
-            print(f"Error creating preview: {e}")
-            print("\nHTML content:")
-            print("-" * 70)
-            print(body_html)
-            print("-" * 70)
-    else:
-        print("\n(No HTML version provided)")
+                yield email
     
-    print("\n" + "=" * 70)
-    print("END OF PREVIEW")
-    print("=" * 70)
+    def _reject(self, email: str, reason: str, position: int) -> None:
+        self.counts[reason] += 1
+        if self._fd is None:
+            return
+        line = io.StringIO()
+        csv.writer(line).writerow([email, reason, position])
+        self._buffer.append(line.getvalue())
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write buffered rejects to the side file"""
+        if self._fd is not None and self._buffer:
+            data = ''.join(self._buffer).encode('utf-8')
+            self._buffer = []
+            while data:
+                written = os.write(self._fd, data)
+                data = data[written:]
+    
+    def close(self, metrics: Optional[MetricsRegistry] = None) -> None:
+        """
+        Flush and close the rejects file
+        
+        Args:
+            metrics: Registry to add the reject counts to (optional)
+        """
+        self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if metrics:
+            for reason in ('invalid', 'duplicate'):
+                if self.counts[reason]:
+                    metrics.inc('recipients_rejected_total', self.counts[reason], reason=reason)
+    
+    def summary(self) -> str:
+        """One-line description of what was dropped"""
+        text = f"🧹 Validation: {self.counts['duplicate']} duplicate(s) and {self.counts['invalid']} invalid address(es) skipped"
+        if self.rejects_path and (self.counts['duplicate'] or self.counts['invalid']):
+            text += f" (see {self.rejects_path})"
+        return text
 
 
-def replace_template_placeholders(text: str, recipient_data: Dict[str, str], generic_greeting: Optional[str] = None) -> str:
+def _exit_on_sigterm(signum, frame):
+    """Turn SIGTERM into SystemExit so cleanup (executor shutdown, journal flush) runs"""
+    print("\n⚠️  Received SIGTERM, stopping after in-flight sends...")
+    raise SystemExit(128 + signum)
+
+
+def shard_for(email: str, shard_count: int) -> int:
+    """Stable shard index for a recipient (the same address always lands in the same shard)"""
+    return zlib.crc32(email.strip().lower().encode('utf-8')) % shard_count
+
+
+def merge_send_results(results: List[Dict]) -> Dict:
     """
-    Replace template placeholders in text with recipient data
+    Combine the summaries returned by several send_email_batch/send_bulk_email calls
     
     Args:
-        text: Text with placeholders like [NAME], [EMAIL], [GREETING]
-        recipient_data: Dictionary with recipient data (e.g., {'name': 'John', 'email': 'john@example.com'})
-        generic_greeting: Generic greeting to use when name is not available (e.g., "Hi There!")
+        results: Summary dicts (per-recipient 'results' lists are concatenated if present)
         
     Returns:
-        Text with placeholders replaced
+        Dictionary with success status and summed counts
+    """
+    merged = {'success': all(r.get('success') for r in results), 'results': []}
+    for key in ('total', 'successful', 'failed', 'not_attempted', 'duplicates', 'invalid', 'batches', 'api_calls', 'retries', 'backoff_seconds'):
+        if any(key in r for r in results):
+            merged[key] = sum(r.get(key, 0) for r in results)
+    if 'backoff_seconds' in merged:
+        merged['backoff_seconds'] = round(merged['backoff_seconds'], 3)
+    reasons = [r['circuit_open'] for r in results if r.get('circuit_open')]
+    if reasons:
+        merged['circuit_open'] = reasons[0]
+    snapshots = [r['metrics'] for r in results if r.get('metrics')]
+    if snapshots:
+        metrics = MetricsRegistry()
+        for snapshot in snapshots:
+            metrics.merge(snapshot)
+        merged['metrics'] = metrics.snapshot()
+    for r in results:
+        merged['results'].extend(r.get('results', []))
+    return merged
+
+
+_shard_rate_limiter = None
+_shard_circuit_breaker = None
+
+
+def _init_shard_worker(rate_limiter: RateLimiter, circuit_breaker: CircuitBreaker) -> None:
+    """Process pool initializer: keep the shared rate budget and breaker, and unwind cleanly on SIGTERM"""
+    global _shard_rate_limiter, _shard_circuit_breaker
+    _shard_rate_limiter = rate_limiter
+    _shard_circuit_breaker = circuit_breaker
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+
+
+def _send_shard(shard: int, shard_count: int, options: Dict) -> Dict:
     """
-    result = text
-    email = recipient_data.get('email', '').strip()
+    Send the recipients that hash to one shard (runs in a worker process)
     
-    # Replace [NAME] with recipient name, or use email address as fallback, or generic greeting
-    name = recipient_data.get('name', '').strip()
-    if not name and email:
-        # Extract name from email (part before @) and format it nicely
-        email_local = email.split('@')[0] if '@' in email else email
-        # Remove dots, underscores, and numbers, then capitalize
-        name = email_local.replace('.', ' ').replace('_', ' ').replace('-', ' ')
-        # Capitalize first letter of each word
-        name = ' '.join(word.capitalize() for word in name.split() if word and not word.isdigit())
-        # If still empty or just numbers, use the original email local part
-        if not name or name.strip() == '':
-            name = email_local.split('.')[0].capitalize()  # Use first part before first dot
+    Each shard reads the recipients file itself and keeps only its own
+    addresses, so nothing but the summary crosses the process boundary.
     
-    # Replace [NAME] placeholder - use name if available, otherwise use generic greeting as fallback
-    if name:
-        name_replacement = name
-    elif generic_greeting:
-        # If no name but generic greeting provided, use it for [NAME] placeholder
-        name_replacement = generic_greeting
-    else:
-        name_replacement = ''
+    Args:
+        shard: Index of this shard
+        shard_count: Total number of shards
+        options: Recipient source ('recipients_file' or 'recipients'), 'include_names',
+                 'already_sent', 'region', 'endpoint_url', 'workers', 'journal', 'bulk_template',
+                 'validate', 'rejects_file' and the keyword arguments for the send call in 'send_kwargs'
+        
+    Returns:
+        Summary dict from the send call, without per-recipient results
+    """
+    already_sent = options['already_sent']
     
-    result = result.replace('[NAME]', name_replacement)
-    result = result.replace('[name]', name_replacement)
+    def in_shard(recipient) -> bool:
+        email = recipient['email'] if isinstance(recipient, dict) else recipient
+        return shard_for(email, shard_count) == shard
     
-    # Replace [GREETING] placeholder - use name if available, otherwise generic greeting
-    if '[GREETING]' in result or '[greeting]' in result:
-        if name:
-            greeting = f"Hi {name}!"
-        elif generic_greeting:
-            greeting = generic_greeting
-        else:
-            greeting = "Hi!"
-        result = result.replace('[GREETING]', greeting)
-        result = result.replace('[greeting]', greeting)
+    def not_yet_sent(recipient) -> bool:
+        email = recipient['email'] if isinstance(recipient, dict) else recipient
+        return email.strip().lower() not in already_sent
     
-    # Replace [EMAIL] with recipient email
-    result = result.replace('[EMAIL]', email)
-    result = result.replace('[email]', email)
+    if options['recipients_file']:
+        source = iter_recipients(options['recipients_file'], include_names=options['include_names'])
+    else:
+        source = options['recipients']
+    validator = None
+    if options['validate']:
+        # Duplicates hash to the same shard, so deduplicating per shard covers the whole list
+        validator = RecipientValidator(options['rejects_file'], append=True)
+        recipients = filter(not_yet_sent, validator.filter(source, keep=in_shard))
+    else:
+        recipients = filter(not_yet_sent, filter(in_shard, source))
     
+    emailer = SESEmailer(region_name=options['region'], max_workers=options['workers'], rate_limiter=_shard_rate_limiter,
+                         endpoint_url=options['endpoint_url'])
+    journal = SendJournal(options['journal']) if options['journal'] else None
+    try:
+        if options['bulk_template']:
+            result = emailer.send_bulk_email(recipients=recipients, journal=journal,
+                                             circuit_breaker=_shard_circuit_breaker, **options['send_kwargs'])
+        else:
+            result = emailer.send_email_batch(
+                recipients=recipients,
+                recipient_data=recipients if options['include_names'] else None,
+                collect_results=False,
+                journal=journal,
+                circuit_breaker=_shard_circuit_breaker,
+                **options['send_kwargs']
+            )
+    finally:
+        if journal:
+            journal.close()
+        if validator:
+            validator.close(emailer.metrics)
+    result.pop('results', None)
+    if validator:
+        result['duplicates'] = validator.counts['duplicate']
+        result['invalid'] = validator.counts['invalid']
+    result['metrics'] = emailer.metrics.snapshot()
     return result
 
 
-def load_recipients_from_file(file_path: str, include_names: bool = False) -> List[str]:
+def print_time_breakdown(metrics: MetricsRegistry) -> None:
+    """Print where send time went (rate limiter, SES API, rendering), summed over all workers"""
+    breakdown = metrics.time_breakdown()
+    if not breakdown['ses_api_calls']:
+        return
+    average_ms = breakdown['ses_api_latency_seconds'] / breakdown['ses_api_calls'] * 1000
+    print(f"⏱️  Worker time: {breakdown['rate_limiter_wait_seconds']:.1f}s waiting on the send rate, "
+          f"{breakdown['ses_api_latency_seconds']:.1f}s in {breakdown['ses_api_calls']} SES API calls "
+          f"(avg {average_ms:.0f} ms), {breakdown['render_seconds']:.1f}s rendering")
+
+
+def send_sharded(emailer: SESEmailer, processes: int, options: Dict) -> Dict:
     """
-    Load recipients from a CSV or JSON file
+    Send a campaign from several processes, sharding recipients by stable hash
+    
+    Rendering and MIME building are CPU-bound, so a single process tops out on
+    the GIL before large accounts reach their SES quota. Every shard gets its own
+    SES client; all of them draw from one SharedRateLimiter sized to the
+    emailer's send rate, so the account quota is respected overall, and count
+    fatal errors on one SharedCircuitBreaker, so max_fatal_errors applies to
+    the whole run rather than to each shard.
     
     Args:
-        file_path: Path to the CSV or JSON file
-        include_names: If True, returns list of dicts with 'email' and 'name' keys
+        emailer: SESEmailer whose send rate (max_send_rate or the account's MaxSendRate) is shared
+        processes: Number of shards/processes
+        options: Shard options, see _send_shard
         
     Returns:
-        List of email addresses (or list of dicts if include_names=True)
+        Merged summary dict
     """
-    file_ext = os.path.splitext(file_path)[1].lower()
+    from concurrent.futures import ProcessPoolExecutor
     
-    if file_ext == '.csv':
-        # Load from CSV
-        recipients = []
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                # Read first line to check for header
-                first_line = f.readline().strip()
-                f.seek(0)
-                
-                # Check if first line looks like a header
-                has_header = first_line.lower() in ['email', 'e-mail', 'email_address', 'emailaddress'] or \
-                            any(col.lower() in first_line.lower() for col in ['email', 'name'])
-                
-                # For single-column CSV, we can use comma or newline as delimiter
-                # Try to detect delimiter from the file
-                sample = f.read(1024)
-                f.seek(0)
-                
-                # Check if file has commas (multi-column) or is just newline-separated (single column)
-                if ',' in sample:
-                    # Multi-column CSV - use comma delimiter
-                    delimiter = ','
-                else:
-                    # Single column - use comma delimiter (DictReader/reader will handle it)
-                    delimiter = ','
-                
-                reader = csv.DictReader(f, delimiter=delimiter) if has_header else csv.reader(f, delimiter=delimiter)
-                
-                for row in reader:
-                    if isinstance(row, dict):
-                        # CSV with header - look for common email column names
-                        email = None
-                        name = None
-                        
-                        # Find email column
-                        for col in ['email', 'Email', 'EMAIL', 'e-mail', 'E-mail', 'email_address', 'EmailAddress']:
-                            if col in row and row[col]:
-                                email = row[col].strip()
-                                break
-                        
-                        # If no standard column found, use first column
-                        if not email:
-                            email = list(row.values())[0].strip() if row.values() else None
-                        
-                        # Find name column if include_names is True
-                        if include_names:
-                            for col in ['name', 'Name', 'NAME', 'first_name', 'First Name', 'firstname', 'FirstName']:
-                                if col in row and row[col]:
-                                    name = row[col].strip()
-                                    break
-                            # If no name found, try second column
-                            if not name and len(row) > 1:
-                                values = list(row.values())
-                                if len(values) > 1:
-                                    name = values[1].strip() if values[1] else None
-                    else:
-                        # CSV without header - use first column for email
-                        email = row[0].strip() if row else None
-                        # Use second column for name if available
-                        name = row[1].strip() if include_names and len(row) > 1 and row[1] else None
-                    
-                    if email and '@' in email:
-                        if include_names:
-                            recipients.append({'email': email, 'name': name or ''})
-                        else:
-                            recipients.append(email)
-            
-            if not recipients:
-                print("Warning: No valid email addresses found in CSV file")
-            
-            return recipients
-            
-        except Exception as e:
-            print(f"Error reading CSV file: {e}")
-            sys.exit(1)
+    rate = emailer.max_send_rate or emailer.get_max_send_rate()
+    shared_limiter = SharedRateLimiter(rate)
+    send_kwargs = options['send_kwargs']
+    shared_breaker = SharedCircuitBreaker(send_kwargs.get('max_fatal_errors', 3), sender=send_kwargs.get('sender'))
+    print(f"🔀 Sharding recipients across {processes} processes ({rate:g} emails/second shared)")
     
-    elif file_ext == '.json':
-        # Load from JSON
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    if include_names:
-                        recipients = []
-                        for r in data:
-                            if isinstance(r, str):
-                                recipients.append({'email': r, 'name': ''})
-                            elif isinstance(r, dict):
-                                recipients.append({'email': r.get('email', ''), 'name': r.get('name', '')})
-                        return recipients
-                    else:
-                        recipients = [r if isinstance(r, str) else r['email'] for r in data]
-                elif isinstance(data, dict) and 'recipients' in data:
-                    if include_names:
-                        recipients = []
-                        for r in data['recipients']:
-                            if isinstance(r, str):
-                                recipients.append({'email': r, 'name': ''})
-                            elif isinstance(r, dict):
-                                recipients.append({'email': r.get('email', ''), 'name': r.get('name', '')})
-                        return recipients
-                    else:
-                        recipients = data['recipients']
-                else:
-                    print("Error: JSON file must contain a list or dict with 'recipients' key")
-                    sys.exit(1)
-                return recipients
-        except FileNotFoundError:
-            print(f"Error: File {file_path} not found")
-            sys.exit(1)
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON file: {e}")
-            sys.exit(1)
-    else:
-        # Try to auto-detect format
-        try:
-            # Try JSON first
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    recipients = [r if isinstance(r, str) else r['email'] for r in data]
-                elif isinstance(data, dict) and 'recipients' in data:
-                    recipients = data['recipients']
-                else:
-                    print("Error: JSON file must contain a list or dict with 'recipients' key")
-                    sys.exit(1)
-                return recipients
-        except json.JSONDecodeError:
-            # If JSON fails, try CSV
-            try:
-                recipients = []
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    reader = csv.reader(f)
-                    for row in reader:
-                        if row and '@' in row[0]:
-                            if include_names:
-                                name = row[1].strip() if len(row) > 1 and row[1] else ''
-                                recipients.append({'email': row[0].strip(), 'name': name})
-                            else:
-                                recipients.append(row[0].strip())
-                return recipients
-            except Exception as e:
-                print(f"Error: Could not parse file as JSON or CSV: {e}")
-                print("Please use a .csv or .json file, or ensure the file format is correct")
-                sys.exit(1)
+    results = []
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_shard_worker,
+                             initargs=(shared_limiter, shared_breaker)) as executor:
+        futures = [executor.submit(_send_shard, shard, processes, options) for shard in range(processes)]
+        for future in as_completed(futures):
+            results.append(future.result())
+    
+    merged = merge_send_results(results)
+    merged.pop('results')
+    print(f"\n📊 Combined Summary ({processes} processes):")
+    print(f"  Total recipients: {merged.get('total', 0)}")
+    print(f"  Successful: {merged.get('successful', 0)}")
+    print(f"  Failed: {merged.get('failed', 0)}")
+    if merged.get('duplicates') or merged.get('invalid'):
+        print(f"  Skipped by validation: {merged.get('duplicates', 0)} duplicate(s), {merged.get('invalid', 0)} invalid")
+    if merged.get('retries'):
+        print(f"  Retries: {merged['retries']} ({merged['backoff_seconds']}s backing off)")
+    if merged.get('circuit_open'):
+        print(f"  Not attempted: {merged.get('not_attempted', 0)} (plus the rest of the list)")
+        print(f"  ⛔ Stopped by circuit breaker: {merged['circuit_open']}")
+    return merged
 
 
 def main():
@@ -1006,8 +3736,44 @@ Examples:
   # Send to large list in batches (automatic for lists > 50)
   python ses_emailer.py --sender sender@example.com --recipients-file recipients.csv --subject "Hello" --body-file email.txt --batch-size 50
   
-  # Send in batches with custom rate limiting
-  python ses_emailer.py --sender sender@example.com --recipients-file recipients.csv --subject "Hello" --body-file email.txt --batch-size 100 --rate-limit 0.2
+  # Send in batches at a fixed rate below the account quota (e.g., 5 emails/second)
+  python ses_emailer.py --sender sender@example.com --recipients-file recipients.csv --subject "Hello" --body-file email.txt --batch-size 100 --max-send-rate 5
+  
+  # Send large list with 8 concurrent workers
+  python ses_emailer.py --sender sender@example.com --recipients-file recipients.csv --subject "Hello" --body-file email.txt --workers 8
+  
+  # Use 4 processes (8 workers each) for CPU-heavy personalized HTML, sharing one send-rate budget
+  python ses_emailer.py --sender sender@example.com --recipients-file recipients.csv --subject "Hi [NAME]" --body-html-file email.html --body-file email.txt --personalized --processes 4 --workers 8
+  
+  # List invalid and duplicate recipients skipped by validation in a side file
+  python ses_emailer.py --sender sender@example.com --recipients-file recipients.csv --subject "Hello" --body-file email.txt --rejects-file rejects.csv
+  
+  # Record progress and resume an interrupted campaign (rerun the same command with --resume)
+  python ses_emailer.py --sender sender@example.com --recipients-file recipients.csv --subject "Hello" --body-file email.txt --journal sent.log
+  python ses_emailer.py --sender sender@example.com --recipients-file recipients.csv --subject "Hello" --body-file email.txt --journal sent.log --resume
+  
+  # Queue a campaign durably, then drain it (start more drainers on the same --queue-db to add throughput)
+  python ses_emailer.py --queue-db campaign.db --recipients-file recipients.csv --enqueue-only
+  python ses_emailer.py --sender sender@example.com --subject "Hello" --body-file email.txt --queue-db campaign.db --workers 8
+  python ses_emailer.py --queue-db campaign.db --queue-stats
+  
+  # Each recipient gets their own document (CSV columns: email,name,attachment)
+  python ses_emailer.py --sender sender@example.com --recipients-file tax_list.csv --subject "Your 1099" --body-file email.txt --attachment-column attachment --workers 8
+  
+  # Newsletter with identical content: 49 BCC recipients per API call
+  python ses_emailer.py --sender sender@example.com --recipients-file list.csv --subject "News" --body-file news.txt --pack-bcc --workers 4
+  
+  # Export throughput/latency metrics for Prometheus (node_exporter textfile collector) every 15s
+  python ses_emailer.py --sender sender@example.com --recipients-file list.csv --subject "News" --body-file news.txt --workers 8 --metrics-file /var/lib/node_exporter/ses_emailer.prom --metrics-json metrics.json
+  
+  # Where does the time go? Phase breakdown, API latency percentiles, slowest sends and a cProfile dump
+  python ses_emailer.py --sender sender@example.com --recipients-file list.csv --subject "News" --body-file news.txt --workers 8 --profile --profile-output send.prof
+  
+  # Rehearse against the local fake SES server (python fake_ses_server.py) instead of AWS
+  python ses_emailer.py --endpoint-url http://127.0.0.1:8025 --sender sender@example.com --recipients-file list.csv --subject "News" --body-file news.txt --workers 8
+  
+  # Personalized send through an SES template (50 recipients per API call)
+  python ses_emailer.py --sender sender@example.com --recipients-file recipients.csv --subject "Hi [NAME]" --body-file email.txt --personalized --bulk-template
   
   # Preview email before sending
   python ses_emailer.py --sender sender@example.com --recipients user@example.com --subject "Hello" --body "Test" --body-html-file email.html --preview
@@ -1020,54 +3786,156 @@ Examples:
     parser.add_argument('--sender', '-s', help='Sender email address (must be verified in SES)')
     parser.add_argument('--sender-name', help='Display name for sender (e.g., "Amaze" will show as "Amaze <email@example.com>")')
     parser.add_argument('--recipients', '-r', nargs='+', help='List of recipient email addresses')
-    parser.add_argument('--recipients-file', '-f', help='CSV or JSON file with list of recipients')
+    parser.add_argument('--recipients-file', '-f', help='CSV, JSON or JSON Lines (.jsonl) file with list of recipients (local path or s3://bucket/key)')
     parser.add_argument('--subject', help='Email subject')
     parser.add_argument('--body', '-b', help='Email body (plain text)')
-    parser.add_argument('--body-file', help='File containing plain text email body')
+    parser.add_argument('--body-file', help='File containing plain text email body (local path or s3://bucket/key)')
     parser.add_argument('--body-html', help='Email body (HTML)')
-    parser.add_argument('--body-html-file', help='File containing HTML email body')
+    parser.add_argument('--body-html-file', help='File containing HTML email body (local path or s3://bucket/key)')
     parser.add_argument('--attachment', '-a', action='append', help='File to attach (can be used multiple times)')
+    parser.add_argument('--attachment-column', help='Recipients file column with each recipient\'s own attachment: local path or s3://bucket/key, several separated by ";" (e.g., individual 1099 PDFs)')
+    parser.add_argument('--prefetch', type=int, default=100, help='With --attachment-column: recipients whose attachments are loaded ahead of sending (default: 100)')
     parser.add_argument('--reply-to', nargs='+', help='Reply-to email addresses')
     parser.add_argument('--region', default='us-west-2', help='AWS region (default: us-west-2)')
+    parser.add_argument('--endpoint-url', help='Send SES API calls to this endpoint instead of AWS, e.g. http://127.0.0.1:8025 for fake_ses_server.py')
     parser.add_argument('--verify', help='Verify an email address with SES')
     parser.add_argument('--preview', action='store_true', help='Preview email before sending (does not send email)')
     parser.add_argument('--batch-size', type=int, default=50, help='Number of recipients per batch (default: 50, use BCC for privacy)')
     parser.add_argument('--use-bcc', action='store_true', default=True, help='Use BCC to protect recipient privacy (default: True)')
     parser.add_argument('--no-bcc', action='store_false', dest='use_bcc', help='Disable BCC (recipients will see each other)')
-    parser.add_argument('--rate-limit', type=float, default=0.1, help='Seconds to wait between batches (default: 0.1 = 10 batches/sec)')
-    parser.add_argument('--personalized', action='store_true', help='Enable personalization (replace [NAME] and [EMAIL] placeholders with recipient data). CSV must have email and name columns.')
+    parser.add_argument('--pack-bcc', action='store_true', help=f'Send identical content to up to {PACKED_BCC_LIMIT} BCC recipients per API call (sender in To) instead of one call per recipient')
+    parser.add_argument('--rate-limit', type=float, default=0.1, help='Deprecated, ignored: sends are paced by the SES send quota (see --max-send-rate)')
+    parser.add_argument('--max-send-rate', type=float, help='Emails per second to send at (default: MaxSendRate from the SES send quota)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of concurrent send workers for batch sending (default: 1 = sequential)')
+    parser.add_argument('--processes', type=int, default=1, help='Shard recipients across this many processes, each with --workers threads, sharing one send-rate budget (default: 1)')
+    parser.add_argument('--personalized', action='store_true', help='Enable personalization (replace [NAME], [EMAIL], [GREETING] and any [COLUMN] placeholders, e.g. [COMPANY], with recipient data). CSV must have email and name columns.')
     parser.add_argument('--generic-greeting', help='Generic greeting to use when name is not available (e.g., "Hi There!"). Used as fallback for [NAME] placeholder.')
+    parser.add_argument('--metrics-file', help='Write send metrics (counters, latency histograms) in Prometheus text format to this file, e.g. for the node_exporter textfile collector')
+    parser.add_argument('--metrics-json', help='Write the same metrics as a JSON snapshot to this file')
+    parser.add_argument('--metrics-interval', type=float, default=15.0, help='Seconds between metrics file updates while sending (default: 15)')
+    parser.add_argument('--profile', action='store_true', help='Time each phase (loading, rendering, MIME building, API calls, pacing sleeps) and print a breakdown with p50/p95/p99 API latency and the slowest sends')
+    parser.add_argument('--profile-top', type=int, default=10, help='With --profile: how many of the slowest sends to list (default: 10)')
+    parser.add_argument('--profile-output', help='Write a cProfile dump of the whole run to this file (implies --profile; read with python -m pstats)')
+    parser.add_argument('--max-fatal-errors', type=int, default=3, help='Stop sending (batch, --bulk-template or --queue-db) after this many account/identity errors in a row, e.g. unverified sender or paused account (default: 3, 0 = never stop)')
+    parser.add_argument('--no-validate', action='store_false', dest='validate', help='Skip the validation pre-pass (by default recipients are normalized, checked for valid syntax and deduplicated case-insensitively before sending)')
+    parser.add_argument('--rejects-file', help='Write recipients dropped by validation (invalid or duplicate) to this CSV file')
+    parser.add_argument('--journal', help='Append each recipient\'s send outcome to this file so an interrupted campaign can be resumed')
+    parser.add_argument('--resume', action='store_true', help='Skip recipients already marked as sent in --journal')
+    parser.add_argument('--bulk-template', action='store_true', help='Send through an SES template with up to 50 recipients per API call (each recipient still gets an individual, personalized email; needs ses:CreateTemplate permission)')
+    parser.add_argument('--queue-db', help='Durable SQLite send queue: enqueue --recipients/--recipients-file into it, then send everything pending (run more processes with the same --queue-db to drain it in parallel)')
+    parser.add_argument('--enqueue-only', action='store_true', help='With --queue-db: enqueue recipients and exit without sending')
+    parser.add_argument('--queue-stats', action='store_true', help='With --queue-db: print queue progress and exit')
     
     args = parser.parse_args()
     
     # Initialize SES client
-    emailer = SESEmailer(region_name=args.region)
+    emailer = SESEmailer(region_name=args.region, max_workers=args.workers, max_send_rate=args.max_send_rate,
+                         endpoint_url=args.endpoint_url)
+    if args.profile or args.profile_output:
+        emailer.profiler = SendProfiler(slowest=args.profile_top)
+        if args.profile_output:
+            emailer.profiler.start_cprofile()
+    
+    def start_metrics_export() -> Optional[MetricsExporter]:
+        if not (args.metrics_file or args.metrics_json):
+            return None
+        return MetricsExporter(emailer.metrics, args.metrics_file, args.metrics_json, args.metrics_interval).start()
+    
+    validator = None
+    
+    def finish_validation() -> None:
+        # Once the recipient stream is consumed: report what validation dropped
+        nonlocal validator
+        if validator:
+            validator.close(emailer.metrics)
+            print(validator.summary())
+            validator = None
+    
+    def finish_instrumentation(exporter: Optional[MetricsExporter]) -> None:
+        # End of a send: write metrics, then the profile report and cProfile dump if requested
+        finish_validation()
+        if emailer.profiler:
+            emailer.profiler.report(emailer.metrics)
+            if args.profile_output:
+                emailer.profiler.dump_cprofile(args.profile_output)
+                print(f"🔬 cProfile stats written to {args.profile_output} (python -m pstats {args.profile_output})")
+        else:
+            print_time_breakdown(emailer.metrics)
+        if exporter:
+            exporter.stop()
+            print(f"📈 Metrics written to {', '.join(p for p in (args.metrics_file, args.metrics_json) if p)}")
     
     # Handle email verification
     if args.verify:
         emailer.verify_email_identity(args.verify)
         return
     
+    if (args.enqueue_only or args.queue_stats) and not args.queue_db:
+        parser.error("--enqueue-only and --queue-stats require --queue-db")
+    
+    # Handle queue progress check
+    if args.queue_stats:
+        stats = SendQueue(args.queue_db).stats()
+        print(f"📊 Queue {args.queue_db}:")
+        print(f"  Pending: {stats['pending']}")
+        print(f"  In flight: {stats['in_flight']}")
+        print(f"  Sent: {stats['sent']}")
+        print(f"  Failed: {stats['failed']}")
+        print(f"  Total: {stats['total']}")
+        print(f"  Send rate (last minute): {stats['sent_per_second']}/s")
+        return
+    
     # Validate required arguments
-    if not args.preview:
+    if args.enqueue_only:
+        if not args.recipients and not args.recipients_file:
+            parser.error("--enqueue-only needs --recipients or --recipients-file")
+    elif not args.preview:
         # For sending, sender and recipients are required
         if not args.sender:
             parser.error("--sender is required (unless using --verify or --preview)")
         
-        if not args.recipients and not args.recipients_file:
+        # A queue that is already filled can be drained without recipients
+        if not args.recipients and not args.recipients_file and not args.queue_db:
             parser.error("Either --recipients or --recipients-file is required (unless using --preview)")
     
-    if not args.subject:
+    if not args.subject and not args.enqueue_only:
         parser.error("--subject is required")
     
-    if not args.body and not args.body_file:
+    if not args.body and not args.body_file and not args.enqueue_only:
         parser.error("Either --body or --body-file is required")
     
+    if args.queue_db and (args.attachment or args.bulk_template) and not args.preview:
+        parser.error("--queue-db does not support --attachment or --bulk-template")
+    
+    if args.processes > 1 and args.queue_db:
+        parser.error("--processes does not support --queue-db (start more drainers on the queue instead)")
+    
+    if args.bulk_template and (args.attachment or args.attachment_column):
+        parser.error("--bulk-template does not support attachments")
+    
+    if args.pack_bcc and not args.preview:
+        if not args.use_bcc:
+            parser.error("--pack-bcc cannot be combined with --no-bcc")
+        if args.personalized or args.attachment or args.attachment_column or args.bulk_template or args.queue_db:
+            parser.error("--pack-bcc needs identical content for every recipient: no --personalized, attachments, --bulk-template or --queue-db")
+    
+    if args.attachment_column and not args.preview:
+        if not args.recipients_file:
+            parser.error("--attachment-column requires --recipients-file")
+        if args.queue_db:
+            parser.error("--queue-db does not support --attachment-column")
+    
+    if args.resume and not args.journal:
+        parser.error("--resume requires --journal")
+    
+    if args.rejects_file and not args.validate:
+        parser.error("--rejects-file cannot be combined with --no-validate")
+    
     # Get email body
     body_text = args.body
     if args.body_file:
         try:
-            with open(args.body_file, 'r', encoding='utf-8') as f:
+            with open_text(args.body_file) as f:
                 body_text = f.read()
         except FileNotFoundError:
             print(f"Error: Body file {args.body_file} not found")
@@ -1080,7 +3948,7 @@ Examples:
     body_html = args.body_html
     if args.body_html_file:
         try:
-            with open(args.body_html_file, 'r', encoding='utf-8') as f:
+            with open_text(args.body_html_file) as f:
                 body_html = f.read()
         except FileNotFoundError:
             print(f"Error: HTML body file {args.body_html_file} not found")
@@ -1092,17 +3960,144 @@ Examples:
     # Personalization is only enabled if explicitly requested
     needs_personalization = args.personalized
     
+    # Per-recipient attachments need the full recipient records, not just addresses
+    attachment_column = column_slot_key(args.attachment_column) if args.attachment_column else None
+    load_records = needs_personalization or bool(attachment_column)
+    
     # Get recipients (optional for preview)
     recipients = []
     recipient_data = None
+    streaming = False
+    already_sent = set()
+    if args.resume:
+        already_sent = SendJournal.load_sent(args.journal)
+        print(f"↩️  Resuming: {len(already_sent)} recipient(s) already sent according to {args.journal}")
+    
+    def not_yet_sent(recipient) -> bool:
+        email = recipient['email'] if isinstance(recipient, dict) else recipient
+        return email.strip().lower() not in already_sent
+    
+    # Validation pre-pass: normalize addresses and drop invalid ones and duplicates
+    # before they reach the queue, the shards or the send loop
+    if args.validate:
+        validator = RecipientValidator(args.rejects_file)
+    
+    def validated(source: Iterable) -> Iterable:
+        return validator.filter(source) if validator else source
+    
+    if args.queue_db and not args.preview:
+        queue = SendQueue(args.queue_db)
+        if args.recipients_file or args.recipients:
+            # Always store the full recipient record so any drainer can personalize
+            if args.recipients_file:
+                source = iter_recipients(args.recipients_file, include_names=True)
+            else:
+                source = ({'email': r, 'name': ''} for r in args.recipients)
+            source = validated(source)
+            count, already_queued = queue.enqueue(filter(not_yet_sent, source) if already_sent else source)
+            print(f"📥 Queued {count} recipient(s) in {args.queue_db}")
+            if already_queued:
+                print(f"  Skipped {already_queued} already in the queue")
+            finish_validation()
+        if args.enqueue_only:
+            return
+        
+        journal = SendJournal(args.journal) if args.journal else None
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
+        exporter = start_metrics_export()
+        try:
+            result = emailer.drain_queue(
+                queue,
+                sender=args.sender,
+                subject=args.subject,
+                body_text=body_text,
+                body_html=body_html,
+                reply_to=args.reply_to,
+                sender_name=args.sender_name,
+                personalized=needs_personalization,
+                generic_greeting=args.generic_greeting,
+                batch_size=args.batch_size,
+                journal=journal,
+                max_fatal_errors=args.max_fatal_errors
+            )
+        finally:
+            finish_instrumentation(exporter)
+            if journal:
+                journal.close()
+                print(f"📝 Send journal written to {args.journal}")
+        if not result['success']:
+            sys.exit(1)
+        return
+    
+    if args.processes > 1 and not args.preview:
+        send_kwargs = {
+            'sender': args.sender,
+            'subject': args.subject,
+            'body_text': body_text,
+            'body_html': body_html,
+            'reply_to': args.reply_to,
+            'sender_name': args.sender_name,
+            'generic_greeting': args.generic_greeting,
+            'max_fatal_errors': args.max_fatal_errors
+        }
+        if not args.bulk_template:
+            send_kwargs.update(batch_size=args.batch_size, use_bcc=args.use_bcc, personalized=needs_personalization,
+                               attachments=args.attachment, attachment_column=attachment_column, prefetch=args.prefetch,
+                               pack_bcc=args.pack_bcc)
+        options = {
+            'recipients_file': args.recipients_file,
+            'recipients': args.recipients,
+            'include_names': load_records,
+            'already_sent': already_sent,
+            'region': args.region,
+            'endpoint_url': args.endpoint_url,
+            'workers': args.workers,
+            'journal': args.journal,
+            'bulk_template': args.bulk_template,
+            'validate': args.validate,
+            'rejects_file': args.rejects_file,
+            'send_kwargs': send_kwargs
+        }
+        if validator:
+            # Each shard validates its own recipients and appends to the rejects file started here
+            validator.close()
+            validator = None
+        print(f"Sending email from {args.sender} to recipients from {args.recipients_file or 'the command line'}...")
+        print(f"Subject: {args.subject}\n")
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
+        result = send_sharded(emailer, args.processes, options)
+        # Shards report their metrics at the end; combine them into this process's registry
+        emailer.metrics.merge(result.get('metrics', {}))
+        finish_instrumentation(MetricsExporter(emailer.metrics, args.metrics_file, args.metrics_json)
+                               if args.metrics_file or args.metrics_json else None)
+        if args.journal:
+            print(f"📝 Send journal written to {args.journal}")
+        if not result['success']:
+            sys.exit(1)
+        return
+    
     if args.recipients_file:
-        if needs_personalization:
-            recipient_data = load_recipients_from_file(args.recipients_file, include_names=True)
+        recipient_stream = validated(iter_recipients(args.recipients_file, include_names=load_records))
+        if already_sent:
+            recipient_stream = filter(not_yet_sent, recipient_stream)
+        if args.preview:
+            loaded = list(recipient_stream)
+        else:
+            # Read one batch ahead: small lists keep the single-send paths below, larger
+            # lists are streamed straight into the batch sender without loading the whole file
+            load_start = time.perf_counter()
+            loaded = list(itertools.islice(recipient_stream, args.batch_size + 1))
+            emailer.metrics.observe('load_seconds', time.perf_counter() - load_start)
+            streaming = len(loaded) > args.batch_size
+        if streaming:
+            recipients = itertools.chain(loaded, recipient_stream)
+        elif needs_personalization:
+            recipient_data = loaded
             recipients = [r['email'] for r in recipient_data]
         else:
-            recipients = load_recipients_from_file(args.recipients_file, include_names=False)
+            recipients = loaded
     elif args.recipients:
-        recipients = args.recipients
+        recipients = [r for r in validated(args.recipients) if not_yet_sent(r)]
         if needs_personalization:
             recipient_data = [{'email': r, 'name': ''} for r in recipients]
     elif args.preview:
@@ -1117,23 +4112,39 @@ Examples:
     # Preview or send email
     if args.preview:
         # Preview mode - show email without sending
+        preview_subject, preview_body_text, preview_body_html = args.subject, body_text, body_html
+        if needs_personalization and recipient_data:
+            # Render exactly what the first recipient will get, using the same context as sending
+            context = build_recipient_context(recipient_data[0], args.generic_greeting)
+            preview_subject, preview_body_text, preview_body_html = EmailTemplates(
+                args.subject, body_text, body_html
+            ).render(context)
+            print(f"✨ Previewing personalized content for {recipient_data[0].get('email')}\n")
         preview_email(
-            subject=args.subject,
-            body_text=body_text,
-            body_html=body_html,
+            subject=preview_subject,
+            body_text=preview_body_text,
+            body_html=preview_body_html,
             sender=args.sender,
             recipients=recipients if recipients != ['[Preview - No recipients specified]'] else None,
             attachments=attachments,
             sender_name=args.sender_name,
             open_browser=True
         )
+        finish_validation()
         print("\n✓ Preview complete. Email was NOT sent.")
         if recipients and len(recipients) > 1:
             print(f"   ({len(recipients)} separate emails will be sent when you remove --preview.)")
         print("Remove --preview flag to actually send the email.")
     else:
         # Send email
-        print(f"Sending email from {args.sender} to {len(recipients)} recipient(s)...")
+        if not streaming and not recipients:
+            finish_validation()
+            print("Nothing to send: no recipients left" + (" after --resume" if args.resume else ""))
+            return
+        if streaming:
+            print(f"Sending email from {args.sender} to recipients streamed from {args.recipients_file}...")
+        else:
+            print(f"Sending email from {args.sender} to {len(recipients)} recipient(s)...")
         print(f"Subject: {args.subject}")
         if attachments:
             print(f"Attachments: {len(attachments)} file(s)")
@@ -1142,7 +4153,10 @@ Examples:
         # Batch pipeline: large lists, personalization, or any multi-recipient send without attachments
         # (shows per-batch progress; each recipient still gets an individual email when use_bcc is on).
         use_batch = (
-            needs_personalization
+            streaming
+            or needs_personalization
+            or bool(attachment_column)
+            or args.pack_bcc
             or len(recipients) > args.batch_size
             or (len(recipients) > 1 and not attachments)
         )
@@ -1154,11 +4168,70 @@ Examples:
                 print(f"   Found names for {names_count}/{len(recipient_data)} recipients")
             print()
         
-        if attachments:
-            # Attachments require send_email_with_attachments (doesn't support batch yet)
-            # For now, send in batches using regular send_email
-            if use_batch:
-                print("⚠️  Note: Batch sending with attachments sends one email per recipient")
+        journal = SendJournal(args.journal) if args.journal else None
+        
+        # Spot-instance interruptions send SIGTERM: unwind normally so in-flight sends
+        # finish and the journal is flushed, then resume later with --resume
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
+        exporter = start_metrics_export()
+        
+        try:
+            if args.bulk_template:
+                # SES templated bulk sending - placeholders are filled in by SES per destination
+                result = emailer.send_bulk_email(
+                    sender=args.sender,
+                    recipients=recipient_data or recipients,
+                    subject=args.subject,
+                    body_text=body_text,
+                    body_html=body_html,
+                    sender_name=args.sender_name,
+                    reply_to=args.reply_to,
+                    generic_greeting=args.generic_greeting,
+                    journal=journal,
+                    max_fatal_errors=args.max_fatal_errors
+                )
+            elif attachments:
+                # Attachments go out through send_raw_email; the batch path encodes each file once
+                if use_batch:
+                    print("⚠️  Note: Batch sending with attachments sends one email per recipient")
+                    result = emailer.send_email_batch(
+                        sender=args.sender,
+                        recipients=recipients,
+                        subject=args.subject,
+                        body_text=body_text,
+                        body_html=body_html,
+                        batch_size=args.batch_size,
+                        use_bcc=args.use_bcc,
+                        rate_limit=args.rate_limit,
+                        reply_to=args.reply_to,
+                        sender_name=args.sender_name,
+                        personalized=needs_personalization,
+                        recipient_data=recipient_data,
+                        generic_greeting=args.generic_greeting,
+                        collect_results=False,
+                        journal=journal,
+                        attachments=attachments,
+                        attachment_column=attachment_column,
+                        prefetch=args.prefetch,
+                        max_fatal_errors=args.max_fatal_errors
+                    )
+                else:
+                    # Small list with attachments - use attachment method
+                    result = emailer.send_email_with_attachments(
+                        sender=args.sender,
+                        recipients=recipients,
+                        subject=args.subject,
+                        body_text=body_text,
+                        body_html=body_html,
+                        attachments=attachments,
+                        reply_to=args.reply_to,
+                        sender_name=args.sender_name
+                    )
+                    if journal:
+                        for recipient in recipients:
+                            journal.record(recipient, result.get('message_id'), 'sent' if result['success'] else 'failed')
+            elif use_batch:
+                # Use batch sending for large lists
                 result = emailer.send_email_batch(
                     sender=args.sender,
                     recipients=recipients,
@@ -1172,91 +4245,78 @@ Examples:
                     sender_name=args.sender_name,
                     personalized=needs_personalization,
                     recipient_data=recipient_data,
-                    generic_greeting=args.generic_greeting
+                    generic_greeting=args.generic_greeting,
+                    collect_results=False,
+                    journal=journal,
+                    attachment_column=attachment_column,
+                    prefetch=args.prefetch,
+                    pack_bcc=args.pack_bcc,
+                    max_fatal_errors=args.max_fatal_errors
                 )
             else:
-                # Small list with attachments - use attachment method
-                result = emailer.send_email_with_attachments(
-                    sender=args.sender,
-                    recipients=recipients,
-                    subject=args.subject,
-                    body_text=body_text,
-                    body_html=body_html,
-                    attachments=attachments,
-                    reply_to=args.reply_to,
-                    sender_name=args.sender_name
-                )
-        elif use_batch:
-            # Use batch sending for large lists
-            result = emailer.send_email_batch(
-                sender=args.sender,
-                recipients=recipients,
-                subject=args.subject,
-                body_text=body_text,
-                body_html=body_html,
-                batch_size=args.batch_size,
-                use_bcc=args.use_bcc,
-                rate_limit=args.rate_limit,
-                reply_to=args.reply_to,
-                sender_name=args.sender_name,
-                personalized=needs_personalization,
-                recipient_data=recipient_data
-            )
-        else:
-            # Small list - send all at once or individually based on BCC setting or personalization
-            if needs_personalization or (args.use_bcc and len(recipients) > 1):
-                # For personalized or BCC privacy with small lists, send individual emails
-                success_count = 0
-                fail_count = 0
-                for i, recipient in enumerate(recipients):
-                    # Personalize if needed
-                    personalized_subject = args.subject
-                    personalized_body_text = body_text
-                    personalized_body_html = body_html
+                # Small list - send all at once or individually based on BCC setting or personalization
+                if needs_personalization or (args.use_bcc and len(recipients) > 1):
+                    # For personalized or BCC privacy with small lists, send individual emails
+                    templates = EmailTemplates(args.subject, body_text, body_html)
+                    success_count = 0
+                    fail_count = 0
+                    for i, recipient in enumerate(recipients):
+                        # Personalize if needed
+                        personalized_subject = args.subject
+                        personalized_body_text = body_text
+                        personalized_body_html = body_html
                     
-                    if needs_personalization and recipient_data:
-                        recipient_info = recipient_data[i] if i < len(recipient_data) else {'email': recipient, 'name': ''}
-                        personalized_subject = replace_template_placeholders(args.subject, recipient_info, args.generic_greeting)
-                        personalized_body_text = replace_template_placeholders(body_text, recipient_info, args.generic_greeting)
-                        if body_html:
-                            personalized_body_html = replace_template_placeholders(body_html, recipient_info, args.generic_greeting)
+                        if needs_personalization and recipient_data:
+                            render_start = time.perf_counter()
+                            recipient_info = recipient_data[i] if i < len(recipient_data) else {'email': recipient, 'name': ''}
+                            context = build_recipient_context(recipient_info, args.generic_greeting)
+                            personalized_subject, personalized_body_text, personalized_body_html = templates.render(context)
+                            emailer.metrics.observe('render_seconds', time.perf_counter() - render_start)
                     
+                        emailer.metrics.observe('rate_limiter_wait_seconds', emailer.rate_limiter.acquire())
+                        result = emailer.send_email(
+                            sender=args.sender,
+                            recipients=[recipient],  # Individual recipient
+                            subject=personalized_subject,
+                            body_text=personalized_body_text,
+                            body_html=personalized_body_html,
+                            reply_to=args.reply_to,
+                            bcc=None,  # No BCC needed since it's individual
+                            sender_name=args.sender_name
+                        )
+                        if journal:
+                            journal.record(recipient, result.get('message_id'), 'sent' if result['success'] else 'failed')
+                        if result['success']:
+                            success_count += 1
+                        else:
+                            fail_count += 1
+                
+                    result = {
+                        'success': fail_count == 0,
+                        'total': len(recipients),
+                        'successful': success_count,
+                        'failed': fail_count
+                    }
+                else:
+                    # Send all at once (no BCC or single recipient, no personalization)
                     result = emailer.send_email(
                         sender=args.sender,
-                        recipients=[recipient],  # Individual recipient
-                        subject=personalized_subject,
-                        body_text=personalized_body_text,
-                        body_html=personalized_body_html,
+                        recipients=recipients,
+                        subject=args.subject,
+                        body_text=body_text,
+                        body_html=body_html,
                         reply_to=args.reply_to,
-                        bcc=None,  # No BCC needed since it's individual
+                        bcc=None,  # Don't use BCC for single sends
                         sender_name=args.sender_name
                     )
-                    if result['success']:
-                        success_count += 1
-                    else:
-                        fail_count += 1
-                    # Small delay between sends
-                    if recipient != recipients[-1]:  # Don't delay after last email
-                        time.sleep(0.07)
-                
-                result = {
-                    'success': fail_count == 0,
-                    'total': len(recipients),
-                    'successful': success_count,
-                    'failed': fail_count
-                }
-            else:
-                # Send all at once (no BCC or single recipient, no personalization)
-                result = emailer.send_email(
-                    sender=args.sender,
-                    recipients=recipients,
-                    subject=args.subject,
-                    body_text=body_text,
-                    body_html=body_html,
-                    reply_to=args.reply_to,
-                    bcc=None,  # Don't use BCC for single sends
-                    sender_name=args.sender_name
-                )
+                    if journal:
+                        for recipient in recipients:
+                            journal.record(recipient, result.get('message_id'), 'sent' if result['success'] else 'failed')
+        finally:
+            finish_instrumentation(exporter)
+            if journal:
+                journal.close()
+                print(f"📝 Send journal written to {args.journal}")
         
         if not result['success']:
             sys.exit(1)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Load test for ses_emailer.py against the local fake SES server
+Runs the real command line (main()) on synthetic recipients and checks what arrived:
+achieved send rate, throttling and retries, and recipients lost or sent twice.
+"""
+
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_ses_server import FakeSES, start_server  # noqa: E402
+
+EMAILER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ses_emailer.py')
+
+
+def fetch_json(url: str, method: str = 'GET'):
+    """GET (or POST) a fake SES server JSON endpoint"""
+    request = urllib.request.Request(url, method=method, data=b'' if method == 'POST' else None)
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.load(response)
+
+
+def read_journal(path: str) -> Dict[str, str]:
+    """Last status ('sent' or 'failed') the emailer recorded for each recipient"""
+    statuses = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                recipient, _, status = json.loads(line)
+                statuses[recipient] = status
+    return statuses
+
+
+def counter_total(metrics: Dict, name: str) -> int:
+    """Sum of a counter over all label sets in a --metrics-json snapshot"""
+    return int(sum(series['value'] for series in metrics.get('counters', {}).get(name, [])))
+
+
+def run_load_test(endpoint_url: str, recipients: int, emailer_args: List[str], workdir: str,
+                  verbose: bool = False) -> Dict:
+    """
+    Send to synthetic recipients through ses_emailer.py main() and reconcile with the server
+
+    Args:
+        endpoint_url: Fake SES server to send through (its state is reset first)
+        recipients: Number of synthetic recipients
+        emailer_args: Extra ses_emailer.py arguments (e.g. --workers 8 --pack-bcc)
+        workdir: Directory for the recipients file, journal, metrics and output log
+        verbose: Stream the emailer's output instead of logging it to a file
+
+    Returns:
+        Report dict (see print_report)
+    """
+    fetch_json(f'{endpoint_url}/reset', method='POST')
+    recipients_file = os.path.join(workdir, 'recipients.csv')
+    expected = [f'load.test{i}@example.com' for i in range(recipients)]
+    with open(recipients_file, 'w', encoding='utf-8') as f:
+        f.write('email,name\n')
+        for i, email in enumerate(expected):
+            f.write(f'{email},Recipient {i}\n')
+
+    metrics_file = os.path.join(workdir, 'metrics.json')
+    journal_file = os.path.join(workdir, 'journal.log')
+    log_file = os.path.join(workdir, 'emailer.log')
+    command = [
+        sys.executable, EMAILER,
+        '--endpoint-url', endpoint_url,
+        '--sender', 'load-test@example.com',
+        '--recipients-file', recipients_file,
+        '--subject', 'Load test',
+        '--body', 'Hello [NAME], this is a load test.',
+        '--metrics-json', metrics_file,
+        # The journal is what the emailer believes it sent; compared with what the server accepted
+        '--journal', journal_file
+    ] + emailer_args
+    env = dict(os.environ)
+    # botocore signs every request; the fake server accepts any credentials
+    env.setdefault('AWS_ACCESS_KEY_ID', 'load-test')
+    env.setdefault('AWS_SECRET_ACCESS_KEY', 'load-test')
+
+    start = time.perf_counter()
+    with open(log_file, 'w', encoding='utf-8') as log:
+        completed = subprocess.run(command, env=env, stdout=None if verbose else log,
+                                   stderr=subprocess.STDOUT if not verbose else None)
+    seconds = time.perf_counter() - start
+
+    stats = fetch_json(f'{endpoint_url}/stats')
+    messages = fetch_json(f'{endpoint_url}/messages')
+    metrics = {}
+    if os.path.exists(metrics_file):
+        with open(metrics_file, 'r', encoding='utf-8') as f:
+            metrics = json.load(f)
+
+    expected_set = set(expected)
+    deliveries = {}
+    for message in messages:
+        for address in message['recipients']:
+            if address in expected_set:
+                deliveries[address] = deliveries.get(address, 0) + 1
+    journal = read_journal(journal_file)
+    not_attempted = counter_total(metrics, 'emails_not_attempted_total')
+    missing = [email for email in expected if email not in deliveries]
+    # Missing and never recorded: after a circuit-breaker stop that is the unsent rest of the list
+    unrecorded = sum(1 for email in missing if email not in journal)
+    send_requests = stats.get('send_requests', 0)
+
+    return {
+        'recipients': recipients,
+        'command': ' '.join(shlex.quote(part) for part in command[1:]),
+        'exit_code': completed.returncode,
+        'log_file': None if verbose else log_file,
+        'seconds': round(seconds, 3),
+        'delivered': len(deliveries),
+        'duplicates': sum(count - 1 for count in deliveries.values()),
+        'missing': len(missing),
+        'reported_failed': sum(1 for email in missing if journal.get(email) == 'failed'),
+        'not_reached': unrecorded if not_attempted else 0,
+        'lost': 0 if not_attempted else unrecorded,
+        # Journaled as sent but never accepted by the server, or accepted but not journaled
+        # (the latter would be sent again by --resume)
+        'sent_not_delivered': sum(1 for email in missing if journal.get(email) == 'sent'),
+        'delivered_not_recorded': sum(1 for email in deliveries if journal.get(email) != 'sent'),
+        'achieved_rate': round(len(deliveries) / seconds, 2) if seconds else None,
+        'server_accepted_rate': stats.get('accepted_rate'),
+        'server_max_send_rate': stats.get('max_send_rate'),
+        'send_requests': send_requests,
+        'rejected_requests': send_requests - stats.get('accepted_requests', 0),
+        'rate_throttles': stats.get('rate_throttles', 0),
+        'quota_rejections': stats.get('quota_rejections', 0),
+        'injected_throttles': stats.get('injected_throttles', 0),
+        'injected_failures': stats.get('injected_failures', 0),
+        'latency_spikes': stats.get('latency_spikes', 0),
+        'emailer_api_calls': counter_total(metrics, 'ses_api_calls_total'),
+        'emailer_retries': counter_total(metrics, 'emails_retried_total')
+    }
+
+
+def has_discrepancies(report: Dict) -> bool:
+    """Whether the emailer's own account of the run disagrees with what the server received"""
+    return bool(report['lost'] or report['duplicates'] or report['sent_not_delivered'] or report['delivered_not_recorded'])
+
+
+def print_report(report: Dict) -> None:
+    """Human-readable load test summary"""
+    print(f"\n📊 Load test: {report['recipients']:,} recipients in {report['seconds']:.1f}s "
+          f"(ses_emailer.py exit code {report['exit_code']})")
+    print(f"  Achieved rate:      {report['achieved_rate']} recipients/s "
+          f"(server limit {report['server_max_send_rate']:g}/s, accepted at {report['server_accepted_rate']}/s)")
+    print(f"  Delivered:          {report['delivered']:,}")
+    print(f"  Reported failed:    {report['reported_failed']:,}")
+    print(f"  Not reached:        {report['not_reached']:,} (sending stopped early)")
+    print(f"  Send requests:      {report['send_requests']:,} received, {report['rejected_requests']:,} rejected")
+    print(f"    Rate throttled:   {report['rate_throttles']:,}")
+    print(f"    Quota exceeded:   {report['quota_rejections']:,}")
+    print(f"    Injected:         {report['injected_throttles']:,} Throttling, {report['injected_failures']:,} InternalFailure")
+    print(f"  Latency spikes:     {report['latency_spikes']:,}")
+    # ses_emailer turns botocore's retries off; requests retried inside botocore would bypass its backoff
+    print(f"  Retries:            {report['emailer_retries']:,} by ses_emailer backoff, "
+          f"{max(0, report['send_requests'] - report['emailer_api_calls']):,} inside botocore")
+    if has_discrepancies(report):
+        print(f"❌ Lost (never delivered, never reported): {report['lost']:,}; sent twice: {report['duplicates']:,}; "
+              f"journaled as sent but not delivered: {report['sent_not_delivered']:,}; "
+              f"delivered but not journaled: {report['delivered_not_recorded']:,}")
+    else:
+        print("✓ Every recipient was delivered exactly once, reported as failed or left for --resume")
+    if report['exit_code'] and report['log_file']:
+        print(f"⚠️  ses_emailer.py output: {report['log_file']}")
+
+
+def main():
+    """Main function to run the load test"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Load-test ses_emailer.py against a local fake SES server',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 2,000 recipients, 8 workers, against a 50/s account with 5% injected throttling
+  python ses_load_test.py --recipients 2000 --max-send-rate 50 --throttle-rate 0.05 --emailer-args "--workers 8"
+
+  # Packed BCC with latency spikes and 500 errors
+  python ses_load_test.py --recipients 10000 --max-send-rate 200 --spike-rate 0.02 --failure-rate 0.01 --emailer-args "--workers 8 --pack-bcc"
+
+  # Daily quota runs out mid-campaign
+  python ses_load_test.py --recipients 1000 --daily-quota 600 --emailer-args "--workers 4"
+
+  # Against a server started separately (python fake_ses_server.py), results saved as JSON
+  python ses_load_test.py --endpoint-url http://127.0.0.1:8025 --recipients 5000 --json load.json
+        """
+    )
+    parser.add_argument('--recipients', type=int, default=1000, help='Synthetic recipients to send to (default: 1000)')
+    parser.add_argument('--emailer-args', default='', help='Extra ses_emailer.py arguments, quoted (e.g. "--workers 8 --pack-bcc")')
+    parser.add_argument('--endpoint-url', help='Use an already running fake_ses_server.py instead of starting one (the server options below are then ignored)')
+    parser.add_argument('--max-send-rate', type=float, default=50.0, help='Server: recipients per second before Throttling (default: 50)')
+    parser.add_argument('--daily-quota', type=int, default=0, help='Server: recipients before "Daily message quota exceeded" (default: 0 = unlimited)')
+    parser.add_argument('--latency-ms', type=float, default=20, help='Server: response time in ms (default: 20)')
+    parser.add_argument('--spike-rate', type=float, default=0.0, help='Server: fraction of requests with a latency spike (default: 0)')
+    parser.add_argument('--spike-ms', type=float, default=1000, help='Server: response time of a latency spike in ms (default: 1000)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Server: fraction of sends answered with Throttling (default: 0)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Server: fraction of sends answered with a 500 InternalFailure (default: 0)')
+    parser.add_argument('--seed', type=int, help='Server: random seed for repeatable fault injection')
+    parser.add_argument('--json', help='Also write the report to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Show ses_emailer.py output')
+
+    args = parser.parse_args()
+
+    server = None
+    endpoint_url = args.endpoint_url
+    if not endpoint_url:
+        server = start_server(FakeSES(
+            max_send_rate=args.max_send_rate,
+            daily_quota=args.daily_quota,
+            latency=args.latency_ms / 1000,
+            spike_rate=args.spike_rate,
+            spike_latency=args.spike_ms / 1000,
+            throttle_rate=args.throttle_rate,
+            failure_rate=args.failure_rate,
+            seed=args.seed
+        ))
+        endpoint_url = server.url
+
+    workdir = tempfile.mkdtemp(prefix='ses_load_test_')
+    print(f"🚀 Sending {args.recipients:,} recipients through {endpoint_url}...")
+    try:
+        report = run_load_test(endpoint_url, args.recipients, shlex.split(args.emailer_args), workdir, args.verbose)
+    finally:
+        if server:
+            server.shutdown()
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json}")
+
+    if report['exit_code'] == 0 and not has_discrepancies(report):
+        shutil.rmtree(workdir, ignore_errors=True)
+    if has_discrepancies(report):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
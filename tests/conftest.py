@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scripts are deployed as standalone files, not a package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
@@ -0,0 +1,121 @@
+"""
+RawMessageBuilder against the email.mime tree it replaced
+
+The builder splices per-message values into a pre-serialized skeleton; the
+parsed result must be the same message the original MIMEMultipart code
+produced: same headers, same part structure, same decoded payloads.
+"""
+
+import email
+import itertools
+import os
+from email import encoders, policy
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import pytest
+
+from ses_emailer import AttachmentCache, RawMessageBuilder, encode_attachment
+
+SENDER = 'sender@example.com'
+SUBJECT = 'Your statement – März ✓, "quoted", and a fairly long subject line that needs folding somewhere'
+
+BODIES = {
+    'text': ('Hi José,\n\nYour statement is attached.\n', None),
+    'html': ('', '<html><body><p>Hi José ✓</p>' + '<p>Line</p>' * 200 + '</body></html>'),
+    'text+html': ('Hi José,\n\nYour statement is attached.\n', '<html><body><p>Hi José ✓</p></body></html>')
+}
+
+
+def attach_file(msg, path):
+    """Attachment exactly as the original send_email_with_attachments built it"""
+    with open(path, 'rb') as f:
+        attachment_data = f.read()
+    attachment = MIMEBase('application', 'octet-stream')
+    attachment.set_payload(attachment_data)
+    encoders.encode_base64(attachment)
+    attachment.add_header('Content-Disposition', f'attachment; filename= {os.path.basename(path)}')
+    msg.attach(attachment)
+
+
+def baseline_message(recipients, subject, body_text, body_html, attachments, reply_to, sender_name):
+    """The original per-message MIMEMultipart tree"""
+    if body_html and attachments:
+        msg = MIMEMultipart('mixed')
+        alt_part = MIMEMultipart('alternative')
+        alt_part.attach(MIMEText(body_text, 'plain', 'utf-8'))
+        alt_part.attach(MIMEText(body_html, 'html', 'utf-8'))
+        msg.attach(alt_part)
+    elif body_html:
+        msg = MIMEMultipart('alternative')
+        msg.attach(MIMEText(body_text, 'plain', 'utf-8'))
+        msg.attach(MIMEText(body_html, 'html', 'utf-8'))
+    else:
+        msg = MIMEMultipart('mixed')
+        msg.attach(MIMEText(body_text, 'plain', 'utf-8'))
+    
+    msg['Subject'] = subject
+    msg['From'] = f'{sender_name} <{SENDER}>' if sender_name else SENDER
+    msg['To'] = ', '.join(recipients)
+    if reply_to:
+        msg['Reply-To'] = ', '.join(reply_to)
+    for path in attachments:
+        attach_file(msg, path)
+    return msg.as_string().encode('utf-8')
+
+
+def describe(raw):
+    """Parsed headers, part structure and decoded payloads, ignoring only the random boundaries"""
+    message = email.message_from_bytes(raw, policy=policy.default)
+    parts = []
+    for part in message.walk():
+        headers = [(name.lower(), str(value)) for name, value in part.items() if name.lower() != 'content-type']
+        params = [(key, value) for key, value in part.get_params() if key != 'boundary']
+        payload = None if part.is_multipart() else part.get_payload(decode=True)
+        parts.append((part.get_content_type(), params, headers, part.get_filename(), payload))
+    return parts
+
+
+@pytest.fixture(scope='module')
+def files(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('attachments')
+    paths = {
+        'statement.pdf': bytes(range(256)) * 40 + b'\x00\xff',
+        'notes.txt': 'Grüße ✓\n'.encode('utf-8'),
+        'invoice 42.pdf': os.urandom(3000)
+    }
+    for name, data in paths.items():
+        (directory / name).write_bytes(data)
+    return {name: str(directory / name) for name in paths}
+
+
+@pytest.mark.parametrize('body, shared, own, reply_to, sender_name', list(itertools.product(
+    BODIES, [False, True], [False, True], [None, ['support@example.com', 'help@example.com']], [None, 'Jörg Müller']
+)))
+def test_builder_matches_email_mime(files, body, shared, own, reply_to, sender_name):
+    body_text, body_html = BODIES[body]
+    shared_paths = [files['statement.pdf'], files['notes.txt']] if shared else []
+    own_paths = [files['invoice 42.pdf']] if own else []
+    builder = RawMessageBuilder(SENDER, attachments=shared_paths, reply_to=reply_to,
+                                sender_name=sender_name, attachment_cache=AttachmentCache())
+    
+    for recipients in (['user@example.com'], ['user@example.com', 'other@example.com']):
+        built = builder.build(recipients, SUBJECT, body_text, body_html,
+                              encoded_attachments=[encode_attachment(path) for path in own_paths] or None)
+        expected = baseline_message(recipients, SUBJECT, body_text, body_html,
+                                    shared_paths + own_paths, reply_to, sender_name)
+        assert describe(built) == describe(expected)
+
+
+def test_skeleton_reuse_keeps_messages_independent(files):
+    builder = RawMessageBuilder(SENDER, attachments=[files['notes.txt']], attachment_cache=AttachmentCache())
+    first = builder.build(['a@example.com'], 'First', 'one', '<p>one</p>')
+    second = builder.build(['b@example.com'], 'Second', 'two', '<p>two</p>',
+                           encoded_attachments=[encode_attachment(files['invoice 42.pdf'])])
+    third = builder.build(['a@example.com'], 'First', 'one', '<p>one</p>')
+    
+    assert describe(first) == describe(third)
+    assert describe(second) == describe(baseline_message(
+        ['b@example.com'], 'Second', 'two', '<p>two</p>', [files['notes.txt'], files['invoice 42.pdf']], None, None
+    ))
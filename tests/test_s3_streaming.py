@@ -0,0 +1,133 @@
+"""
+Recipient lists read from S3 through open_text() and the get_object stream
+
+A stub S3 client hands the object body back in small pieces, so rows and
+multibyte UTF-8 characters are split across reads the way a real
+StreamingBody can split them; every format must parse exactly like the same
+file read from local disk.
+"""
+
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+
+from ses_emailer import iter_recipients, open_text
+
+
+class ChunkedBody:
+    """get_object Body stand-in that returns the object in the given pieces, one per read()"""
+    
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.closed = False
+    
+    def read(self, amt=None):
+        if not self.chunks:
+            return b''
+        chunk = self.chunks.pop(0)
+        if amt is not None and len(chunk) > amt:
+            self.chunks.insert(0, chunk[amt:])
+            chunk = chunk[:amt]
+        return chunk
+    
+    def close(self):
+        self.closed = True
+
+
+class StubS3:
+    """S3 client stand-in: get_object streams objects split into fixed-size or explicit pieces"""
+    
+    def __init__(self, objects, chunk_size=None, splits=None):
+        self.objects = objects
+        self.chunk_size = chunk_size
+        self.splits = splits
+        self.bodies = []
+    
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({'Error': {'Code': 'NoSuchKey', 'Message': 'Not found'}}, 'GetObject')
+        data = self.objects[(Bucket, Key)]
+        if self.splits is not None:
+            bounds = [0] + sorted(self.splits) + [len(data)]
+            chunks = [data[start:end] for start, end in zip(bounds, bounds[1:])]
+        elif self.chunk_size:
+            chunks = [data[i:i + self.chunk_size] for i in range(0, len(data), self.chunk_size)]
+        else:
+            chunks = [data]
+        body = ChunkedBody(chunks)
+        self.bodies.append(body)
+        return {'Body': body}
+
+
+NAMES = ['José Müller', 'Zoë Ångström', '李小龙', 'Plain Name', '']
+
+
+def make_rows(count):
+    return [
+        {'email': f'user{i}@example.com', 'name': NAMES[i % len(NAMES)], 'company': f'Firma {i} GmbH – Köln'}
+        for i in range(count)
+    ]
+
+
+def encode(rows, file_format):
+    if file_format == 'csv':
+        lines = ['email,name,company'] + [f'{r["email"]},{r["name"]},"{r["company"]}"' for r in rows]
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+    if file_format == 'json':
+        return json.dumps(rows, ensure_ascii=False).encode('utf-8')
+    return ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in rows).encode('utf-8')
+
+
+def read_local(tmp_path, data, file_format, include_names):
+    path = tmp_path / f'recipients.{file_format}'
+    path.write_bytes(data)
+    return list(iter_recipients(str(path), include_names=include_names))
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'json', 'jsonl'])
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096, None])
+@pytest.mark.parametrize('include_names', [False, True])
+def test_matches_local_file(tmp_path, file_format, chunk_size, include_names):
+    # Past 64 KiB, so the JSON decoder also sees elements split across its text chunks
+    data = encode(make_rows(1500), file_format)
+    assert len(data) > 65536
+    s3 = StubS3({('bucket', f'list.{file_format}'): data}, chunk_size=chunk_size)
+    
+    streamed = list(iter_recipients(f's3://bucket/list.{file_format}', include_names=include_names, s3_client=s3))
+    
+    assert streamed == read_local(tmp_path, data, file_format, include_names)
+    assert len(streamed) == 1500
+    assert s3.bodies[0].closed
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'json', 'jsonl'])
+def test_row_and_multibyte_character_split_across_reads(tmp_path, file_format):
+    rows = make_rows(5)
+    data = encode(rows, file_format)
+    # Split inside the second recipient's address and inside the two-byte 'é' of José
+    row_split = data.index(b'user1@') + 3
+    char_split = data.index('é'.encode('utf-8')) + 1
+    s3 = StubS3({('bucket', f'list.{file_format}'): data}, splits=[char_split, row_split])
+    
+    streamed = list(iter_recipients(f's3://bucket/list.{file_format}', include_names=True, s3_client=s3))
+    
+    assert [r['email'] for r in streamed] == [r['email'] for r in rows]
+    assert [r['name'] for r in streamed] == [r['name'] for r in rows]
+    assert streamed[0]['company'] == 'Firma 0 GmbH – Köln'
+    assert streamed == read_local(tmp_path, data, file_format, True)
+
+
+def test_open_text_decodes_split_characters_line_by_line():
+    text = 'email,name\nana@example.com,Ана\nzoe@example.com,Zoë\n'
+    data = text.encode('utf-8')
+    s3 = StubS3({('bucket', 'list.csv'): data}, chunk_size=1)
+    
+    with open_text('s3://bucket/list.csv', newline='', s3_client=s3) as f:
+        assert list(f) == text.splitlines(keepends=True)
+    assert s3.bodies[0].closed
+
+
+def test_missing_object_is_file_not_found():
+    with pytest.raises(FileNotFoundError):
+        open_text('s3://bucket/missing.csv', s3_client=StubS3({}))